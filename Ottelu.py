@@ -1,64 +1,88 @@
-from playwright.sync_api import sync_playwright
+import argparse
+import asyncio
 import csv
+from browser import MATCH_HEADER_READY_JS, MATCH_LINKS_READY_JS, shared_browser, open_page, load_until_ready
+from throttle import HostLimiter
+from competitions import BASE_URL, DEFAULT_COMPETITION, get_competition, group_url
 
-def get_fixtures():
-    fixtures_url = "https://tulospalvelu.palloliitto.fi/category/M1L!spljp25/group/1/fixtures"
+async def get_fixtures(browser, fixtures_url):
     match_urls = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        try:
-            page.goto(fixtures_url, wait_until="networkidle", timeout=60000)
-            links = page.query_selector_all('a[href*="/match/"]')
-            for link in links:
-                href = link.get_attribute('href')
-                if href and "/match/" in href:
-                    if href.startswith("/"):
-                        match_urls.append("https://tulospalvelu.palloliitto.fi" + href)
-                    else:
-                        match_urls.append("https://tulospalvelu.palloliitto.fi/" + href)
-        finally:
-            browser.close()
+    async with open_page(browser) as page:
+        await load_until_ready(page, fixtures_url, "fixtures", MATCH_LINKS_READY_JS)
+        hrefs = await page.eval_on_selector_all('a[href*="/match/"]',
+                                                'elements => elements.map(e => e.getAttribute("href"))')
+        for href in hrefs:
+            if href and "/match/" in href:
+                if href.startswith("/"):
+                    match_urls.append(BASE_URL + href)
+                else:
+                    match_urls.append(BASE_URL + "/" + href)
     print(f"DEBUG: Löytyi {len(match_urls)} tulevaa ottelua.")
     return match_urls
 
-def scrape_match_info(match_url):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        try:
-            page.goto(match_url, wait_until="networkidle", timeout=60000)
-            page.wait_for_selector('.match-header', timeout=30000)
-            date = page.query_selector('.match-date')
-            teams = page.query_selector('.match-teams')
-            score = page.query_selector('.match-score')
-            return {
-                "url": match_url,
-                "date": date.inner_text() if date else "",
-                "teams": teams.inner_text() if teams else "",
-                "score": score.inner_text() if score else "",
-            }
-        except Exception as e:
-            print(f"Virhe {match_url}: {e}")
-            return None
-        finally:
-            browser.close()
+async def scrape_match_info(page, match_url):
+    try:
+        await load_until_ready(page, match_url, "match", MATCH_HEADER_READY_JS)
+        info = await page.evaluate("""() => {
+            const text = selector => {
+                const element = document.querySelector(selector);
+                return element ? element.innerText : "";
+            };
+            return {date: text('.match-date'), teams: text('.match-teams'), score: text('.match-score')};
+        }""")
+        return {"url": match_url, **info}
+    except Exception as e:
+        print(f"Virhe {match_url}: {e}")
+        return None
 
-def save_all_fixtures_csv(matches, filename="Ottelut.csv"):
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["URL", "Päivämäärä", "Joukkueet", "Tulos"])
-        for match in matches:
+async def _match_worker(browser, queue, limiter, writer, f):
+    """Scrape match URLs from the queue with one reusable page"""
+    written = 0
+    async with open_page(browser) as page:
+        while True:
+            try:
+                match_url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return written
+            print(f"Käsitellään: {match_url}")
+            async with limiter.slot(match_url):
+                match = await scrape_match_info(page, match_url)
             if match:
+                # Stream each row to disk as soon as it is parsed
                 writer.writerow([match["url"], match["date"], match["teams"], match["score"]])
-    print(f"DEBUG: Kirjoitettu {len(matches)} ottelua tiedostoon {filename}")
+                f.flush()
+                written += 1
+
+async def scrape_all_matches(workers=4, per_host=2, min_interval=0.5, filename="Ottelut.csv",
+                             competition_key=DEFAULT_COMPETITION):
+    """Scrape every match with one browser and a pool of reusable pages"""
+    fixtures_url = group_url(get_competition(competition_key), "fixtures")
+    async with shared_browser() as browser:
+        match_urls = await get_fixtures(browser, fixtures_url)
+
+        queue = asyncio.Queue()
+        for match_url in match_urls:
+            queue.put_nowait(match_url)
+        limiter = HostLimiter(max_concurrent=per_host, min_interval=min_interval)
+
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["URL", "Päivämäärä", "Joukkueet", "Tulos"])
+            counts = await asyncio.gather(*[
+                _match_worker(browser, queue, limiter, writer, f)
+                for _ in range(max(1, min(workers, len(match_urls))))
+            ])
+    print(f"DEBUG: Kirjoitettu {sum(counts)} ottelua tiedostoon {filename}")
+    return sum(counts)
 
 if __name__ == "__main__":
-    match_urls = get_fixtures()
-    all_matches = []
-    for url in match_urls:
-        print(f"Käsitellään: {url}")
-        info = scrape_match_info(url)
-        if info:
-            all_matches.append(info)
-    save_all_fixtures_csv(all_matches)
+    parser = argparse.ArgumentParser(description="Scrape match details for every fixture")
+    parser.add_argument("--workers", type=int, default=4, help="number of reusable pages")
+    parser.add_argument("--per-host", type=int, default=2, help="concurrent requests per host")
+    parser.add_argument("--min-interval", type=float, default=0.5,
+                        help="minimum seconds between request starts per host")
+    parser.add_argument("--output", default="Ottelut.csv")
+    parser.add_argument("--competition", default=DEFAULT_COMPETITION, help="competition registry key")
+    args = parser.parse_args()
+    asyncio.run(scrape_all_matches(args.workers, args.per_host, args.min_interval, args.output,
+                                   args.competition))
@@ -1,89 +1,164 @@
-import pandas as pd
+import argparse
+import numpy as np
 import os
-from datetime import datetime
+import render
+from manifest import write_output
+from store import STORE_FILE, read_dataset
+from schema import csv_columns, iter_matches_csv, match_order_keys, match_rows, read_matches_csv, typed_matches
+from streaming import CHUNK_ROWS, external_sort
 
-try:
-    print("Starting PelatutOttelut.py...")
+# Line end of the CSV rows rendered per chunk; unlike a newline it cannot
+# appear inside a quoted field
+ROW_END = '\x1e\n'
+
+def sort_matches(df):
+    """Sort matches by date and kick-off time"""
+    return df.iloc[np.lexsort(match_order_keys(df['Pelipäivä'], df['Klo'] if 'Klo' in df.columns else None))]
+
+MATCH_HEADERS = ['Päivä', 'Aika', 'Koti', 'Vieras', 'Tulos', 'Paikka']
+MATCH_TITLE = 'Pelatut ottelut'
+MATCH_SEPARATOR = '| ----- | ---- | ---- | ------ | ----- | ------ |\n'
+
+def is_match_data(columns):
+    return 'Pelipäivä' in columns and 'Koti' in columns
+
+def match_columns(df):
+    """Markdown cell columns of match rows"""
+    if 'Kotitulos' in df.columns:
+        tulos = [f"{home}-{away}" for home, away in
+                 zip(render.column_text(df, 'Kotitulos'), render.column_text(df, 'Vierastulos'))]
+    else:
+        tulos = [""] * len(df)
+    return [render.column_text(df, 'Pelipäivä'), render.column_text(df, 'Klo'),
+            render.column_text(df, 'Koti'), render.column_text(df, 'Vieras'),
+            tulos, render.column_text(df, 'Paikka')]
+
+def played_matches_markdown(df):
+    """Markdown table of the played matches"""
+    # Check which columns we have available
+    if is_match_data(df.columns):
+        return render.markdown(MATCH_HEADERS, match_columns(df), title=MATCH_TITLE, separator=MATCH_SEPARATOR)
+
+    # Handle player statistics
+    columns = df.columns.tolist()
+    return render.markdown(
+        columns, [render.column_text(df, column) for column in columns],
+        title='Pelatut ottelut',
+        separator=f"| {' | '.join(['-----' for _ in columns])} |\n")
+
+def _sorted_chunks(input_file, chunksize):
+    """(sort keys, (CSV row, Markdown row)) of every chunk of the input"""
+    offset = 0
+    for chunk in iter_matches_csv(input_file, chunksize):
+        clock, no_clock, day, no_day = match_order_keys(chunk['Pelipäivä'],
+                                                        chunk['Klo'] if 'Klo' in chunk.columns else None)
+        # Date, then time, then input order: the order of sort_matches
+        keys = zip(no_day.tolist(), day.tolist(), no_clock.tolist(), clock.tolist(),
+                   range(offset, offset + len(chunk)))
+        csv_rows = match_rows(chunk).to_csv(index=False, header=False, lineterminator=ROW_END)
+        csv_rows = [row + '\n' for row in csv_rows.split(ROW_END)[:-1]]
+        offset += len(chunk)
+        yield list(keys), list(zip(csv_rows, render.markdown_rows(match_columns(chunk))))
+
+def stream_played_matches(input_file, chunksize=CHUNK_ROWS):
+    """Write PelatutOttelut.csv and .md from a match CSV of any size.
+
+    The chunks are sorted with an external merge sort and written row by
+    row, so memory stays bounded; the files are the same as from main().
+    """
+    header = render.csv_text(list(csv_columns(input_file)), [])
+    rows = 0
+    with open('PelatutOttelut.csv', 'w', encoding='utf-8', newline='') as csv_file, \
+            open('PelatutOttelut.md', 'w', encoding='utf-8', newline='') as md_file:
+        csv_file.write(header)
+        md_file.write(render.markdown(MATCH_HEADERS, [], title=MATCH_TITLE, separator=MATCH_SEPARATOR))
+        for csv_row, md_row in external_sort(_sorted_chunks(input_file, chunksize)):
+            csv_file.write(csv_row)
+            md_file.write(md_row)
+            rows += 1
+    return rows
+
+def main(stream=False, chunksize=CHUNK_ROWS):
+    try:
+        print("Starting PelatutOttelut.py...")
     
-    # Check if source file exists
-    if not os.path.exists('tulokset.csv'):
-        print("Error: tulokset.csv not found")
-        if os.path.exists('Ottelut.csv'):
-            print("Ottelut.csv exists, using that instead")
-            input_file = 'Ottelut.csv'
+        # Prefer the canonical data store over re-parsing the derived CSV
+        # files; the streaming mode is for CSV archives too big for memory
+        df = None if stream else read_dataset('ottelut')
+        if df is not None:
+            df = typed_matches(df)
+            input_file = STORE_FILE
+        elif not os.path.exists('tulokset.csv'):
+            print("Error: tulokset.csv not found")
+            if os.path.exists('Ottelut.csv'):
+                print("Ottelut.csv exists, using that instead")
+                input_file = 'Ottelut.csv'
+            else:
+                print("No input files found!")
+                exit(1)
         else:
-            print("No input files found!")
-            exit(1)
-    else:
-        input_file = 'tulokset.csv'
+            input_file = 'tulokset.csv'
+    
+        if stream and is_match_data(csv_columns(input_file)):
+            print(f"Streaming data from {input_file} in chunks of {chunksize} rows")
+            rows = stream_played_matches(input_file, chunksize)
+            print(f"Wrote {rows} rows from {input_file}")
+            print("PelatutOttelut.py completed successfully")
+            return
     
-    # Lue CSV-tiedosto
-    print(f"Reading data from {input_file}")
-    df = pd.read_csv(input_file)
-    print(f"Read {len(df)} rows from {input_file}")
+        # Lue CSV-tiedosto
+        print(f"Reading data from {input_file}")
+        if df is None:
+            df = read_matches_csv(input_file)
+        print(f"Read {len(df)} rows from {input_file}")
     
-    # Debug: Print first few rows and column names
-    print("First 3 rows of data:")
-    print(df.head(3))
-    print("Column names:", df.columns.tolist())
+        # Debug: Print first few rows and column names
+        print("First 3 rows of data:")
+        print(df.head(3))
+        print("Column names:", df.columns.tolist())
     
-    # Check if this is player statistics or match data
-    if 'Pelaaja' in df.columns and 'Pelipäivä' not in df.columns:
-        print("Processing player statistics data")
+        # Check if this is player statistics or match data
+        if 'Pelaaja' in df.columns and 'Pelipäivä' not in df.columns:
+            print("Processing player statistics data")
         
-        # Create a simple output for player statistics
-        with open('PelatutOttelut.md', 'w', encoding='utf-8') as f:
-            f.write('# Pelaajatilastot\n\n')
-            f.write('| Pelaaja | Joukkue | Ottelut | Maalit | Syötöt | Pisteet | Minuutit |\n')
-            f.write('| ------- | ------- | ------- | ------ | ------ | ------- | -------- |\n')
-            
-            for _, row in df.iterrows():
-                f.write(f"| {row['Pelaaja']} | {row['Joukkue']} | {row['O']} | {row['M']} | {row['S']} | {row['P']} | {row['Min']} |\n")
+            # Create a simple output for player statistics
+            write_output('PelatutOttelut.md', render.markdown(
+                ['Pelaaja', 'Joukkue', 'Ottelut', 'Maalit', 'Syötöt', 'Pisteet', 'Minuutit'],
+                [render.column_text(df, column) for column in ['Pelaaja', 'Joukkue', 'O', 'M', 'S', 'P', 'Min']],
+                title='Pelaajatilastot',
+                separator='| ------- | ------- | ------- | ------ | ------ | ------- | -------- |\n'))
         
-        # Create empty PelatutOttelut.csv for consistency
-        df.to_csv('PelatutOttelut.csv', index=False)
-    else:
-        # Original match data processing logic
-        print("Processing match data")
-        try:
-            # Only try to process date if the column exists
-            if 'Pelipäivä' in df.columns:
-                df['Pelipäivä'] = pd.to_datetime(df['Pelipäivä'], format='%d.%m.%Y')
-                df = df.sort_values(by=['Pelipäivä', 'Klo'], ascending=[True, True])
-                df['Pelipäivä'] = df['Pelipäivä'].dt.strftime('%d.%m.%Y')
-            
-            # Tallenna filtteröity data CSV-tiedostoon
+            # Create empty PelatutOttelut.csv for consistency
             df.to_csv('PelatutOttelut.csv', index=False)
+        else:
+            # Original match data processing logic
+            print("Processing match data")
+            try:
+                # Only try to process date if the column exists
+                if 'Pelipäivä' in df.columns:
+                    df = sort_matches(df)
             
-            # Luo Markdown-tiedosto
-            with open('PelatutOttelut.md', 'w', encoding='utf-8') as f:
-                f.write('# Pelatut ottelut\n\n')
-                
-                # Check which columns we have available
-                if 'Pelipäivä' in df.columns and 'Koti' in df.columns:
-                    f.write('| Päivä | Aika | Koti | Vieras | Tulos | Paikka |\n')
-                    f.write('| ----- | ---- | ---- | ------ | ----- | ------ |\n')
-                    
-                    for _, row in df.iterrows():
-                        tulos = f"{row.get('Kotitulos', '')}-{row.get('Vierastulos', '')}" if 'Kotitulos' in df.columns else ""
-                        f.write(f"| {row.get('Pelipäivä', '')} | {row.get('Klo', '')} | {row.get('Koti', '')} | {row.get('Vieras', '')} | {tulos} | {row.get('Paikka', '')} |\n")
-                else:
-                    # Handle player statistics
-                    columns = df.columns.tolist()
-                    header = ' | '.join(columns)
-                    f.write(f"| {header} |\n")
-                    f.write(f"| {' | '.join(['-----' for _ in columns])} |\n")
-                    
-                    for _, row in df.iterrows():
-                        f.write(f"| {' | '.join([str(row.get(col, '')) for col in columns])} |\n")
-        except Exception as e:
-            print(f"Error processing data: {e}")
-            import traceback
-            traceback.print_exc()
+                # Tallenna filtteröity data CSV-tiedostoon
+                match_rows(df).to_csv('PelatutOttelut.csv', index=False)
+            
+                # Luo Markdown-tiedosto
+                write_output('PelatutOttelut.md', played_matches_markdown(df))
+            except Exception as e:
+                print(f"Error processing data: {e}")
+                import traceback
+                traceback.print_exc()
     
-    print("PelatutOttelut.py completed successfully")
+        print("PelatutOttelut.py completed successfully")
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
 
-except Exception as e:
-    print(f"Unexpected error: {e}")
-    import traceback
-    traceback.print_exc()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the played matches as CSV and Markdown")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the CSV in chunks and sort on disk, for archives too big for memory")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per chunk in --stream mode")
+    args = parser.parse_args()
+    main(args.stream, args.chunksize)
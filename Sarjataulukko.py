@@ -1,15 +1,34 @@
-import pandas as pd
+import argparse
 import os
 from datetime import datetime
+import render
+from manifest import write_output
+from standings import STANDINGS_COLUMNS, compute_standings
+from store import STORE_FILE, read_dataset
+from schema import csv_columns, read_matches_csv, typed_matches
+from streaming import CHUNK_ROWS, stream_standings
 
 print("Starting Sarjataulukko.py...")
 
-def process_league_table():
+def process_league_table(stream=False, chunksize=CHUNK_ROWS):
     """Process league table data from available sources"""
     try:
+        # Stream archives too big for memory from the CSV in chunks
+        if stream and os.path.exists('tulokset.csv'):
+            columns = csv_columns('tulokset.csv')
+            if 'Koti' in columns and 'Vieras' in columns:
+                print(f"Streaming tulokset.csv in chunks of {chunksize} rows")
+                return write_league_table(stream_standings('tulokset.csv', chunksize))
+        
+        # Prefer the canonical data store over re-parsing the derived CSV files
+        df = None if stream else read_dataset('ottelut')
+        if df is not None:
+            print(f"Read data from {STORE_FILE}: {len(df)} rows")
+            return create_league_table_from_matches(typed_matches(df))
+        
         # Try to read source data
         if os.path.exists('tulokset.csv'):
-            df = pd.read_csv('tulokset.csv')
+            df = read_matches_csv('tulokset.csv')
             print(f"Read data from tulokset.csv: {len(df)} rows")
             print(f"Columns: {df.columns.tolist()}")
             
@@ -46,13 +65,11 @@ def create_player_statistics_table(df):
         print(f"Created player statistics table with {len(df)} players")
         
         # Create markdown
-        with open('Sarjataulukko.md', 'w', encoding='utf-8') as f:
-            f.write('# Pelaajatilasto\n\n')
-            f.write('| Sija | Pelaaja | Joukkue | O | M | S | P | Min |\n')
-            f.write('| ---- | ------- | ------- | - | - | - | - | --- |\n')
-            
-            for _, row in df.iterrows():
-                f.write(f"| {row['Sija']} | {row['Pelaaja']} | {row['Joukkue']} | {row['O']} | {row['M']} | {row['S']} | {row['P']} | {row['Min']} |\n")
+        columns = ['Sija', 'Pelaaja', 'Joukkue', 'O', 'M', 'S', 'P', 'Min']
+        write_output('Sarjataulukko.md', render.markdown(
+            columns, [render.column_text(df, column) for column in columns],
+            title='Pelaajatilasto',
+            separator='| ---- | ------- | ------- | - | - | - | - | --- |\n'))
         
         return True
     except Exception as e:
@@ -64,96 +81,28 @@ def create_player_statistics_table(df):
 def create_league_table_from_matches(df):
     """Create a league table from match data"""
     try:
-        # Alusta sarjataulukko
-        teams = set()
-        teams.update(df['Koti'].unique())
-        teams.update(df['Vieras'].unique())
-        
-        sarjataulukko = {
-            team: {'Ottelut': 0, 'Voitot': 0, 'Tasapelit': 0, 'Tappiot': 0, 
-                'Tehdyt maalit': 0, 'Päästetyt maalit': 0, 'Maaliero': 0, 'Pisteet': 0}
-            for team in teams if pd.notna(team)
-        }
-        
-        # Käy läpi ottelut ja päivitä sarjataulukko
-        for _, ottelu in df.iterrows():
-            try:
-                home_team = ottelu['Koti']
-                away_team = ottelu['Vieras']
-                
-                # Skip if teams are NaN
-                if pd.isna(home_team) or pd.isna(away_team):
-                    continue
-                    
-                kotitulos = ottelu.get('Kotitulos', None)
-                vierastulos = ottelu.get('Vierastulos', None)
-                
-                # Skip if scores are missing
-                if pd.isna(kotitulos) or pd.isna(vierastulos):
-                    continue
-                    
-                try:
-                    home_score = int(kotitulos)
-                    away_score = int(vierastulos)
-                    
-                    # Update home team stats
-                    sarjataulukko[home_team]['Ottelut'] += 1
-                    sarjataulukko[home_team]['Tehdyt maalit'] += home_score
-                    sarjataulukko[home_team]['Päästetyt maalit'] += away_score
-                    
-                    # Update away team stats
-                    sarjataulukko[away_team]['Ottelut'] += 1
-                    sarjataulukko[away_team]['Tehdyt maalit'] += away_score
-                    sarjataulukko[away_team]['Päästetyt maalit'] += home_score
-                    
-                    # Update wins, draws, losses and points
-                    if home_score > away_score:
-                        sarjataulukko[home_team]['Voitot'] += 1
-                        sarjataulukko[away_team]['Tappiot'] += 1
-                        sarjataulukko[home_team]['Pisteet'] += 3
-                    elif home_score < away_score:
-                        sarjataulukko[away_team]['Voitot'] += 1
-                        sarjataulukko[home_team]['Tappiot'] += 1
-                        sarjataulukko[away_team]['Pisteet'] += 3
-                    else:  # Draw
-                        sarjataulukko[home_team]['Tasapelit'] += 1
-                        sarjataulukko[away_team]['Tasapelit'] += 1
-                        sarjataulukko[home_team]['Pisteet'] += 1
-                        sarjataulukko[away_team]['Pisteet'] += 1
-                except (ValueError, TypeError):
-                    # Skip matches with invalid scores
-                    continue
-            except Exception as e:
-                print(f"Error processing match: {e}")
-                continue
-                
-        # Calculate goal differences
-        for team in sarjataulukko:
-            sarjataulukko[team]['Maaliero'] = sarjataulukko[team]['Tehdyt maalit'] - sarjataulukko[team]['Päästetyt maalit']
-        
-        # Create DataFrame from league table
-        league_df = pd.DataFrame.from_dict(sarjataulukko, orient='index')
-        
-        # Sort by points, goal difference and goals scored
-        league_df = league_df.sort_values(by=['Pisteet', 'Maaliero', 'Tehdyt maalit'], ascending=False)
-        
-        # Add ranking column
-        league_df.insert(0, 'Sijoitus', range(1, len(league_df) + 1))
-        
+        # Laske sarjataulukko yhdellä groupby-aggregaatiolla
+        return write_league_table(compute_standings(df))
+    except Exception as e:
+        print(f"Error creating league table: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def write_league_table(league_df):
+    """Save a computed league table as CSV and Markdown"""
+    try:
         # Save as CSV
         league_df.to_csv('Sarjataulukko.csv')
         
         # Create Markdown table
-        with open('Sarjataulukko.md', 'w', encoding='utf-8') as f:
-            f.write('# Sarjataulukko\n\n')
-            f.write('| Sij. | Joukkue | O | V | T | H | TM | PM | ME | P |\n')
-            f.write('| ---- | ------- | - | - | - | - | -- | -- | -- | - |\n')
-            
-            for index, row in league_df.iterrows():
-                f.write(f"| {row['Sijoitus']} | {index} | {row['Ottelut']} | {row['Voitot']} | {row['Tasapelit']} | "
-                        f"{row['Tappiot']} | {row['Tehdyt maalit']} | {row['Päästetyt maalit']} | "
-                        f"{row['Maaliero']} | {row['Pisteet']} |\n")
-                        
+        columns = [render.column_text(league_df, 'Sijoitus'), render.index_text(league_df)]
+        columns += [render.column_text(league_df, column) for column in STANDINGS_COLUMNS]
+        write_output('Sarjataulukko.md', render.markdown(
+            ['Sij.', 'Joukkue', 'O', 'V', 'T', 'H', 'TM', 'PM', 'ME', 'P'], columns,
+            title='Sarjataulukko',
+            separator='| ---- | ------- | - | - | - | - | -- | -- | -- | - |\n'))
+        
         return True
     except Exception as e:
         print(f"Error creating league table: {e}")
@@ -162,8 +111,13 @@ def create_league_table_from_matches(df):
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the league table from the match results")
+    parser.add_argument("--stream", action="store_true",
+                        help="fold tulokset.csv into the table chunk by chunk, for archives too big for memory")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per chunk in --stream mode")
+    args = parser.parse_args()
     try:
-        if process_league_table():
+        if process_league_table(args.stream, args.chunksize):
             print("League table created successfully")
         else:
             print("Failed to create league table")
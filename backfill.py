@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from competitions import DEFAULT_COMPETITION, OUTPUT_ROOT, get_competition, load_registry, output_dir, \
+    season_competition
+from html_tables import extract_tables_from_file
+from manifest import Manifest
+from scraper import parse_fixtures, parse_league_table
+from store import DataStore
+from throttle import RequestBudget
+from tulospalvelu_api import TulospalveluClient, map_fixtures, map_league_table
+from views import refresh_views
+
+CHECKPOINT_FILE = "backfill_checkpoint.json"
+# Raw data saved in every season directory before it is parsed: the API
+# response, or pages saved by a browser run when there is no API response
+GROUP_FILE = "group.json"
+LEAGUE_HTML = "league_table.html"
+FIXTURES_HTML = "fixtures.html"
+
+def parse_seasons(text):
+    """Seasons from '2016-2025', '2019,2021' or a mix of both"""
+    seasons = []
+    for part in text.split(','):
+        first, _, last = part.strip().partition('-')
+        seasons.extend(range(int(first), int(last or first) + 1))
+    return sorted(set(seasons))
+
+def _write_atomic(filename, content):
+    temporary = f"{filename}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temporary, filename)
+
+class Checkpoint:
+    """Finished (competition, season) pairs, saved after every season so a
+    stopped backfill continues where it left off"""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.seasons = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.seasons = json.load(f)
+
+    @staticmethod
+    def key(competition):
+        return f"{competition['key']}/{competition['season']}"
+
+    def done(self, competition):
+        return self.key(competition) in self.seasons
+
+    def mark_done(self, competition, teams, matches):
+        self.seasons[self.key(competition)] = {
+            'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'teams': teams,
+            'matches': matches,
+        }
+        _write_atomic(self.path, json.dumps(self.seasons, ensure_ascii=False, indent=2, sort_keys=True))
+
+def fetch_season(client, competition, directory):
+    """Save the raw API response of one season, unless an earlier run already did"""
+    filename = os.path.join(directory, GROUP_FILE)
+    if os.path.exists(filename) or os.path.exists(os.path.join(directory, LEAGUE_HTML)):
+        return False
+    data, _ = client.get_json('getGroup', competition_id=competition['competition_id'],
+                              category_id=competition['category_id'], group_id=competition['group_id'],
+                              matches=1)
+    os.makedirs(directory, exist_ok=True)
+    _write_atomic(filename, json.dumps(data, ensure_ascii=False))
+    return True
+
+def parse_season(directory):
+    """League table and fixture rows from the saved raw data of one season.
+
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    filename = os.path.join(directory, GROUP_FILE)
+    if os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        group = data.get('group', data)
+        return map_league_table(group), map_fixtures(group)
+
+    league_tables = extract_tables_from_file(os.path.join(directory, LEAGUE_HTML))
+    fixtures_file = os.path.join(directory, FIXTURES_HTML)
+    fixture_tables = extract_tables_from_file(fixtures_file) if os.path.exists(fixtures_file) else []
+    return (parse_league_table(league_tables[0]) if league_tables else [],
+            parse_fixtures(fixture_tables[0]) if fixture_tables else [])
+
+def write_season(competition, directory, league_table, fixtures):
+    """Store one season and write its CSV, JSON and Markdown files"""
+    manifest = Manifest(directory)
+    with DataStore(directory) as store:
+        store.replace('sarjataulukko', league_table)
+        store.replace('ottelut', fixtures)
+        refresh_views(store, manifest, name=competition['name'])
+    manifest.save()
+
+async def backfill(competition_keys, seasons, root=OUTPUT_ROOT, checkpoint_file=CHECKPOINT_FILE,
+                   concurrency=8, per_host=4, workers=None):
+    """Fetch, parse and write every (competition, season) that is not in the checkpoint yet.
+
+    Downloads run concurrently within one request budget and parsing runs in
+    a process pool, so a season is parsed as soon as its data has arrived.
+    Returns the number of seasons that failed.
+    """
+    registry = load_registry()
+    checkpoint = Checkpoint(checkpoint_file)
+    pending = []
+    for key in competition_keys:
+        for season in seasons:
+            competition = season_competition(get_competition(key, registry), season)
+            if checkpoint.done(competition):
+                print(f"Skipping {checkpoint.key(competition)}, finished earlier")
+            else:
+                pending.append(competition)
+    print(f"Backfilling {len(pending)} seasons into {root}/")
+
+    budget = RequestBudget(concurrency, per_host)
+    # The raw responses are kept in the season directories, so the
+    # conditional-GET cache of the live scraper is not needed here
+    client = TulospalveluClient(cache_file=None)
+    loop = asyncio.get_running_loop()
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            async def run(competition):
+                nonlocal failed
+                key = checkpoint.key(competition)
+                directory = output_dir(competition, root)
+                try:
+                    async with budget.slot(client.base_url):
+                        fetched = await asyncio.to_thread(fetch_season, client, competition, directory)
+                    league_table, fixtures = await loop.run_in_executor(pool, parse_season, directory)
+                    if not league_table and not fixtures:
+                        raise ValueError("no teams or matches in the saved data")
+                    await asyncio.to_thread(write_season, competition, directory, league_table, fixtures)
+                    checkpoint.mark_done(competition, len(league_table), len(fixtures))
+                    print(f"Finished {key}: {len(league_table)} teams, {len(fixtures)} matches "
+                          f"({'fetched' if fetched else 'from saved data'})")
+                except Exception as e:
+                    failed += 1
+                    print(f"Error backfilling {key}: {e}")
+                    traceback.print_exc()
+
+            await asyncio.gather(*[run(competition) for competition in pending])
+    finally:
+        client.close()
+    return failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild past seasons into output/KEY/SEASON/")
+    parser.add_argument("--seasons", required=True, help="seasons such as 2016-2025 or 2019,2021")
+    parser.add_argument("--competition", action="append", dest="competitions", metavar="KEY",
+                        help=f"competition to backfill (repeatable, default: {DEFAULT_COMPETITION})")
+    parser.add_argument("--all-competitions", action="store_true",
+                        help="backfill every competition in the registry")
+    parser.add_argument("--root", default=OUTPUT_ROOT, help="directory the season outputs go under")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="file of the finished seasons")
+    parser.add_argument("--restart", action="store_true", help="forget the checkpoint and rebuild every season from the saved downloads")
+    parser.add_argument("--concurrency", type=int, default=8, help="global cap on concurrent downloads")
+    parser.add_argument("--per-host", type=int, default=4, help="concurrent downloads per host")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: all cores)")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    competition_keys = sorted(load_registry()) if args.all_competitions else \
+        (args.competitions or [DEFAULT_COMPETITION])
+    start = time.perf_counter()
+    failed = asyncio.run(backfill(competition_keys, parse_seasons(args.seasons), args.root, args.checkpoint,
+                                  args.concurrency, args.per_host, args.workers))
+    print(f"Backfill took {time.perf_counter() - start:.1f} s, {failed} seasons failed")
+    exit(1 if failed else 0)
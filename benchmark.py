@@ -0,0 +1,176 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import PelatutOttelut
+import Sarjataulukko
+import views
+import ykk
+from html_tables import extract_tables_from_file
+from schema import read_matches_csv, typed_matches
+from standings import compute_standings
+
+RESULTS_FILE = "benchmark_results.json"
+
+# Synthetic seasons as (teams, matches): a 12-team double round robin up to
+# a 500-team archive of one million matches
+SEASONS = [(12, 132), (20, 380), (100, 9900), (500, 1_000_000)]
+HTML_FILES = ["Sivu.html", "league_table.html"]
+KICKOFFS = np.array(["15:00", "17:00", "18:30", "19:30"])
+# Timings below this are too noisy to call a regression
+NOISE_FLOOR_S = 0.005
+
+def synthetic_season(teams, matches, seed=0, played_share=0.9):
+    """Random season in the tulokset.csv schema, as pd.read_csv would load it"""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Joukkue {i:03d}" for i in range(teams)])
+    home = rng.integers(0, teams, matches)
+    away = (home + rng.integers(1, teams, matches)) % teams
+    dates = pd.Timestamp("2025-04-01") + pd.to_timedelta(rng.integers(0, 200, matches), unit="D")
+    played = rng.random(matches) < played_share
+    return pd.DataFrame({
+        'Pelipäivä': dates.strftime('%d.%m.%Y'),
+        'Klo': KICKOFFS[rng.integers(0, len(KICKOFFS), matches)],
+        'Koti': names[home],
+        'Vieras': names[away],
+        'Kotitulos': np.where(played, rng.poisson(1.5, matches), np.nan),
+        'Vierastulos': np.where(played, rng.poisson(1.2, matches), np.nan),
+        'Paikka': np.char.add("Stadion ", home.astype(str)),
+    })
+
+def measure(function, repeat=3):
+    """Best and median wall time of repeated calls plus the peak traced memory of one call"""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        # Memory is traced in a separate call so tracing does not skew the timings
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'peak_memory_bytes': peak}
+
+def season_benchmarks(matches, csv_file=None):
+    """Benchmarks of the match-data hot paths for one synthetic season"""
+    standings = compute_standings(matches)
+    league = standings.rename_axis('Joukkue').reset_index()
+    typed = typed_matches(matches)
+    loaders = {
+        'read_csv': lambda: pd.read_csv(csv_file),
+        'read_matches_csv': lambda: read_matches_csv(csv_file),
+    } if csv_file else {}
+    return {
+        **loaders,
+        'create_league_table_from_matches': lambda: Sarjataulukko.create_league_table_from_matches(matches.copy()),
+        'compute_standings': lambda: compute_standings(matches),
+        'compute_standings_typed': lambda: compute_standings(typed),
+        'sort_matches': lambda: PelatutOttelut.sort_matches(matches.copy()),
+        'played_matches_markdown': lambda: PelatutOttelut.played_matches_markdown(matches),
+        'fixtures_markdown': lambda: views.fixtures_markdown(matches),
+        'league_table_markdown': lambda: views.league_table_markdown(league),
+    }
+
+def run_benchmarks(seasons=SEASONS, repeat=3, html_files=HTML_FILES):
+    results = []
+    html_files = [os.path.abspath(filename) for filename in html_files if os.path.exists(filename)]
+    # The league table scripts write their output to the working directory
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for teams, match_count in seasons:
+                matches = synthetic_season(teams, match_count)
+                matches.to_csv('tulokset.csv', index=False)
+                for name, function in season_benchmarks(matches, 'tulokset.csv').items():
+                    result = {'benchmark': name, 'teams': teams, 'matches': match_count, 'repeat': repeat,
+                              **measure(function, repeat)}
+                    print(f"{name:34} {teams:4} teams {match_count:8} matches  "
+                          f"{result['best_s'] * 1000:10.2f} ms  {result['peak_memory_bytes'] / 2**20:8.1f} MiB")
+                    results.append(result)
+
+            for filename in html_files:
+                name = f"extract_tables:{os.path.basename(filename)}"
+                result = {'benchmark': name, 'bytes': os.path.getsize(filename), 'repeat': repeat,
+                          **measure(lambda: extract_tables_from_file(filename), repeat)}
+                print(f"{name:34} {result['bytes']:8} bytes  "
+                      f"{result['best_s'] * 1000:10.2f} ms  {result['peak_memory_bytes'] / 2**20:8.1f} MiB")
+                results.append(result)
+        finally:
+            os.chdir(cwd)
+    return results
+
+def cold_start_benchmarks(repeat=3):
+    """Import time of every ykk subcommand in a fresh interpreter (-X importtime)"""
+    results = []
+    for name, timing in ykk.cold_starts(repeat).items():
+        result = {'benchmark': f"cold_start:{name}", 'repeat': repeat,
+                  'best_s': timing['best_ms'] / 1000, 'median_s': timing['median_ms'] / 1000,
+                  'wall_best_s': timing['wall_best_ms'] / 1000}
+        print(f"{result['benchmark']:34} {result['best_s'] * 1000:10.2f} ms imports  "
+              f"{result['wall_best_s'] * 1000:10.2f} ms wall")
+        results.append(result)
+    return results
+
+def _key(result):
+    return (result['benchmark'], result.get('teams'), result.get('matches'))
+
+def compare(results, baseline_file, threshold=1.25):
+    """Print the change against an earlier results file and return the regressed benchmarks"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {_key(result): result for result in json.load(f)['results']}
+    regressions = []
+    print(f"\n=== COMPARED TO {baseline_file} ===")
+    for result in results:
+        previous = baseline.get(_key(result))
+        if previous is None:
+            continue
+        ratio = result['best_s'] / previous['best_s'] if previous['best_s'] else float('inf')
+        marker = ""
+        if ratio > threshold and result['best_s'] > NOISE_FLOOR_S:
+            marker = "  REGRESSION"
+            regressions.append(result)
+        print(f"{result['benchmark']:34} {result.get('teams') or '':>4} {ratio:6.2f}x{marker}")
+    return regressions
+
+def save_results(results, filename=RESULTS_FILE):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({
+            'run_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Saved benchmark results to {filename}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the data-processing hot paths on synthetic seasons")
+    parser.add_argument("--max-matches", type=int, default=None,
+                        help="skip seasons larger than this many matches")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON results file")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    seasons = [season for season in SEASONS if args.max_matches is None or season[1] <= args.max_matches]
+    results = run_benchmarks(seasons, args.repeat) + cold_start_benchmarks(args.repeat)
+    save_results(results, args.output)
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        raise SystemExit(1)
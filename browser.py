@@ -0,0 +1,277 @@
+import asyncio
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from deadline import Latency, current_deadline
+from metrics import span
+from tulospalvelu_api import API_URL
+
+VIEWPORT = {"width": 1280, "height": 800}
+# DevTools endpoint of a warm browser_daemon.py to attach to instead of
+# launching Chromium, e.g. http://127.0.0.1:9222
+BROWSER_CDP_URL = os.environ.get("BROWSER_CDP_URL")
+CONNECT_TIMEOUT_MS = 5000
+# Seconds a page may take to become ready, until the loads of the running
+# process give enough samples to adapt (see AdaptiveTimeout)
+PAGE_TIMEOUT = float(os.environ.get("SCRAPER_PAGE_TIMEOUT", 60))
+
+# Page-load profiles. "full" loads the page the way a visitor's browser does.
+# "lean" only lets through the document, scripts and the XHR/fetch calls that
+# fill the tables; images, fonts, CSS, media and third-party trackers are
+# aborted and the debug screenshot is skipped. The DOM still carries img alt
+# attributes when the image itself is blocked.
+LOAD_PROFILES = {
+    "full": {
+        "block_resource_types": [],
+        "block_url_patterns": [],
+        "screenshot": True,
+    },
+    "lean": {
+        "block_resource_types": ["image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest", "ping"],
+        "block_url_patterns": [
+            "google-analytics.com",
+            "googletagmanager.com",
+            "doubleclick.net",
+            "cookiebot.com",
+            "leadfamly.com",
+            "plausible.",
+            "facebook.",
+            "tiktok.",
+            "adnxs.com",
+            "surveypal.com",
+        ],
+        "screenshot": False,
+    },
+}
+
+class NetworkStats:
+    """Counts requests, blocked requests and transferred bytes for a run"""
+
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes_transferred = 0
+
+    async def on_request_finished(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.bytes_transferred += sizes["responseHeadersSize"] + sizes["responseBodySize"]
+        except Exception:
+            # The page may already be gone when the size lookup arrives
+            pass
+
+    def summary(self):
+        return (f"{self.requests} requests, {self.blocked} blocked, "
+                f"{self.bytes_transferred / 1024:.1f} KiB transferred")
+
+def _should_block(request, profile):
+    if request.resource_type in profile["block_resource_types"]:
+        return True
+    url = request.url
+    return any(pattern in url for pattern in profile["block_url_patterns"])
+
+# Browsers attached over CDP; their pages open in the persistent default
+# context, whose HTTP cache is kept on disk between runs
+_warm_browsers = weakref.WeakSet()
+
+@asynccontextmanager
+async def shared_browser(headless=True, cdp_url=None):
+    """Launch Chromium once and share it between all page loads of a run.
+
+    With cdp_url (default $BROWSER_CDP_URL) the run attaches to an already
+    running browser instead, and launches its own only when that fails.
+    """
+    # Playwright is only imported by runs that use the browser
+    from playwright.async_api import async_playwright
+    cdp_url = cdp_url or BROWSER_CDP_URL
+    async with async_playwright() as p:
+        browser = None
+        if cdp_url:
+            try:
+                with span('browser_connect'):
+                    browser = await p.chromium.connect_over_cdp(cdp_url, timeout=CONNECT_TIMEOUT_MS)
+                _warm_browsers.add(browser)
+            except Exception as e:
+                print(f"Could not attach to the browser at {cdp_url}, launching one: {e}")
+        if browser is None:
+            with span('browser_launch'):
+                browser = await p.chromium.launch(headless=headless)
+        try:
+            yield browser
+        finally:
+            # Closing an attached browser only disconnects from it
+            await browser.close()
+
+async def _block_urls(page, load_profile, stats=None):
+    """Block the profile's URL patterns without request interception.
+
+    Routing a page turns off Chromium's HTTP cache, so warm pages block
+    through the DevTools protocol instead. Resource types cannot be blocked
+    that way; the cache serves them after the first load.
+    """
+    if load_profile["block_url_patterns"]:
+        session = await page.context.new_cdp_session(page)
+        await session.send("Network.enable")
+        await session.send("Network.setBlockedURLs",
+                           {"urls": [f"*{pattern}*" for pattern in load_profile["block_url_patterns"]]})
+    if stats is not None:
+        def on_request_failed(request):
+            if request.failure == "net::ERR_BLOCKED_BY_CLIENT":
+                stats.blocked += 1
+        page.on("requestfailed", on_request_failed)
+
+@asynccontextmanager
+async def open_page(browser, profile="full", stats=None):
+    """Open a page in its own browser context so parallel loads stay isolated.
+
+    Requests are filtered according to the named load profile and, when a
+    NetworkStats is given, counted into it. On an attached warm browser the
+    page opens in the persistent default context to use its disk cache.
+    """
+    load_profile = LOAD_PROFILES[profile]
+    if browser in _warm_browsers and browser.contexts:
+        page = await browser.contexts[0].new_page()
+        try:
+            await page.set_viewport_size(VIEWPORT)
+            await _block_urls(page, load_profile, stats)
+            if stats is not None:
+                page.on("requestfinished", stats.on_request_finished)
+            yield page
+        finally:
+            await page.close()
+        return
+
+    context = await browser.new_context(viewport=VIEWPORT)
+    try:
+        if load_profile["block_resource_types"] or load_profile["block_url_patterns"]:
+            async def handle_route(route):
+                if _should_block(route.request, load_profile):
+                    if stats is not None:
+                        stats.blocked += 1
+                    await route.abort()
+                else:
+                    await route.continue_()
+
+            await context.route("**/*", handle_route)
+
+        if stats is not None:
+            context.on("requestfinished", stats.on_request_finished)
+
+        page = await context.new_page()
+        yield page
+    finally:
+        await context.close()
+
+# Readiness checks evaluated in the page. A page is ready once the table that
+# gets parsed (the first one) has its header row and at least one data row,
+# instead of once every tracker and long-poll has gone quiet.
+TABLE_READY_JS = """
+() => {
+    const table = document.querySelector('table');
+    return !!table && !!table.querySelector('th') && !!table.querySelector('tr td');
+}
+"""
+MATCH_LINKS_READY_JS = "() => !!document.querySelector('a[href*=\"/match/\"]')"
+MATCH_HEADER_READY_JS = "() => !!document.querySelector('.match-header')"
+
+# XHR/fetch responses from the data API that fills the tables
+DATA_URL_PATTERN = urlsplit(API_URL).path.rstrip("/") + "/"
+
+class AdaptiveTimeout(Latency):
+    """Page-ready timeout that follows the ready times of the running process.
+
+    Until a few samples are known the initial timeout (PAGE_TIMEOUT) is
+    used. After that the timeout is factor times the 95th percentile of the
+    last ready times, kept between minimum and maximum seconds. A scraper
+    run loads the league table and fixtures once each, so those keep the
+    fixed timeout; Ottelu.py loading every match page adapts after the
+    first few.
+    """
+
+    def __init__(self, initial=None, minimum=10.0, maximum=None, factor=3.0, window=20):
+        super().__init__(window)
+        self.initial = initial or PAGE_TIMEOUT
+        self.minimum = minimum
+        self.maximum = maximum or PAGE_TIMEOUT
+        self.factor = factor
+
+    @property
+    def seconds(self):
+        p95 = self.p95
+        if p95 is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, p95 * self.factor))
+
+    @property
+    def ms(self):
+        return int(self.seconds * 1000)
+
+_page_timeouts = {}
+
+def page_timeout(page):
+    """Shared adaptive timeout of one kind of page ('league_table', 'fixtures', 'match')"""
+    if page not in _page_timeouts:
+        _page_timeouts[page] = AdaptiveTimeout()
+    return _page_timeouts[page]
+
+async def _settle(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def load_until_ready(page, url, name, ready_js=TABLE_READY_JS, data_pattern=DATA_URL_PATTERN,
+                           grace=2.0, timeout=None, **labels):
+    """Load url and return as soon as the page content is ready.
+
+    Ready means ready_js holds. When the data XHR arrives first, the table
+    gets grace seconds to render; a group without any matches never renders
+    a data row, so the load counts as ready after that anyway. Returns the
+    signal that ended the wait ('content' or 'data'). Within a run deadline
+    the wait is also cut to the page's share of the remaining time.
+
+    The whole wait is timed as a page_ready span and the navigation inside
+    it as a goto span; labels (e.g. competition) are added to both.
+    """
+    timeout = timeout or page_timeout(name)
+    limit = timeout.ms
+    deadline = current_deadline()
+    if deadline is not None:
+        budget = deadline.page_budget()
+        if budget < 1:
+            raise TimeoutError(f"Run deadline reached before loading {name}")
+        limit = min(limit, int(budget * 1000))
+    start = time.perf_counter()
+    with span('page_ready', page=name, **labels) as s:
+        data_loaded = asyncio.ensure_future(page.wait_for_event(
+            "response", predicate=lambda response: data_pattern in response.url, timeout=limit))
+        content_ready = None
+        try:
+            with span('goto', page=name, **labels):
+                await page.goto(url, wait_until="domcontentloaded", timeout=limit)
+            content_ready = asyncio.ensure_future(page.wait_for_function(ready_js, timeout=limit))
+            done, _ = await asyncio.wait({content_ready, data_loaded}, return_when=asyncio.FIRST_COMPLETED)
+            signal = 'content'
+            if content_ready not in done:
+                if data_loaded.exception() is None:
+                    signal = 'data'
+                    try:
+                        await asyncio.wait_for(asyncio.shield(content_ready), grace)
+                        signal = 'content'
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    # No data XHR seen (e.g. served from cache), so only the content counts
+                    await content_ready
+            else:
+                content_ready.result()
+            s.labels['signal'] = signal
+        finally:
+            await _settle([task for task in (data_loaded, content_ready) if task is not None and not task.done()])
+            for task in (data_loaded, content_ready):
+                if task is not None and task.done() and not task.cancelled():
+                    task.exception()
+    timeout.observe(time.perf_counter() - start)
+    return signal
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Scraper runs attach to the daemon when BROWSER_CDP_URL points at it
+DAEMON_PORT = 9222
+# Persistent profile; its HTTP cache keeps the SPA scripts between runs so
+# only the data requests go to the network
+PROFILE_DIR = ".browser-profile"
+CHECK_SECONDS = 5.0
+START_TIMEOUT = 30.0
+
+def cdp_url(port=DAEMON_PORT):
+    return f"http://127.0.0.1:{port}"
+
+def healthy(port=DAEMON_PORT, timeout=2.0):
+    """Whether a browser answers on the DevTools endpoint of port"""
+    try:
+        with urllib.request.urlopen(f"{cdp_url(port)}/json/version", timeout=timeout) as response:
+            return 'webSocketDebuggerUrl' in json.load(response)
+    except (OSError, ValueError):
+        return False
+
+def chromium_command(port=DAEMON_PORT, user_data_dir=PROFILE_DIR, headless=True):
+    # Playwright knows where its Chromium build is installed
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        executable = p.chromium.executable_path
+    command = [
+        executable,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={os.path.abspath(user_data_dir)}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-background-networking",
+        "--disable-dev-shm-usage",
+    ]
+    if headless:
+        command.append("--headless=new")
+    return command + ["about:blank"]
+
+class BrowserDaemon:
+    """Keeps one Chromium running with a persistent profile and restarts it
+    when the health check fails"""
+
+    def __init__(self, port=DAEMON_PORT, user_data_dir=PROFILE_DIR, check_seconds=CHECK_SECONDS, headless=True):
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.check_seconds = check_seconds
+        self.headless = headless
+        self.process = None
+        self.restarts = 0
+
+    def start(self):
+        if healthy(self.port):
+            raise RuntimeError(f"Another browser already listens on port {self.port}")
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        start = time.perf_counter()
+        self.process = subprocess.Popen(chromium_command(self.port, self.user_data_dir, self.headless),
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while time.perf_counter() - start < START_TIMEOUT:
+            if healthy(self.port):
+                print(f"Browser {self.process.pid} ready on {cdp_url(self.port)} "
+                      f"in {time.perf_counter() - start:.1f} s")
+                return
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"Browser did not come up on port {self.port}")
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def check(self, failures=2):
+        """Health check; a browser that died or stopped answering is restarted"""
+        if self.process is not None and self.process.poll() is None:
+            if any(healthy(self.port) for _ in range(failures)):
+                return True
+            print(f"Browser {self.process.pid} is not answering, restarting")
+        elif self.process is not None:
+            print(f"Browser exited with code {self.process.returncode}, restarting")
+        self.stop()
+        self.start()
+        self.restarts += 1
+        return False
+
+    def run(self):
+        self.start()
+        try:
+            while True:
+                time.sleep(self.check_seconds)
+                try:
+                    self.check()
+                except RuntimeError as e:
+                    # Keep trying: meanwhile runs launch a browser of their own
+                    print(f"Error restarting browser: {e}")
+        finally:
+            self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep a warm Chromium for scraper runs to attach to over CDP")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="DevTools port")
+    parser.add_argument("--user-data-dir", default=PROFILE_DIR, help="persistent browser profile with the HTTP cache")
+    parser.add_argument("--check-seconds", type=float, default=CHECK_SECONDS, help="time between health checks")
+    parser.add_argument("--headful", action="store_true", help="show the browser window")
+    parser.add_argument("--status", action="store_true", help="check whether the daemon is answering and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        ok = healthy(args.port)
+        print(f"{cdp_url(args.port)} is {'up' if ok else 'down'}")
+        sys.exit(0 if ok else 1)
+
+    # Stop the browser along with the daemon when the service manager stops it
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Attach scraper runs with BROWSER_CDP_URL={cdp_url(args.port)}")
+    try:
+        BrowserDaemon(args.port, args.user_data_dir, args.check_seconds, not args.headful).run()
+    except KeyboardInterrupt:
+        pass
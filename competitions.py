@@ -0,0 +1,61 @@
+import json
+import os
+import re
+
+# Can be pointed at replay_server.py with TULOSPALVELU_BASE_URL
+BASE_URL = os.environ.get("TULOSPALVELU_BASE_URL", "https://tulospalvelu.palloliitto.fi")
+REGISTRY_FILE = "competitions.json"
+OUTPUT_ROOT = "output"
+
+# Built-in competitions. More categories and groups (Kakkonen groups, cups,
+# other seasons) are added to competitions.json in the same format:
+#   {"kakkonen-a": {"name": "Kakkonen A", "competition_id": "...",
+#                   "category_id": "...", "group_id": "1"}}
+COMPETITIONS = {
+    "ykkonen": {
+        "name": "Ykkönen",
+        "competition_id": "spljp25",
+        "category_id": "M1L",
+        "group_id": "1",
+    },
+}
+DEFAULT_COMPETITION = "ykkonen"
+
+def load_registry(path=REGISTRY_FILE):
+    """Built-in competitions merged with the ones listed in competitions.json"""
+    registry = {key: dict(value, key=key) for key, value in COMPETITIONS.items()}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for key, value in json.load(f).items():
+                registry[key] = dict(value, key=key)
+    return registry
+
+def get_competition(key=DEFAULT_COMPETITION, registry=None):
+    registry = registry or load_registry()
+    if key not in registry:
+        raise KeyError(f"Unknown competition '{key}', known: {', '.join(sorted(registry))}")
+    return registry[key]
+
+def group_url(competition, page=""):
+    """Tulospalvelu URL of a competition group page ('' for the table, 'fixtures')"""
+    return (f"{BASE_URL}/category/{competition['category_id']}!{competition['competition_id']}"
+            f"/group/{competition['group_id']}/{page}")
+
+def season_competition(competition, season):
+    """The same competition in another season.
+
+    Torneopal competition ids end in the two-digit season year (spljp25 is
+    the 2025 Ykkönen), so other seasons only differ in that suffix.
+    """
+    if not re.search(r'\d{2}$', competition['competition_id']):
+        raise ValueError(f"Competition id '{competition['competition_id']}' has no season suffix")
+    return dict(competition,
+                competition_id=f"{competition['competition_id'][:-2]}{int(season) % 100:02d}",
+                name=f"{competition['name']} {season}",
+                season=int(season))
+
+def output_dir(competition, root=OUTPUT_ROOT):
+    """Per-competition output directory, with a subdirectory per season for past seasons"""
+    if 'season' in competition:
+        return os.path.join(root, competition['key'], str(competition['season']))
+    return os.path.join(root, competition['key'])
@@ -0,0 +1,130 @@
+import contextvars
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import contextmanager
+
+# End-to-end limit of one scraper run in seconds; 0 means no limit
+RUN_DEADLINE = float(os.environ.get("SCRAPER_DEADLINE", 240))
+
+# Deadline of the running scrape. Like the metrics recorder it follows
+# asyncio tasks and asyncio.to_thread calls, so every load sees the same one.
+_current = contextvars.ContextVar("run_deadline", default=None)
+
+class Deadline:
+    """End-to-end time limit of a run, shared out to its page loads.
+
+    Each load gets an equal share of the remaining time among the loads
+    still to come, run slots at a time, so one slow page cannot use up
+    the time of the pages after it.
+    """
+
+    def __init__(self, seconds=None, slots=1):
+        self.seconds = seconds or None
+        self.expires = None if self.seconds is None else time.monotonic() + self.seconds
+        self.slots = max(1, slots)
+        self.pages = 0
+
+    def remaining(self):
+        if self.expires is None:
+            return math.inf
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def plan(self, pages=1):
+        """Count pages that are still to be loaded"""
+        self.pages += pages
+
+    def page_done(self):
+        self.pages = max(0, self.pages - 1)
+
+    def page_budget(self):
+        """Seconds the next page load may take"""
+        waves = math.ceil(max(1, self.pages) / self.slots)
+        return self.remaining() / waves
+
+@contextmanager
+def running(deadline):
+    """Make deadline the limit of the loads inside the block"""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+def current_deadline():
+    return _current.get()
+
+def remaining():
+    """Seconds left of the running deadline, or inf outside one"""
+    deadline = _current.get()
+    return math.inf if deadline is None else deadline.remaining()
+
+def backoff(attempt, base=0.5, cap=8.0):
+    """Full-jitter exponential backoff: a random delay of up to base * 2**attempt seconds.
+
+    The jitter spreads the retries of concurrent loads so they do not hit
+    a struggling server at the same moment.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_call(function, retry_on=(Exception,), attempts=3, base=0.5, cap=8.0):
+    """Call function, retrying failures with jittered backoff while the run deadline allows"""
+    for attempt in range(attempts):
+        try:
+            return function()
+        except retry_on as e:
+            delay = backoff(attempt, base, cap)
+            if attempt == attempts - 1 or delay >= remaining():
+                raise
+            print(f"Retrying in {delay:.2f} s after: {e}")
+            time.sleep(delay)
+
+def hedged_call(executor, function, hedge_after=None):
+    """Run function on executor; if it has not finished after hedge_after
+    seconds, start a duplicate and return whichever succeeds first.
+
+    Returns (result, hedged). When both fail the first error is raised.
+    """
+    def submit():
+        # Executor threads do not inherit context variables such as the deadline
+        return executor.submit(contextvars.copy_context().run, function)
+
+    first = submit()
+    if hedge_after is None or wait([first], timeout=hedge_after).done:
+        return first.result(), False
+    pending = {first, submit()}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result(), True
+            error = error or future.exception()
+    raise error
+
+class Latency:
+    """Recent durations of one kind of request in the running process and their 95th percentile"""
+
+    def __init__(self, window=20, min_samples=3):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+
+    @property
+    def p95(self):
+        """95th percentile of the samples, or None until enough are known"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
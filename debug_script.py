@@ -1,14 +1,13 @@
 import asyncio
-from playwright.async_api import async_playwright
+from browser import open_page, shared_browser
 import time
 import os
 
 async def check_website_access():
     """Basic diagnostic check for website access"""
-    async with async_playwright() as p:
-        # IMPORTANT: Must use headless=True in GitHub Actions
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    # IMPORTANT: Must use headless=True in GitHub Actions. With
+    # BROWSER_CDP_URL set this attaches to the warm browser daemon instead.
+    async with shared_browser(headless=True) as browser, open_page(browser) as page:
         
         # First, check a known good site to verify internet access
         await page.goto('https://example.com', timeout=30000)
@@ -36,8 +35,6 @@ async def check_website_access():
             print("Successfully accessed tulospalvelu.palloliitto.fi")
         except Exception as e:
             print(f"Error accessing tulospalvelu.palloliitto.fi: {e}")
-            
-        await browser.close()
 
 if __name__ == "__main__":
     print(f"Starting diagnostics at {time.strftime('%Y-%m-%d %H:%M:%S')}")
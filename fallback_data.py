@@ -1,9 +1,37 @@
-import pandas as pd
-import json
-from datetime import datetime
+import argparse
 import os
+import sqlite3
+from datetime import datetime
+from history import HISTORY_FILE, History
+from manifest import Manifest
+from store import DataStore, has_store
+from views import VIEWS, refresh_views
+
+# History table holding each stored dataset
+HISTORY_TABLES = {'sarjataulukko': 'standings', 'ottelut': 'fixtures'}
 
-def create_fallback_files():
+def last_good_records(dataset, history_file=HISTORY_FILE):
+    """(taken_at, records) of the newest snapshot of the default competition
+    that holds the dataset, or None"""
+    if not history_file or not os.path.exists(history_file):
+        return None
+    try:
+        with History(history_file) as history:
+            return history.latest_records(HISTORY_TABLES[dataset])
+    except sqlite3.Error as e:
+        print(f"Error reading history {history_file}: {e}")
+        return None
+
+def existing_datasets():
+    """Datasets already in the data store or in their output files"""
+    existing = {dataset for dataset, views in VIEWS.items()
+                if any(os.path.exists(filename) for filename, _ in views)}
+    if has_store():
+        with DataStore() as store:
+            existing |= {dataset for dataset in VIEWS if store.version(dataset) is not None}
+    return existing
+
+def create_fallback_files(history_file=HISTORY_FILE):
     """Create fallback data files when scraping fails"""
     print("Creating fallback data files...")
     
@@ -32,53 +60,56 @@ def create_fallback_files():
         {"Pelipäivä": "14.04.2025", "Klo": "18:30", "Koti": "KTP", "Vieras": "JIPPO", "Kotitulos": "3", "Vierastulos": "0", "Paikka": "Arto Tolsa Areena"}
     ]
     
-    # Convert to DataFrames
-    league_df = pd.DataFrame(league_table)
-    fixtures_df = pd.DataFrame(fixtures)
-    
-    # Save to CSV
-    league_df.to_csv('Sarjataulukko.csv', index=False, encoding='utf-8')
-    fixtures_df.to_csv('Ottelut.csv', index=False, encoding='utf-8')
-    fixtures_df.to_csv('tulokset.csv', index=False, encoding='utf-8')
-    fixtures_df.to_csv('PelatutOttelut.csv', index=False, encoding='utf-8')
+    # Data that is already there is left alone: a run that failed wrote
+    # nothing, so the store and the files still hold the last good scrape.
+    # Missing data comes from the newest snapshot in the history that holds
+    # it, and the hard-coded data is the last resort.
+    existing = existing_datasets()
+    fallback = {'sarjataulukko': league_table, 'ottelut': fixtures}
+    sources = []
+    for dataset in VIEWS:
+        if dataset in existing:
+            print(f"Keeping the existing {dataset} data")
+            fallback.pop(dataset)
+            continue
+        snapshot = last_good_records(dataset, history_file)
+        if snapshot is not None:
+            taken_at, fallback[dataset] = snapshot
+            sources.append(f"{dataset} from the snapshot of {taken_at}")
+            print(f"Serving {dataset} from the last good snapshot of {taken_at}")
+        else:
+            sources.append(f"fallback {dataset}")
     
-    # Save as JSON for better readability
-    with open('Sarjataulukko.json', 'w', encoding='utf-8') as f:
-        json.dump(league_table, f, ensure_ascii=False, indent=2)
+    if not fallback:
+        print("Fallback data files are not needed, the existing data is kept")
+        return True
     
-    with open('Ottelut.json', 'w', encoding='utf-8') as f:
-        json.dump(fixtures, f, ensure_ascii=False, indent=2)
+    # Only files whose content differs from the last run are rewritten
+    manifest = Manifest()
     
-    # Create Markdown files
-    with open('Sarjataulukko.md', 'w', encoding='utf-8') as f:
-        f.write('# Sarjataulukko - Ykkönen\n\n')
-        f.write('| Sij. | Joukkue | O | V | T | H | TM | PM | ME | P |\n')
-        f.write('| ---- | ------- | - | - | - | - | -- | -- | -- | - |\n')
-        
-        for team in league_table:
-            f.write(f"| {team['Sijoitus']} | {team['Joukkue']} | {team['Ottelut']} | {team['Voitot']} | {team['Tasapelit']} | ")
-            f.write(f"{team['Tappiot']} | {team['Tehdyt maalit']} | {team['Päästetyt maalit']} | ")
-            f.write(f"{team['Maaliero']} | {team['Pisteet']} |\n")
+    # Store the records once and derive the CSV, JSON and Markdown files from the store
+    with DataStore() as store:
+        for dataset, records in fallback.items():
+            store.replace(dataset, records)
+        refresh_views(store, manifest, list(fallback))
     
-    with open('PelatutOttelut.md', 'w', encoding='utf-8') as f:
-        f.write('# Ottelut - Ykkönen\n\n')
-        f.write('| Päivä | Aika | Koti | Vieras | Tulos | Paikka |\n')
-        f.write('| ----- | ---- | ---- | ------ | ----- | ------ |\n')
-        
-        for match in fixtures:
-            tulos = ""
-            if match['Kotitulos'] and match['Vierastulos']:
-                tulos = f"{match['Kotitulos']}-{match['Vierastulos']}"
-            
-            f.write(f"| {match['Pelipäivä']} | {match['Klo']} | {match['Koti']} | {match['Vieras']} | {tulos} | {match['Paikka']} |\n")
+    if not manifest.dirty:
+        print("Fallback data files are already up to date")
+        return True
     
     # Update timestamp
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     with open('timestamp.txt', 'w') as f:
-        f.write(f"{timestamp} (Fallback data)")
+        f.write(f"{timestamp} ({', '.join(sources)})")
+    manifest.save()
     
     print("Created fallback data files successfully")
     return True
 
 if __name__ == "__main__":
-    create_fallback_files()
+    parser = argparse.ArgumentParser(description="Write data that is missing from the last good snapshot, "
+                                                 "or from the hard-coded data without one")
+    parser.add_argument("--history", default=os.environ.get("SCRAPER_HISTORY_FILE", HISTORY_FILE),
+                        help="SQLite history the last good snapshot is read from ('' to disable)")
+    args = parser.parse_args()
+    create_fallback_files(args.history)
@@ -0,0 +1,139 @@
+import csv
+import math
+import os
+from datetime import datetime
+import render
+from manifest import write_output
+from store import STORE_FILE, DataStore, has_store
+
+# Inputs up to this size are handled with the csv module alone; the pandas
+# import costs more than the whole job for a season of a few hundred matches
+FAST_PATH_ROWS = 5000
+FAST_PATH_BYTES = 512 * 1024
+
+MATCH_COLUMNS = ['Row', 'Pelipäivä', 'Klo', 'Koti', 'Vieras', 'Kotitulos', 'Vierastulos', 'Paikka']
+STANDINGS_COLUMNS = ['Ottelut', 'Voitot', 'Tasapelit', 'Tappiot',
+                     'Tehdyt maalit', 'Päästetyt maalit', 'Maaliero', 'Pisteet']
+
+def small_matches(input_file='tulokset.csv'):
+    """(source, match rows as dicts of strings) when the input is small match data, else None.
+
+    Reads the data store first and tulokset.csv without one, the same order
+    as the pandas scripts. A CSV with columns outside the match schema is
+    left to those scripts.
+    """
+    if has_store():
+        with DataStore() as store:
+            if store.version('ottelut') is None:
+                return None
+            count = store.connection.execute("SELECT COUNT(*) FROM ottelut").fetchone()[0]
+            if count > FAST_PATH_ROWS:
+                return None
+            rows = [{key: str(value) for key, value in record.items()} for record in store.records('ottelut')]
+        return (STORE_FILE, rows) if rows else None
+    if not os.path.exists(input_file) or os.path.getsize(input_file) > FAST_PATH_BYTES:
+        return None
+    with open(input_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        if 'Koti' not in (reader.fieldnames or []) or 'Vieras' not in reader.fieldnames:
+            return None
+        # pandas infers the type of other columns, which text cannot mirror
+        if any(column not in MATCH_COLUMNS for column in reader.fieldnames):
+            return None
+        rows = [{column: row[column] or '' for column in reader.fieldnames} for row in reader]
+    return (input_file, rows) if rows else None
+
+def score(value):
+    """Whole-number score, or None when missing or not a number"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if math.isfinite(number) else None
+
+def standings(matches):
+    """League table rows (team, position, counters...) in compute_standings order"""
+    teams = {}
+    for side in ('Koti', 'Vieras'):
+        for match in matches:
+            if match.get(side):
+                teams.setdefault(match[side], [0] * 6)
+    for match in matches:
+        home, away = match.get('Koti'), match.get('Vieras')
+        home_goals, away_goals = score(match.get('Kotitulos')), score(match.get('Vierastulos'))
+        if not home or not away or home_goals is None or away_goals is None:
+            continue
+        for team, goals_for, goals_against in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+            counters = teams[team]
+            counters[0] += 1
+            counters[1] += goals_for > goals_against
+            counters[2] += goals_for == goals_against
+            counters[3] += goals_for < goals_against
+            counters[4] += goals_for
+            counters[5] += goals_against
+
+    table = []
+    for team, (played, won, drawn, lost, goals_for, goals_against) in teams.items():
+        table.append([team, played, won, drawn, lost, goals_for, goals_against,
+                      goals_for - goals_against, 3 * won + drawn])
+    table.sort(key=lambda row: (-row[8], -row[7], -row[5], row[0]))
+    return [[team, position] + counters for position, (team, *counters) in enumerate(table, 1)]
+
+def write_standings(input_file='tulokset.csv'):
+    """Write Sarjataulukko.csv and .md from small match data; False when the input is not small"""
+    source = small_matches(input_file)
+    if source is None:
+        return False
+    source, matches = source
+    print(f"Read data from {source}: {len(matches)} rows (fast path)")
+    table = standings(matches)
+    columns = [[str(value) for value in column] for column in zip(*table)] if table else [[] for _ in range(10)]
+    teams, positions, counters = columns[0], columns[1], columns[2:]
+    write_output('Sarjataulukko.csv', render.csv_text([''] + ['Sijoitus'] + STANDINGS_COLUMNS,
+                                                      [teams, positions] + counters))
+    write_output('Sarjataulukko.md', render.markdown(
+        ['Sij.', 'Joukkue', 'O', 'V', 'T', 'H', 'TM', 'PM', 'ME', 'P'], [positions, teams] + counters,
+        title='Sarjataulukko',
+        separator='| ---- | ------- | - | - | - | - | -- | -- | -- | - |\n'))
+    return True
+
+def _order_key(match):
+    """Sort key of sort_matches: date, then the Klo text, undated matches and missing times last"""
+    try:
+        day = datetime.strptime(match.get('Pelipäivä', ''), '%d.%m.%Y')
+    except ValueError:
+        day = None
+    clock = match.get('Klo', '')
+    return day is None, day or datetime.min, clock == '', clock
+
+def _cell(column, value):
+    """CSV text of a value as the typed pandas columns write it"""
+    if column in ('Row', 'Kotitulos', 'Vierastulos'):
+        number = score(value)
+        return '' if number is None else str(number)
+    return value
+
+def write_played_matches(input_file='tulokset.csv'):
+    """Write PelatutOttelut.csv and .md from small match data; False when the input is not small"""
+    source = small_matches(input_file)
+    if source is None:
+        return False
+    source, matches = source
+    print(f"Read {len(matches)} rows from {source} (fast path)")
+    header = list(matches[0]) if matches else []
+    keys = [_order_key(match) for match in matches]
+    # The sort is stable like sort_matches
+    order = sorted(range(len(matches)), key=keys.__getitem__)
+    rows = [{column: _cell(column, matches[i].get(column, '')) for column in header} for i in order]
+
+    write_output('PelatutOttelut.csv', render.csv_text(header, [[row[column] for row in rows] for column in header]))
+    cells = {column: [row.get(column, '') for row in rows] for column in
+             ('Pelipäivä', 'Klo', 'Koti', 'Vieras', 'Kotitulos', 'Vierastulos', 'Paikka')}
+    results = [f"{home}-{away}" for home, away in zip(cells['Kotitulos'], cells['Vierastulos'])] \
+        if 'Kotitulos' in header else [''] * len(rows)
+    write_output('PelatutOttelut.md', render.markdown(
+        ['Päivä', 'Aika', 'Koti', 'Vieras', 'Tulos', 'Paikka'],
+        [cells['Pelipäivä'], cells['Klo'], cells['Koti'], cells['Vieras'], results, cells['Paikka']],
+        title='Pelatut ottelut',
+        separator='| ----- | ---- | ---- | ------ | ----- | ------ |\n'))
+    return True
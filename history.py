@@ -0,0 +1,295 @@
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+from competitions import DEFAULT_COMPETITION
+
+HISTORY_FILE = "history.sqlite"
+# pandas is imported inside the functions that use it, so reading the last
+# good snapshot (fallback_data.py) and an unchanged scrape do not load it
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    competition TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    taken_on TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS standings (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    competition TEXT NOT NULL,
+    taken_on TEXT NOT NULL,
+    team TEXT NOT NULL,
+    position INTEGER,
+    played INTEGER,
+    won INTEGER,
+    drawn INTEGER,
+    lost INTEGER,
+    goals_for INTEGER,
+    goals_against INTEGER,
+    goal_difference INTEGER,
+    points INTEGER
+);
+CREATE TABLE IF NOT EXISTS fixtures (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    competition TEXT NOT NULL,
+    taken_on TEXT NOT NULL,
+    match_date TEXT,
+    kickoff TEXT,
+    home TEXT,
+    away TEXT,
+    home_goals INTEGER,
+    away_goals INTEGER,
+    venue TEXT
+);
+CREATE TABLE IF NOT EXISTS result_changes (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    competition TEXT NOT NULL,
+    taken_on TEXT NOT NULL,
+    match_date TEXT,
+    home TEXT,
+    away TEXT,
+    previous_home_goals INTEGER,
+    previous_away_goals INTEGER,
+    home_goals INTEGER,
+    away_goals INTEGER
+);
+CREATE INDEX IF NOT EXISTS standings_team_date ON standings (team, taken_on);
+CREATE INDEX IF NOT EXISTS standings_competition_snapshot ON standings (competition, snapshot_id);
+CREATE INDEX IF NOT EXISTS fixtures_competition_snapshot ON fixtures (competition, snapshot_id);
+CREATE INDEX IF NOT EXISTS result_changes_competition_date ON result_changes (competition, taken_on);
+CREATE INDEX IF NOT EXISTS snapshots_competition_date ON snapshots (competition, taken_on);
+"""
+
+# Scraped columns of each history table
+STANDINGS_COLUMNS = {
+    'team': 'Joukkue',
+    'position': 'Sijoitus',
+    'played': 'Ottelut',
+    'won': 'Voitot',
+    'drawn': 'Tasapelit',
+    'lost': 'Tappiot',
+    'goals_for': 'Tehdyt maalit',
+    'goals_against': 'Päästetyt maalit',
+    'goal_difference': 'Maaliero',
+    'points': 'Pisteet',
+}
+FIXTURE_COLUMNS = {
+    'match_date': 'Pelipäivä',
+    'kickoff': 'Klo',
+    'home': 'Koti',
+    'away': 'Vieras',
+    'home_goals': 'Kotitulos',
+    'away_goals': 'Vierastulos',
+    'venue': 'Paikka',
+}
+INTEGER_COLUMNS = {'position', 'played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against',
+                   'goal_difference', 'points', 'home_goals', 'away_goals'}
+
+def _iso_date(value):
+    """dd.mm.yyyy as yyyy-mm-dd so dates sort and compare as text"""
+    import pandas as pd
+    parsed = pd.to_datetime(value, format='%d.%m.%Y', errors='coerce')
+    if pd.isna(parsed):
+        parsed = pd.to_datetime(value, dayfirst=True, errors='coerce')
+    return None if pd.isna(parsed) else parsed.strftime('%Y-%m-%d')
+
+def _rows(frame, columns):
+    """Column lists of a scraped frame as typed database values"""
+    import pandas as pd
+    values = []
+    for column, source in columns.items():
+        if source not in frame.columns:
+            values.append([None] * len(frame))
+        elif column in INTEGER_COLUMNS:
+            numbers = pd.to_numeric(frame[source], errors='coerce')
+            values.append([None if pd.isna(number) else int(number) for number in numbers])
+        elif column == 'match_date':
+            dates = pd.to_datetime(frame[source], format='%d.%m.%Y', errors='coerce')
+            values.append([None if pd.isna(date) else date.strftime('%Y-%m-%d') for date in dates])
+        else:
+            values.append([None if pd.isna(value) else str(value).strip() for value in frame[source]])
+    return values
+
+def _record_value(column, value):
+    """Scraped record string of a database value"""
+    if value is None:
+        return ""
+    if column == 'match_date':
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%d.%m.%Y')
+    return str(value)
+
+class History:
+    """Append-only SQLite history of every scraped league table and fixture list"""
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def append(self, competition, league_table=None, fixtures=None, taken_at=None):
+        """Store one snapshot of a competition with bulk inserts; returns the snapshot id"""
+        import pandas as pd
+        taken_at = taken_at or datetime.now()
+        taken_on = taken_at.strftime('%Y-%m-%d')
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO snapshots (competition, taken_at, taken_on) VALUES (?, ?, ?)",
+                (competition, taken_at.isoformat(timespec='seconds'), taken_on))
+            snapshot_id = cursor.lastrowid
+            prefix = (snapshot_id, competition, taken_on)
+            if league_table is not None and len(league_table):
+                columns = _rows(pd.DataFrame(league_table), STANDINGS_COLUMNS)
+                self.connection.executemany(
+                    f"INSERT INTO standings (snapshot_id, competition, taken_on, {', '.join(STANDINGS_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(STANDINGS_COLUMNS) + 3))})",
+                    [prefix + row for row in zip(*columns)])
+            if fixtures is not None and len(fixtures):
+                columns = _rows(pd.DataFrame(fixtures), FIXTURE_COLUMNS)
+                rows = list(zip(*columns))
+                self.connection.executemany(
+                    "INSERT INTO result_changes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [prefix + change for change in self._changed_results(competition, snapshot_id, rows)])
+                self.connection.executemany(
+                    f"INSERT INTO fixtures (snapshot_id, competition, taken_on, {', '.join(FIXTURE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(FIXTURE_COLUMNS) + 3))})",
+                    [prefix + row for row in rows])
+        return snapshot_id
+
+    def _changed_results(self, competition, snapshot_id, rows):
+        """Scores that differ from the previous fixtures snapshot of the competition.
+
+        The comparison is done once on insert so result_changes() is an
+        index lookup instead of a scan over every stored fixture.
+        """
+        previous = self.connection.execute(
+            "SELECT match_date, home, away, home_goals, away_goals FROM fixtures "
+            "WHERE competition = ? AND snapshot_id = (SELECT MAX(snapshot_id) FROM fixtures "
+            "WHERE competition = ? AND snapshot_id < ?)", (competition, competition, snapshot_id)).fetchall()
+        if not previous:
+            return []
+        scores = {row[:3]: row[3:] for row in previous}
+        changes = []
+        for match_date, _, home, away, home_goals, away_goals, _ in rows:
+            before = scores.get((match_date, home, away), (None, None))
+            if before != (home_goals, away_goals):
+                changes.append((match_date, home, away) + before + (home_goals, away_goals))
+        return changes
+
+    def latest_records(self, table, competition=DEFAULT_COMPETITION):
+        """(taken_at, records) of the newest snapshot that holds rows of table
+        ('standings' or 'fixtures'), as scraped string records, or None.
+
+        A partial run stores a snapshot without one of the tables, so the
+        newest snapshot overall may not have the rows asked for.
+        """
+        columns = {'standings': STANDINGS_COLUMNS, 'fixtures': FIXTURE_COLUMNS}[table]
+        row = self.connection.execute(
+            f"SELECT s.id, s.taken_at FROM snapshots s WHERE s.competition = ? AND EXISTS "
+            f"(SELECT 1 FROM {table} t WHERE t.competition = s.competition AND t.snapshot_id = s.id) "
+            f"ORDER BY s.id DESC LIMIT 1",
+            (competition,)).fetchone()
+        if row is None:
+            return None
+        snapshot_id, taken_at = row
+        # Rows were inserted in scraped order
+        rows = self.connection.execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE snapshot_id = ? ORDER BY rowid",
+            (snapshot_id,)).fetchall()
+        return taken_at, [{name: _record_value(column, value) for (column, name), value in zip(columns.items(), row)}
+                          for row in rows]
+
+    def _query(self, sql, params=()):
+        import pandas as pd
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def team_trajectory(self, team, competition=DEFAULT_COMPETITION, start=None, end=None):
+        """Position and points of a team in every snapshot, oldest first"""
+        return self._query(
+            "SELECT taken_on AS Päivä, position AS Sijoitus, played AS Ottelut, points AS Pisteet "
+            "FROM standings WHERE team = ? AND taken_on BETWEEN ? AND ? AND competition = ? "
+            "ORDER BY taken_on, snapshot_id",
+            (team, _iso_date(start) if start else '0000-00-00', _iso_date(end) if end else '9999-99-99',
+             competition))
+
+    def _snapshot_on(self, table, date, competition):
+        """Newest snapshot taken on or before date that holds rows of table"""
+        row = self.connection.execute(
+            f"SELECT s.id FROM snapshots s WHERE s.competition = ? AND s.taken_on <= ? AND EXISTS "
+            f"(SELECT 1 FROM {table} t WHERE t.competition = s.competition AND t.snapshot_id = s.id) "
+            f"ORDER BY s.taken_on DESC, s.id DESC LIMIT 1", (competition, _iso_date(date))).fetchone()
+        return row[0] if row else None
+
+    def table_on(self, date, competition=DEFAULT_COMPETITION):
+        """League table of the last snapshot taken on or before date that has one"""
+        snapshot_id = self._snapshot_on('standings', date, competition)
+        columns = ', '.join(f'{column} AS "{name}"' for column, name in STANDINGS_COLUMNS.items())
+        return self._query(f"SELECT {columns} FROM standings WHERE competition = ? AND snapshot_id = ? "
+                           f"ORDER BY position", (competition, snapshot_id))
+
+    def position_on(self, team, date, competition=DEFAULT_COMPETITION):
+        """A team's position in the last snapshot taken on or before date, or None"""
+        row = self.connection.execute(
+            "SELECT position FROM standings WHERE team = ? AND taken_on <= ? AND competition = ? "
+            "ORDER BY taken_on DESC, snapshot_id DESC LIMIT 1",
+            (team, _iso_date(date), competition)).fetchone()
+        return row[0] if row else None
+
+    def result_changes(self, competition=DEFAULT_COMPETITION, since=None, team=None):
+        """New and corrected results, with the score of the previous snapshot"""
+        sql = ("SELECT taken_on AS Päivä, match_date AS Pelipäivä, home AS Koti, away AS Vieras, "
+               "previous_home_goals AS \"Edellinen kotitulos\", previous_away_goals AS \"Edellinen vierastulos\", "
+               "home_goals AS Kotitulos, away_goals AS Vierastulos "
+               "FROM result_changes WHERE competition = ? AND taken_on >= ?")
+        params = [competition, _iso_date(since) if since else '0000-00-00']
+        if team:
+            sql += " AND (home = ? OR away = ?)"
+            params += [team, team]
+        changes = self._query(sql + " ORDER BY taken_on, snapshot_id, match_date", params)
+        scores = ['Edellinen kotitulos', 'Edellinen vierastulos', 'Kotitulos', 'Vierastulos']
+        return changes.astype({column: 'Int64' for column in scores})
+
+def record_snapshot(competition, league_table=None, fixtures=None, path=HISTORY_FILE):
+    """Append one run's data of a competition to the history database"""
+    with History(path) as history:
+        start = time.perf_counter()
+        snapshot_id = history.append(competition, league_table, fixtures)
+        print(f"Recorded history snapshot {snapshot_id} of {competition} "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return snapshot_id
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the history of scraped snapshots")
+    parser.add_argument("--database", default=HISTORY_FILE)
+    parser.add_argument("--competition", default=DEFAULT_COMPETITION)
+    commands = parser.add_subparsers(dest="command", required=True)
+    trajectory = commands.add_parser("trajectory", help="position and points of a team over time")
+    trajectory.add_argument("team")
+    position = commands.add_parser("position", help="position of a team on a date (dd.mm.yyyy)")
+    position.add_argument("team")
+    position.add_argument("date")
+    table = commands.add_parser("table", help="league table on a date (dd.mm.yyyy)")
+    table.add_argument("date")
+    changes = commands.add_parser("changes", help="new and corrected results")
+    changes.add_argument("--since", help="only changes seen on or after this date")
+    changes.add_argument("--team", help="only matches of this team")
+    args = parser.parse_args()
+
+    with History(args.database) as history:
+        if args.command == "trajectory":
+            print(history.team_trajectory(args.team, args.competition).to_string(index=False))
+        elif args.command == "position":
+            print(history.position_on(args.team, args.date, args.competition))
+        elif args.command == "table":
+            print(history.table_on(args.date, args.competition).to_string(index=False))
+        else:
+            print(history.result_changes(args.competition, args.since, args.team).to_string(index=False))
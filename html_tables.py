@@ -0,0 +1,98 @@
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+                 'meta', 'param', 'source', 'track', 'wbr'}
+
+class _TableParser(HTMLParser):
+    """Collects every table of a document in the structure of scraper.extract_tables().
+
+    Rows follow the same 'tr:not(:first-child)' selection, so the first row
+    of each thead/tbody is skipped just like in the browser.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        # Open elements as [tag, element children seen so far]
+        self._stack = []
+        self._open_tables = []
+        self._row = None
+        self._cell = None
+        self._header = None
+
+    def handle_starttag(self, tag, attrs):
+        first_child = True
+        if self._stack:
+            first_child = self._stack[-1][1] == 0
+            self._stack[-1][1] += 1
+
+        if tag == 'table':
+            table = {'headers': [], 'rows': []}
+            self.tables.append(table)
+            self._open_tables.append(table)
+        elif tag == 'tr' and self._open_tables and not first_child:
+            self._row = {'cells': [], 'links': []}
+            self._open_tables[-1]['rows'].append(self._row)
+        elif tag == 'th' and self._open_tables:
+            self._header = []
+        elif tag == 'td' and self._row is not None:
+            self._cell = {'text': [], 'alt': None, 'has_img': False}
+            self._row['cells'].append(self._cell)
+        elif tag == 'img' and self._cell is not None and not self._cell['has_img']:
+            self._cell['has_img'] = True
+            self._cell['alt'] = dict(attrs).get('alt')
+        elif tag == 'a' and self._row is not None:
+            href = dict(attrs).get('href')
+            if href and '/match/' in href:
+                self._row['links'].append(href)
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append([tag, 0])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS or not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, _ = self._stack.pop()
+            self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        if tag == 'table' and self._open_tables:
+            self._open_tables.pop()
+            self._row = self._cell = self._header = None
+        elif tag == 'tr':
+            self._row = None
+        elif tag == 'td' and self._cell is not None:
+            self._cell = {'text': ''.join(self._cell['text']), 'alt': self._cell['alt']}
+            self._row['cells'][-1] = self._cell
+            self._cell = None
+        elif tag == 'th' and self._header is not None:
+            self._open_tables[-1]['headers'].append(''.join(self._header).strip())
+            self._header = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell['text'].append(data)
+        if self._header is not None:
+            self._header.append(data)
+
+def extract_tables_from_html(html):
+    """Extract every table of a saved page without a browser"""
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    # Close whatever the document left open
+    while parser._stack:
+        parser._close(parser._stack.pop()[0])
+    return parser.tables
+
+def extract_tables_from_file(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return extract_tables_from_html(f.read())
@@ -0,0 +1,215 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from competitions import DEFAULT_COMPETITION, get_competition, output_dir
+from history import HISTORY_FILE, record_snapshot
+from manifest import Manifest
+from store import DataStore
+from tulospalvelu_api import TulospalveluClient, map_fixtures, map_league_table
+from views import refresh_views
+
+EVENTS_FILE = "live_events.jsonl"
+FIXTURES_FILE = "Ottelut.csv"
+# Kickoff times in Ottelut.csv are Finnish local time
+TIMEZONE = ZoneInfo("Europe/Helsinki")
+
+# Two halves, half time and stoppage time
+MATCH_LENGTH = timedelta(minutes=110)
+# Goals and status changes cluster around kickoff and full time
+WINDOW = timedelta(minutes=10)
+FAST_SECONDS = 15.0
+LIVE_SECONDS = 60.0
+IDLE_MAX_SECONDS = 3600.0
+
+def parse_kickoff(date, clock):
+    """Aware kickoff time from Pelipäivä and Klo, or None when either is missing"""
+    try:
+        return datetime.strptime(f"{date} {clock}", '%d.%m.%Y %H:%M').replace(tzinfo=TIMEZONE)
+    except ValueError:
+        return None
+
+def load_kickoffs(filename):
+    """Kickoff times of the fixtures in a fixtures CSV"""
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        kickoffs = [parse_kickoff(row.get('Pelipäivä', ''), row.get('Klo', '')) for row in csv.DictReader(f)]
+    return sorted(kickoff for kickoff in kickoffs if kickoff is not None)
+
+def schedule(now, kickoffs, fast=FAST_SECONDS, live=LIVE_SECONDS, idle_max=IDLE_MAX_SECONDS):
+    """(mode, seconds until the next poll) for the time now.
+
+    'fast' around a kickoff or full time, 'live' while a match is being
+    played and 'idle' until the window of the next kickoff opens, at most
+    idle_max seconds at a time. (None, None) when no match is left.
+    """
+    in_play, until_window = False, None
+    for kickoff in kickoffs:
+        full_time = kickoff + MATCH_LENGTH
+        if kickoff - WINDOW <= now <= kickoff + WINDOW or full_time - WINDOW <= now <= full_time + WINDOW:
+            return 'fast', fast
+        if kickoff < now < full_time:
+            in_play = True
+        elif now < kickoff - WINDOW:
+            seconds = (kickoff - WINDOW - now).total_seconds()
+            until_window = seconds if until_window is None else min(until_window, seconds)
+    if in_play:
+        return 'live', live if until_window is None else min(live, until_window)
+    if until_window is not None:
+        return 'idle', min(idle_max, until_window)
+    return None, None
+
+def match_key(fixture):
+    return fixture['Pelipäivä'], fixture['Koti'], fixture['Vieras']
+
+def snapshot(group):
+    """League table, fixtures and {match key: (fixture, status)} of an API group"""
+    league_table, fixtures = map_league_table(group), map_fixtures(group)
+    statuses = [str(match.get('status') or '') for match in group.get('matches', [])]
+    return league_table, fixtures, {match_key(fixture): (fixture, status)
+                                    for fixture, status in zip(fixtures, statuses)}
+
+def _score(fixture):
+    home, away = fixture['Kotitulos'], fixture['Vierastulos']
+    return f"{home}-{away}" if home != "" or away != "" else ""
+
+def diff_matches(previous, current, competition_key, at):
+    """Score and status change events between two match snapshots"""
+    events = []
+    for key, (fixture, status) in current.items():
+        before = previous.get(key)
+        base = {'at': at, 'competition': competition_key, 'Pelipäivä': fixture['Pelipäivä'],
+                'Klo': fixture['Klo'], 'Koti': fixture['Koti'], 'Vieras': fixture['Vieras']}
+        if before is None:
+            events.append({**base, 'type': 'status', 'previous': None, 'current': status})
+            continue
+        if _score(before[0]) != _score(fixture):
+            events.append({**base, 'type': 'score', 'previous': _score(before[0]), 'current': _score(fixture)})
+        if before[1] != status:
+            events.append({**base, 'type': 'status', 'previous': before[1], 'current': status})
+    return events
+
+def write_events(events, events_file=EVENTS_FILE):
+    """Append events as JSON lines; '-' writes them to stdout"""
+    lines = ''.join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+    if events_file == '-':
+        sys.stdout.write(lines)
+        sys.stdout.flush()
+    else:
+        with open(events_file, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+class LiveFeed:
+    """Follows one competition poll by poll and keeps the last snapshot in memory"""
+
+    def __init__(self, competition, directory="", events_file=EVENTS_FILE, history_file=HISTORY_FILE, client=None):
+        self.competition = competition
+        self.directory = directory
+        self.events_file = events_file
+        self.history_file = history_file
+        # The ETag cache is kept in memory; an unchanged group costs one 304
+        self.client = client or TulospalveluClient(cache_file=None)
+        self.league_table = None
+        self.matches = None
+        self.kickoffs = load_kickoffs(os.path.join(directory, FIXTURES_FILE))
+
+    def poll(self):
+        """Fetch the group once; returns the change events, writing only when there are changes"""
+        data, changed = self.client.get_json('getGroup', competition_id=self.competition['competition_id'],
+                                             category_id=self.competition['category_id'],
+                                             group_id=self.competition['group_id'], matches=1)
+        if not changed and self.matches is not None:
+            return []
+        league_table, fixtures, matches = snapshot(data.get('group', data))
+        at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        first = self.matches is None
+        events = [] if first else diff_matches(self.matches, matches, self.competition['key'], at)
+        table_changed = league_table != self.league_table
+        self.league_table, self.matches = league_table, matches
+        kickoffs = [parse_kickoff(fixture['Pelipäivä'], fixture['Klo']) for fixture in fixtures]
+        self.kickoffs = sorted(kickoff for kickoff in kickoffs if kickoff is not None) or self.kickoffs
+
+        if events:
+            write_events(events, self.events_file)
+        if first or events or table_changed:
+            self.save(league_table, fixtures)
+        return events
+
+    def save(self, league_table, fixtures):
+        """Update the store and the files derived from it; unchanged files are not rewritten"""
+        manifest = Manifest(self.directory)
+        with DataStore(self.directory) as store:
+            changed = store.replace('sarjataulukko', league_table)
+            changed = store.replace('ottelut', fixtures) or changed
+            if changed:
+                refresh_views(store, manifest, name=self.competition['name'])
+        # Record the hashes under the keys the scraper's save functions use,
+        # so its next run sees these records as unchanged
+        manifest.update_records('league_table', league_table)
+        manifest.update_records('fixtures', fixtures)
+        manifest.save()
+        if changed and self.history_file:
+            record_snapshot(self.competition['key'], league_table, fixtures, self.history_file)
+
+    def _try_poll(self, mode):
+        """Poll once; a failed poll is reported and retried on the next round. Returns whether it worked."""
+        try:
+            events = self.poll()
+        except Exception as e:
+            print(f"Error polling {self.competition['key']}: {e}")
+            return False
+        print(f"{datetime.now(TIMEZONE):%H:%M:%S} {mode} poll: {len(events)} changes")
+        return True
+
+    def run(self, once=False, fast=FAST_SECONDS, live=LIVE_SECONDS, idle_max=IDLE_MAX_SECONDS):
+        """Poll while matches are on and sleep in between until no match is left"""
+        try:
+            while True:
+                mode, wait = schedule(datetime.now(TIMEZONE), self.kickoffs, fast, live, idle_max)
+                if mode is None and self.matches is None:
+                    # No kickoff times on disk yet: learn them from the data API
+                    if not self._try_poll('first'):
+                        if once:
+                            return
+                        print(f"Next poll in {live:.0f} s (retry)")
+                        time.sleep(live)
+                        continue
+                    mode, wait = schedule(datetime.now(TIMEZONE), self.kickoffs, fast, live, idle_max)
+                if mode is None:
+                    print("No matches left to follow")
+                    return
+                if mode != 'idle':
+                    self._try_poll(mode)
+                if once:
+                    return
+                print(f"Next poll in {wait:.0f} s ({mode})")
+                time.sleep(wait)
+        finally:
+            self.client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Follow a matchday live and write score and status changes as JSONL")
+    parser.add_argument("--competition", help="follow output/KEY/ instead of the repository root")
+    parser.add_argument("--events", default=EVENTS_FILE, help="JSONL file the change events are appended to ('-' for stdout)")
+    parser.add_argument("--history", default=os.environ.get("SCRAPER_HISTORY_FILE", HISTORY_FILE),
+                        help="SQLite database every changed snapshot is appended to ('' to disable)")
+    parser.add_argument("--fast-seconds", type=float, default=FAST_SECONDS,
+                        help="poll interval around kickoff and full time")
+    parser.add_argument("--live-seconds", type=float, default=LIVE_SECONDS, help="poll interval during a match")
+    parser.add_argument("--idle-max-seconds", type=float, default=IDLE_MAX_SECONDS,
+                        help="longest sleep between matches before the schedule is checked again")
+    parser.add_argument("--once", action="store_true", help="poll once if a match is on and exit")
+    args = parser.parse_args()
+
+    competition = get_competition(args.competition or DEFAULT_COMPETITION)
+    directory = output_dir(competition) if args.competition else ""
+    feed = LiveFeed(competition, directory, args.events, args.history)
+    try:
+        feed.run(args.once, args.fast_seconds, args.live_seconds, args.idle_max_seconds)
+    except KeyboardInterrupt:
+        pass
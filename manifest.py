@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+from metrics import span
+
+MANIFEST_FILE = "scrape_manifest.json"
+
+def hash_records(records):
+    """Stable content hash of extracted records"""
+    payload = json.dumps(records, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class Manifest:
+    """Content hashes of the extracted records and every output file of the last run.
+
+    Output filenames are relative to output_dir, where the manifest itself
+    is kept as well.
+    """
+
+    def __init__(self, output_dir=""):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILE)
+        self.records = {}
+        self.files = {}
+        self.dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.records = data.get('records', {})
+                self.files = data.get('files', {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def records_changed(self, key, records):
+        return self.records.get(key) != hash_records(records)
+
+    def update_records(self, key, records):
+        digest = hash_records(records)
+        if self.records.get(key) != digest:
+            self.records[key] = digest
+            self.dirty = True
+
+    def write_if_changed(self, filename, content):
+        """Write content to filename unless the file already holds exactly that content"""
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.output_dir, filename)
+        if self.files.get(filename) == digest and os.path.exists(path):
+            return False
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.files[filename] = digest
+        self.dirty = True
+        return True
+
+    def save(self):
+        if self.dirty:
+            if self.output_dir:
+                os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'records': self.records, 'files': self.files}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self.dirty = False
+
+def write_output(filename, content, manifest=None):
+    """Write an output file, skipping the write when the manifest shows it is unchanged"""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    with span('file_write', file=filename) as s:
+        if manifest is not None:
+            written = manifest.write_if_changed(filename, data)
+        else:
+            with open(filename, 'wb') as f:
+                f.write(data)
+            written = True
+        s.bytes = len(data) if written else 0
+        s.labels['written'] = written
+    return written
@@ -0,0 +1,121 @@
+import contextvars
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+METRICS_FILE = "scraper_metrics.jsonl"
+
+# Recorder of the running scrape. Context variables follow asyncio tasks and
+# asyncio.to_thread calls, so spans from concurrent loads land in the same run.
+_current = contextvars.ContextVar("metrics_recorder", default=None)
+
+class Span:
+    """Timing of one phase. bytes and rows are filled in by the instrumented code."""
+
+    def __init__(self, phase, labels):
+        self.phase = phase
+        self.labels = labels
+        self.bytes = None
+        self.rows = None
+        self.ok = True
+        self.error = None
+        self.started_at = time.time()
+        self.duration = None
+
+    def record(self):
+        record = {
+            'phase': self.phase,
+            'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            'duration_s': round(self.duration, 6),
+            'ok': self.ok,
+        }
+        if self.bytes is not None:
+            record['bytes'] = self.bytes
+        if self.rows is not None:
+            record['rows'] = self.rows
+        if self.error:
+            record['error'] = self.error
+        record.update(self.labels)
+        return record
+
+class MetricsRecorder:
+    """Collects the phase spans of one scraper run"""
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.spans = []
+
+    def records(self):
+        return [dict(span.record(), run=self.run_id) for span in self.spans]
+
+    def write_jsonl(self, filename=METRICS_FILE):
+        """Append the spans of this run to a JSON Lines file"""
+        with open(filename, 'a', encoding='utf-8') as f:
+            for record in self.records():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def prometheus_text(self, prefix="ykk_scraper"):
+        """Per-phase totals in the Prometheus text exposition format"""
+        totals = {}
+        for span in self.spans:
+            total = totals.setdefault(span.phase, {'count': 0, 'seconds': 0.0, 'bytes': 0,
+                                                   'rows': 0, 'errors': 0})
+            total['count'] += 1
+            total['seconds'] += span.duration
+            total['bytes'] += span.bytes or 0
+            total['rows'] += span.rows or 0
+            total['errors'] += 0 if span.ok else 1
+
+        name = f"{prefix}_phase_duration_seconds"
+        lines = [f"# HELP {name} Time spent in the phase",
+                 f"# TYPE {name} summary"]
+        for phase, total in sorted(totals.items()):
+            lines.append(f'{name}_sum{{phase="{phase}"}} {total["seconds"]:.6f}')
+            lines.append(f'{name}_count{{phase="{phase}"}} {total["count"]}')
+        for suffix, key, help_text in [
+            ('bytes_total', 'bytes', 'Bytes read or written by the phase'),
+            ('rows_total', 'rows', 'Rows produced by the phase'),
+            ('errors_total', 'errors', 'Failed runs of the phase'),
+        ]:
+            name = f"{prefix}_phase_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for phase, total in sorted(totals.items()):
+                lines.append(f'{name}{{phase="{phase}"}} {total[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename):
+        """Write the totals atomically, as the node exporter textfile collector expects"""
+        temporary = f"{filename}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(temporary, filename)
+
+@contextmanager
+def recording(recorder):
+    """Make recorder the target of span() for the code inside the block"""
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def span(phase, **labels):
+    """Time a phase of the current run. Spans outside recording() are dropped."""
+    current = Span(phase, labels)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.ok = False
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.spans.append(current)
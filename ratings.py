@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+import render
+from manifest import write_output
+from standings import coerce_scores
+from standings_history import kickoff_times
+from schema import load_matches
+
+STATE_FILE = "elo_state.json"
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0
+
+def goal_margin_factor(margin):
+    """World Football Elo multiplier for the goal margin of a result"""
+    margin = abs(margin)
+    if margin <= 1:
+        return 1.0
+    if margin == 2:
+        return 1.5
+    return (11 + margin) / 8
+
+class EloRatings:
+    """Elo ratings of every team, updated one result at a time.
+
+    The state is a team list with parallel rating and match-count arrays and
+    a checkpoint: the kickoff of the last processed result plus the count
+    and hash of the results up to it. Each run only applies the results
+    after the checkpoint.
+    """
+
+    def __init__(self, teams=(), ratings=(), matches=(), checkpoint=None, processed=0, digest=None,
+                 since=None):
+        self.teams = list(teams)
+        self.index = {team: i for i, team in enumerate(self.teams)}
+        self.ratings = np.array(ratings, dtype=np.float64)
+        self.matches = np.array(matches, dtype=np.int64)
+        self.checkpoint = pd.Timestamp(checkpoint) if checkpoint else None
+        self.processed = processed
+        self.digest = digest
+        self.since = pd.Timestamp(since) if since else None
+
+    def _team(self, team):
+        if team not in self.index:
+            self.index[team] = len(self.teams)
+            self.teams.append(team)
+            self.ratings = np.append(self.ratings, INITIAL_RATING)
+            self.matches = np.append(self.matches, 0)
+        return self.index[team]
+
+    def update(self, home, away, home_goals, away_goals):
+        """Apply one result in O(1)"""
+        h, a = self._team(home), self._team(away)
+        expected = 1 / (1 + 10 ** ((self.ratings[a] - self.ratings[h] - HOME_ADVANTAGE) / 400))
+        actual = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+        change = K_FACTOR * goal_margin_factor(home_goals - away_goals) * (actual - expected)
+        self.ratings[h] += change
+        self.ratings[a] -= change
+        self.matches[h] += 1
+        self.matches[a] += 1
+
+    def apply(self, matches):
+        """Apply the results after the checkpoint; returns how many were applied.
+
+        When a result at or before the checkpoint has appeared or changed
+        since the last run, the ratings are rebuilt from the start instead.
+        """
+        played = played_matches(matches, self.since)
+        new = played
+        if self.checkpoint is not None:
+            earlier = played[played['kickoff'] <= self.checkpoint]
+            if len(earlier) != self.processed or _digest(earlier) != self.digest:
+                print("Results before the checkpoint have changed, rebuilding the ratings")
+                return self.rebuild(matches)
+            new = played[played['kickoff'] > self.checkpoint]
+
+        for home, away, home_goals, away_goals in zip(new['Koti'], new['Vieras'],
+                                                      new['home_goals'], new['away_goals']):
+            self.update(home, away, home_goals, away_goals)
+        if len(new):
+            # Everything played is now at or before the checkpoint
+            self.checkpoint = new['kickoff'].iloc[-1]
+            self.processed = len(played)
+            self.digest = _digest(played)
+        return len(new)
+
+    def rebuild(self, matches):
+        """Start over from the initial ratings and apply every result from since on"""
+        self.teams, self.index = [], {}
+        self.ratings = np.empty(0, dtype=np.float64)
+        self.matches = np.empty(0, dtype=np.int64)
+        self.checkpoint, self.processed, self.digest = None, 0, None
+        return self.apply(matches)
+
+    def table(self):
+        """Teams by rating"""
+        table = pd.DataFrame({'Joukkue': self.teams, 'Elo': self.ratings.round(1), 'Ottelut': self.matches})
+        table = table.sort_values(['Elo', 'Joukkue'], ascending=[False, True], kind='mergesort')
+        table.insert(0, 'Sijoitus', np.arange(1, len(table) + 1))
+        return table.reset_index(drop=True)
+
+    def to_dict(self):
+        return {
+            'teams': self.teams,
+            'ratings': [round(float(rating), 6) for rating in self.ratings],
+            'matches': [int(count) for count in self.matches],
+            'checkpoint': self.checkpoint.isoformat() if self.checkpoint is not None else None,
+            'processed': self.processed,
+            'digest': self.digest,
+            'since': self.since.isoformat() if self.since is not None else None,
+        }
+
+    def save(self, filename=STATE_FILE):
+        write_output(filename, json.dumps(self.to_dict(), ensure_ascii=False, indent=1))
+
+    @classmethod
+    def load(cls, filename=STATE_FILE):
+        if not os.path.exists(filename):
+            return cls()
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls(**json.load(f))
+
+def _digest(played):
+    """Hash of the processed results, to notice corrected or late-reported ones"""
+    return hashlib.sha256(played.to_csv(index=False).encode('utf-8')).hexdigest()
+
+def played_matches(matches, since=None):
+    """Played matches in kickoff order with numeric scores"""
+    played = pd.DataFrame({
+        'kickoff': kickoff_times(matches),
+        'Koti': matches['Koti'],
+        'Vieras': matches['Vieras'],
+        'home_goals': coerce_scores(matches, 'Kotitulos'),
+        'away_goals': coerce_scores(matches, 'Vierastulos'),
+    }).dropna()
+    if since is not None:
+        played = played[played['kickoff'] >= since]
+    played = played.astype({'home_goals': 'int64', 'away_goals': 'int64'})
+    return played.sort_values(['kickoff', 'Koti', 'Vieras'], kind='mergesort')
+
+def update_ratings(source='tulokset.csv', state_file=STATE_FILE, replay_from=None):
+    """Apply the new results to the saved ratings and write Elo.csv and Elo.md"""
+    matches = load_matches(source)
+    if replay_from is not None:
+        ratings = EloRatings(since=pd.to_datetime(replay_from, dayfirst=True))
+        print(f"Replaying every result from {ratings.since.date()}")
+    else:
+        ratings = EloRatings.load(state_file)
+    applied = ratings.apply(matches)
+    print(f"Applied {applied} new results, {ratings.processed} in total")
+
+    table = ratings.table()
+    write_output('Elo.csv', table.to_csv(index=False))
+    write_output('Elo.md', render.markdown(
+        ['Sij.', 'Joukkue', 'Elo', 'O'],
+        [render.column_text(table, column) for column in ['Sijoitus', 'Joukkue', 'Elo', 'Ottelut']],
+        title='Elo-luvut'))
+    ratings.save(state_file)
+    return ratings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the Elo ratings with the results since the last run")
+    parser.add_argument("--source", default='tulokset.csv')
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--replay-from", metavar="DATE",
+                        help="rebuild the ratings from the results on and after DATE (dd.mm.yyyy)")
+    args = parser.parse_args()
+    try:
+        update_ratings(args.source, args.state, args.replay_from)
+    except Exception as e:
+        print(f"Error updating ratings: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from urllib.parse import parse_qs, unquote, urlsplit
+from competitions import get_competition, output_dir
+
+TABLE_FILE = "Sarjataulukko.json"
+FIXTURES_FILE = "Ottelut.json"
+# How often the JSON files are checked for changes. The check runs in the
+# background so requests never touch the disk.
+RELOAD_SECONDS = 1.0
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 256
+# Request bodies (the API has no use for them) up to this size are read and
+# dropped so the connection can be kept; larger or chunked bodies close it
+MAX_DISCARD_BYTES = 64 * 1024
+
+class Response:
+    """Pre-serialized response: identity and gzip bodies, each with its own strong ETag"""
+
+    def __init__(self, data, status=200):
+        self.status = status
+        self.body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha1(self.body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        self.gzipped = gzip.compress(self.body, 6, mtime=0) if len(self.body) >= GZIP_MIN_BYTES else None
+        self.gzip_etag = f'"{digest}-gz"'
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match value ('*' or a list of tags) matches etag.
+
+    If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+def _played(fixture):
+    return fixture.get('Kotitulos', '') != '' and fixture.get('Vierastulos', '') != ''
+
+def build_routes(table, fixtures):
+    """Every response the API can give, keyed by route and lookup value.
+
+    Teams and dates are few, so the per-team and per-date answers are all
+    serialized up front and a request is a dictionary lookup.
+    """
+    teams = [row['Joukkue'] for row in table if row.get('Joukkue')]
+    teams += sorted({fixture[side] for fixture in fixtures for side in ('Koti', 'Vieras')
+                     if fixture.get(side)} - set(teams))
+
+    by_team = {team: [] for team in teams}
+    by_date = {}
+    for fixture in fixtures:
+        for side in ('Koti', 'Vieras'):
+            if fixture.get(side) in by_team:
+                by_team[fixture[side]].append(fixture)
+        by_date.setdefault(fixture.get('Pelipäivä', ''), []).append(fixture)
+
+    rows = {row.get('Joukkue'): row for row in table}
+    team_details = {}
+    for team, team_fixtures in by_team.items():
+        played = [fixture for fixture in team_fixtures if _played(fixture)]
+        team_details[team.casefold()] = Response({
+            'Joukkue': team,
+            'Sarjataulukko': rows.get(team),
+            'Pelatut': played,
+            'Tulevat': [fixture for fixture in team_fixtures if not _played(fixture)],
+        })
+
+    return {
+        'table': Response(table),
+        'fixtures': Response(fixtures),
+        'teams': Response(teams),
+        'fixtures_by_team': {team.casefold(): Response(team_fixtures) for team, team_fixtures in by_team.items()},
+        'fixtures_by_date': {date: Response(date_fixtures) for date, date_fixtures in by_date.items()},
+        'team': team_details,
+        'no_fixtures': Response([]),
+        'not_found': Response({'error': 'not found'}, 404),
+        'not_allowed': Response({'error': 'method not allowed'}, 405),
+        'bad_request': Response({'error': 'bad request'}, 400),
+    }
+
+class ReadAPI:
+    """Serves the league table and fixtures of one output directory from memory"""
+
+    def __init__(self, directory="", reload_seconds=RELOAD_SECONDS):
+        self.files = [os.path.join(directory, TABLE_FILE), os.path.join(directory, FIXTURES_FILE)]
+        self.reload_seconds = reload_seconds
+        self.mtimes = None
+        self.routes = None
+        self.requests = 0
+
+    def _mtimes(self):
+        return [os.stat(filename).st_mtime_ns if os.path.exists(filename) else None for filename in self.files]
+
+    def reload(self):
+        """Rebuild the responses when either file has changed; returns True if it did"""
+        mtimes = self._mtimes()
+        if mtimes == self.mtimes:
+            return False
+        data = []
+        for filename in self.files:
+            if os.path.exists(filename):
+                with open(filename, 'r', encoding='utf-8') as f:
+                    data.append(json.load(f))
+            else:
+                data.append([])
+        self.routes = build_routes(*data)
+        self.mtimes = mtimes
+        print(f"Loaded {len(data[0])} table rows and {len(data[1])} fixtures")
+        return True
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            try:
+                self.reload()
+            except (OSError, ValueError) as e:
+                # A half-written file: keep serving the previous data and retry
+                print(f"Error reloading data: {e}")
+
+    def route(self, target):
+        """Response for a request target"""
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip('/')
+        query = parse_qs(url.query)
+        routes = self.routes
+
+        if path == '/table':
+            return routes['table']
+        if path == '/fixtures':
+            if 'team' in query:
+                return routes['fixtures_by_team'].get(query['team'][0].casefold(), routes['not_found'])
+            if 'date' in query:
+                return routes['fixtures_by_date'].get(query['date'][0], routes['no_fixtures'])
+            return routes['fixtures']
+        if path == '/teams':
+            return routes['teams']
+        if path.startswith('/teams/'):
+            return routes['team'].get(path[len('/teams/'):].casefold(), routes['not_found'])
+        return routes['not_found']
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                request = lines[0].split(' ')
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                if len(request) != 3:
+                    response, method = self.routes['bad_request'], 'GET'
+                else:
+                    method, target, version = request
+                    response = self.route(target) if method in ('GET', 'HEAD') else self.routes['not_allowed']
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (len(request) == 3 and version == 'HTTP/1.1'
+                                                        or connection == 'keep-alive')
+
+                # A body left in the stream would be parsed as the next request
+                length = headers.get('content-length', '0') or '0'
+                if 'transfer-encoding' in headers:
+                    keep_alive = False
+                elif not length.isdigit():
+                    response, keep_alive = self.routes['bad_request'], False
+                elif int(length) > MAX_DISCARD_BYTES:
+                    keep_alive = False
+                elif int(length):
+                    try:
+                        await reader.readexactly(int(length))
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        break
+                writer.write(self.response_bytes(response, headers, method == 'HEAD', keep_alive))
+                self.requests += 1
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    @staticmethod
+    def response_bytes(response, headers, head_only=False, keep_alive=True):
+        status, body, etag, extra = response.status, response.body, response.etag, ''
+        if response.gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+            body, etag, extra = response.gzipped, response.gzip_etag, 'Content-Encoding: gzip\r\n'
+        # The ETag of a 304 is the one of the representation a 200 would have sent
+        if response.status == 200 and etag_matches(headers.get('if-none-match'), etag):
+            status, body, extra = 304, b'', ''
+        reason = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                  405: 'Method Not Allowed'}[status]
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"ETag: {etag}\r\n"
+                f"Vary: Accept-Encoding\r\n"
+                f"Cache-Control: no-cache\r\n"
+                f"{extra}"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+        return head if head_only else head + body
+
+async def serve(directory="", host="127.0.0.1", port=8080, reload_seconds=RELOAD_SECONDS):
+    api = ReadAPI(directory, reload_seconds)
+    api.reload()
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"Serving {directory or '.'} on http://{host}:{port} (/table, /fixtures?team=|date=, /teams/NAME)")
+    watcher = asyncio.create_task(api.watch())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the league table and fixtures as a read-only JSON API")
+    parser.add_argument("--competition", help="serve output/KEY/ instead of the repository root")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--reload-seconds", type=float, default=RELOAD_SECONDS,
+                        help="how often the JSON files are checked for changes")
+    args = parser.parse_args()
+    directory = output_dir(get_competition(args.competition)) if args.competition else ""
+    try:
+        asyncio.run(serve(directory, args.host, args.port, args.reload_seconds))
+    except KeyboardInterrupt:
+        pass
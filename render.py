@@ -0,0 +1,69 @@
+import csv
+import html
+import io
+
+# Tables are rendered column-wise: every column is turned into a list of
+# display strings once, the rows are zipped together and joined, and the whole
+# document is returned as one string for a single write.
+
+def column_text(df, column, default=''):
+    """Display strings of a column, or default for every row when it is missing.
+    Missing values (NaN, <NA>) are shown as empty cells."""
+    if column not in df.columns:
+        return [default] * len(df)
+    values = df[column]
+    if values.hasnans:
+        values = values.astype(object).where(values.notna(), '')
+    return list(map(str, values.tolist()))
+
+def index_text(df):
+    """Display strings of the index (e.g. team names of a standings table)"""
+    return list(map(str, df.index.tolist()))
+
+def score_text(df, home='Kotitulos', away='Vierastulos'):
+    """'home-away' for rows where both scores are set, '' elsewhere"""
+    if home not in df.columns or away not in df.columns:
+        return [''] * len(df)
+    home_set, away_set = _is_set(df[home]), _is_set(df[away])
+    return [f"{h}-{a}" if h_set and a_set else ''
+            for h, a, h_set, a_set in zip(df[home].tolist(), df[away].tolist(), home_set, away_set)]
+
+def _is_set(values):
+    """Whether each value of a column is present and not empty (or zero)"""
+    return [bool(present and value) for value, present in zip(values.tolist(), values.notna().tolist())]
+
+def markdown(headers, columns, title=None, separator=None):
+    """Markdown table with an optional '# title' and custom separator row"""
+    parts = []
+    if title:
+        parts.append(f'# {title}\n\n')
+    parts.append('| ' + ' | '.join(headers) + ' |\n')
+    parts.append(separator or '| ' + ' | '.join(['---' for _ in headers]) + ' |\n')
+    parts.extend(markdown_rows(columns))
+    return ''.join(parts)
+
+def markdown_rows(columns):
+    """Markdown table rows without a header, for writing a table in pieces"""
+    return ['| ' + ' | '.join(cells) + ' |\n' for cells in zip(*columns)]
+
+def csv_text(headers, columns):
+    """CSV document with the same quoting and line endings as DataFrame.to_csv"""
+    with io.StringIO() as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(headers)
+        writer.writerows(zip(*columns))
+        return f.getvalue()
+
+def html_table(headers, columns, title=None):
+    """HTML table fragment with escaped cells and an optional <h1> title"""
+    parts = []
+    if title:
+        parts.append(f'<h1>{html.escape(title)}</h1>\n')
+    parts.append('<table>\n<thead>\n<tr>'
+                 + ''.join(f'<th>{html.escape(header)}</th>' for header in headers)
+                 + '</tr>\n</thead>\n<tbody>\n')
+    escaped = [list(map(html.escape, column)) for column in columns]
+    parts.extend('<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>\n'
+                 for cells in zip(*escaped))
+    parts.append('</tbody>\n</table>\n')
+    return ''.join(parts)
@@ -0,0 +1,81 @@
+import argparse
+import http.server
+import re
+import threading
+import time
+
+# Saved pages are served with their scripts removed so the snapshot DOM stays
+# as it was. Instead a script is injected that keeps a long-poll request open,
+# the way the live site's trackers and live-score polling do, so networkidle
+# waits never settle while the tables are already there.
+SCRIPT_TAG = re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+LONG_POLL_SCRIPT = """<script>
+(function poll() { fetch('/poll').then(poll, () => setTimeout(poll, 100)); })();
+</script>"""
+
+def replay_page(html):
+    """Saved page without its scripts and with the long-poll script injected"""
+    html = SCRIPT_TAG.sub('', html)
+    if '</body>' in html:
+        return html.replace('</body>', LONG_POLL_SCRIPT + '</body>', 1)
+    return html + LONG_POLL_SCRIPT
+
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    pages = {}
+    poll_seconds = 5.0
+    delay_seconds = 0.0
+
+    def do_GET(self):
+        if self.path.startswith('/poll'):
+            time.sleep(self.poll_seconds)
+            return self._send(b'{}', 'application/json')
+
+        time.sleep(self.delay_seconds)
+        path = self.path.split('?', 1)[0].rstrip('/')
+        kind = 'fixtures' if path.endswith('/fixtures') else 'league_table'
+        if kind not in self.pages:
+            self.send_error(404)
+            return
+        self._send(self.pages[kind], 'text/html; charset=utf-8')
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_replay_server(league_file="Sivu.html", fixtures_file=None, port=0, poll_seconds=5.0, delay_seconds=0.0):
+    """Serve saved pages in a background thread and return the server (see server.server_port)"""
+    pages = {}
+    for kind, filename in [('league_table', league_file), ('fixtures', fixtures_file)]:
+        if filename:
+            with open(filename, 'r', encoding='utf-8') as f:
+                pages[kind] = replay_page(f.read()).encode('utf-8')
+    handler = type('Handler', (ReplayHandler,), {'pages': pages, 'poll_seconds': poll_seconds,
+                                                 'delay_seconds': delay_seconds})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay saved tulospalvelu pages with a never-idle network")
+    parser.add_argument("--league", default="Sivu.html", help="saved league table page")
+    parser.add_argument("--fixtures", help="saved fixtures page")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--poll-seconds", type=float, default=5.0, help="how long each long-poll stays open")
+    parser.add_argument("--delay", type=float, default=0.0, help="extra latency of every page response")
+    args = parser.parse_args()
+
+    server = start_replay_server(args.league, args.fixtures, args.port, args.poll_seconds, args.delay)
+    print(f"Replaying on http://127.0.0.1:{server.server_port} "
+          f"(run the scraper with TULOSPALVELU_BASE_URL pointing here)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
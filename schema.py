@@ -0,0 +1,159 @@
+import json
+import numpy as np
+import pandas as pd
+from store import read_dataset
+
+# Compact in-memory types of the match rows. Team, venue, date and time
+# strings repeat across the season, so categoricals store each value once
+# and keep a small integer code per row; scores fit in nullable int8.
+MATCH_DTYPES = {
+    'Row': 'Int32',
+    'Pelipäivä': 'category',
+    'Klo': 'category',
+    'Koti': 'category',
+    'Vieras': 'category',
+    'Kotitulos': 'Int8',
+    'Vierastulos': 'Int8',
+    'Paikka': 'category',
+}
+SCORE_COLUMNS = ['Kotitulos', 'Vierastulos']
+# Kickoff timestamp derived from Pelipäivä and Klo. It is not part of the
+# scraped data, so writers drop it before saving match rows.
+KICKOFF = 'Aloitusaika'
+
+TABLE_DTYPES = {
+    'Sijoitus': 'Int8',
+    'Joukkue': 'category',
+    'Ottelut': 'Int16',
+    'Voitot': 'Int16',
+    'Tasapelit': 'Int16',
+    'Tappiot': 'Int16',
+    'Tehdyt maalit': 'Int16',
+    'Päästetyt maalit': 'Int16',
+    'Maaliero': 'Int16',
+    'Pisteet': 'Int16',
+}
+
+def _parse_categories(values, parse):
+    """Parse only the distinct values of a column and map them back to the rows"""
+    values = values.astype('category')
+    parsed = parse(values.cat.categories.astype(str)).to_numpy()
+    # Missing values have code -1, which picks the NaT appended at the end
+    parsed = np.append(parsed, np.array(['NaT'], dtype=parsed.dtype))
+    return parsed[values.cat.codes.to_numpy()]
+
+def kickoff_column(dates, times=None):
+    """datetime64 kickoff from Pelipäivä (dd.mm.yyyy) and Klo (hh:mm) columns.
+
+    Only the distinct dates and times are parsed; a season has a few hundred
+    of them however many rows there are.
+    """
+    kickoff = _parse_categories(dates, lambda days: pd.to_datetime(days, format='%d.%m.%Y', errors='coerce'))
+    if times is not None:
+        offsets = _parse_categories(times, lambda clock: pd.to_timedelta(clock + ':00', errors='coerce'))
+        kickoff = kickoff + np.where(np.isnat(offsets), np.timedelta64(0, 'ns'), offsets)
+    return pd.Series(kickoff, index=dates.index).astype('datetime64[ns]')
+
+def match_order_keys(dates, times=None):
+    """Sort keys of the match order for np.lexsort, least significant first.
+
+    Matches sort by date and then by the Klo text, the way
+    sort_values(['Pelipäivä', 'Klo']) always has: undated matches and
+    missing times come last and the times compare as text ('9:30' after
+    '18:00'). lexsort is stable, so ties keep their input order.
+    """
+    day = _parse_categories(dates, lambda days: pd.to_datetime(days, format='%d.%m.%Y', errors='coerce'))
+    if times is None:
+        clock, no_clock = np.full(len(dates), ''), np.zeros(len(dates), dtype=bool)
+    else:
+        no_clock = times.isna().to_numpy()
+        clock = times.astype(object).where(~no_clock, '').to_numpy(dtype=str)
+    return [clock, no_clock, day.astype('int64'), np.isnat(day)]
+
+def _scores(values):
+    """Nullable int8 scores; empty and invalid values become <NA>"""
+    if values.dtype == 'Int8':
+        return values
+    return np.trunc(pd.to_numeric(values, errors='coerce').astype('float64')).astype('Int8')
+
+def typed_matches(matches):
+    """Match rows in the compact schema, with the derived kickoff column"""
+    matches = matches.copy()
+    for column, dtype in MATCH_DTYPES.items():
+        if column not in matches.columns:
+            continue
+        if column in SCORE_COLUMNS:
+            matches[column] = _scores(matches[column])
+        elif dtype == 'category' and matches[column].dtype != 'category':
+            # Empty strings from the store mean missing, as NaN does in a CSV
+            matches[column] = matches[column].replace('', None).astype('category')
+        elif dtype != 'category':
+            matches[column] = pd.to_numeric(matches[column], errors='coerce').astype(dtype)
+    if 'Pelipäivä' in matches.columns:
+        matches[KICKOFF] = kickoff_column(matches['Pelipäivä'], matches['Klo'] if 'Klo' in matches.columns else None)
+    return matches
+
+def csv_columns(source):
+    return pd.read_csv(source, nrows=0).columns
+
+def read_matches_csv(source):
+    """Read a match CSV straight into the compact schema.
+
+    Columns outside the schema (e.g. Sarja) are kept as pandas reads them.
+    """
+    header = csv_columns(source)
+    if 'Koti' not in header or 'Vieras' not in header:
+        # Not match data (e.g. player statistics): leave it as it is
+        return pd.read_csv(source)
+    columns = [column for column in header if column in MATCH_DTYPES]
+    # The CSV parser is much slower filling nullable integer columns than
+    # floats, so scores are read as float32 and narrowed afterwards
+    dtypes = {column: 'float32' if column in SCORE_COLUMNS else MATCH_DTYPES[column] for column in columns}
+    try:
+        matches = pd.read_csv(source, dtype=dtypes)
+    except (ValueError, TypeError):
+        # A score that is not a number ('-', 'ptd.'): parse it as text and coerce
+        matches = pd.read_csv(source, dtype={**dtypes, **{column: str for column in SCORE_COLUMNS if column in dtypes}})
+    return typed_matches(matches)
+
+def iter_matches_csv(source, chunksize):
+    """Read a match CSV as typed chunks of at most chunksize rows.
+
+    Scores and the columns outside the schema are read as text here: a bad
+    value in a late chunk cannot be retried the way read_matches_csv retries
+    the whole file, and every chunk must give a column the same type.
+    """
+    dtypes = {column: MATCH_DTYPES[column] if column in MATCH_DTYPES and column not in SCORE_COLUMNS else str
+              for column in csv_columns(source)}
+    for chunk in pd.read_csv(source, dtype=dtypes, chunksize=chunksize):
+        yield typed_matches(chunk)
+
+def load_matches(source='tulokset.csv', output_dir=""):
+    """Match rows from the data store, or from the CSV when there is no store"""
+    matches = read_dataset('ottelut', output_dir)
+    if matches is not None:
+        return typed_matches(matches)
+    return read_matches_csv(source)
+
+def typed_table(table):
+    """League table rows in the compact schema"""
+    table = table.copy()
+    for column, dtype in TABLE_DTYPES.items():
+        if column in table.columns:
+            if dtype == 'category':
+                table[column] = table[column].astype('category')
+            else:
+                table[column] = pd.to_numeric(table[column], errors='coerce').astype(dtype)
+    return table
+
+def load_table(source='Sarjataulukko.json', output_dir=""):
+    """League table rows from the data store, or from the JSON file when there is no store"""
+    table = read_dataset('sarjataulukko', output_dir)
+    if table is None:
+        with open(source, 'r', encoding='utf-8') as f:
+            table = pd.DataFrame(json.load(f))
+    return typed_table(table)
+
+def match_rows(matches):
+    """Match rows without the derived columns, ready to be written out"""
+    return matches.drop(columns=[KICKOFF], errors='ignore')
@@ -1,432 +1,522 @@
 import asyncio
-from playwright.async_api import async_playwright
-import pandas as pd
 from datetime import datetime
+import argparse
 import os
+import statistics
+import time
 import traceback
-import json
+from browser import LOAD_PROFILES, AdaptiveTimeout, NetworkStats, shared_browser, open_page, load_until_ready
+from tulospalvelu_api import TulospalveluClient, fetch_group
+from manifest import Manifest, write_output
+from store import DataStore, has_store
+from views import refresh_views
+from competitions import DEFAULT_COMPETITION, load_registry, get_competition, group_url, output_dir
+from throttle import RequestBudget
+from deadline import RUN_DEADLINE, Deadline, backoff, running
+from metrics import METRICS_FILE, MetricsRecorder, recording, span
+from history import HISTORY_FILE, record_snapshot
 
-async def save_screenshot(page, filename):
+async def save_screenshot(page, filename, manifest=None):
     """Save a screenshot of the page"""
-    await page.screenshot(path=f"{filename}.png", full_page=True)
-    print(f"Saved screenshot to {filename}.png")
+    with span('screenshot', file=f"{filename}.png") as s:
+        image = await page.screenshot(full_page=True)
+        s.bytes = len(image)
+    if write_output(f"{filename}.png", image, manifest):
+        print(f"Saved screenshot to {filename}.png")
 
-async def save_html(page, filename):
+async def save_html(page, filename, manifest=None):
     """Save the HTML content of the page"""
-    html = await page.content()
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"Saved HTML to {filename}")
+    with span('html_save', file=filename) as s:
+        html = await page.content()
+        s.bytes = len(html.encode('utf-8'))
+    if write_output(filename, html, manifest):
+        print(f"Saved HTML to {filename}")
     return html
 
-async def get_league_table():
+async def save_debug_files(page, name, screenshot=True, manifest=None):
+    """Save the screenshot and HTML of a loaded page for debugging"""
+    if screenshot:
+        await save_screenshot(page, f"{name}_screenshot", manifest)
+    await save_html(page, f"{name}.html", manifest)
+
+# Pulls headers, cell texts, img alt texts and match links out of every table
+# on the page in a single page.evaluate round trip. Rows use the same
+# 'tr:not(:first-child)' selection as the per-cell path.
+EXTRACT_TABLES_JS = """
+() => Array.from(document.querySelectorAll('table')).map(table => ({
+    html: table.innerHTML,
+    headers: Array.from(table.querySelectorAll('th')).map(th => th.textContent.trim()),
+    rows: Array.from(table.querySelectorAll('tr:not(:first-child)')).map(tr => ({
+        cells: Array.from(tr.querySelectorAll('td')).map(td => {
+            const img = td.querySelector('img');
+            return {text: td.textContent, alt: img ? img.getAttribute('alt') : null};
+        }),
+        links: Array.from(tr.querySelectorAll('a[href*="/match/"]')).map(a => a.getAttribute('href')),
+    })),
+}))
+"""
+
+async def extract_tables(page):
+    """Extract every table on the page with a single page.evaluate call"""
+    return await page.evaluate(EXTRACT_TABLES_JS)
+
+async def extract_tables_per_cell(page):
+    """Extract every table on the page with one Playwright call per cell.
+
+    This is the original extraction path, kept as the reference for
+    compare_extraction(). It returns the same structure as extract_tables().
+    """
+    tables = []
+    for table in await page.query_selector_all('table'):
+        headers = await table.eval_on_selector_all('th', 'elements => elements.map(e => e.textContent.trim())')
+        rows = []
+        for row in await table.query_selector_all('tr:not(:first-child)'):
+            cells = []
+            for cell in await row.query_selector_all('td'):
+                text = await cell.text_content()
+                img = await cell.query_selector('img')
+                alt = await img.get_attribute('alt') if img else None
+                cells.append({'text': text, 'alt': alt})
+            links = []
+            for link in await row.query_selector_all('a[href*="/match/"]'):
+                links.append(await link.get_attribute('href'))
+            rows.append({'cells': cells, 'links': links})
+        tables.append({'html': await table.inner_html(), 'headers': headers, 'rows': rows})
+    return tables
+
+def map_league_headers(headers):
+    """Map league table headers to our standardized column names"""
+    header_mapping = {}
+    for i, header in enumerate(headers):
+        if header == '#' or header == 'Sija':
+            header_mapping[i] = 'Sijoitus'
+        elif header == 'Team' or header == 'Joukkue':
+            header_mapping[i] = 'Joukkue'
+        elif header in ['P', 'Ottelut']:
+            header_mapping[i] = 'Ottelut'
+        elif header in ['W', 'Voitot']:
+            header_mapping[i] = 'Voitot'
+        elif header in ['D', 'Tasapelit']:
+            header_mapping[i] = 'Tasapelit'
+        elif header in ['L', 'Tappiot']:
+            header_mapping[i] = 'Tappiot'
+        elif header in ['GF', 'Tehdyt']:
+            header_mapping[i] = 'Tehdyt maalit'
+        elif header in ['GA', 'Päästetyt']:
+            header_mapping[i] = 'Päästetyt maalit'
+        elif header in ['GD', 'Maaliero']:
+            header_mapping[i] = 'Maaliero'
+        elif header in ['PTS', 'Pisteet']:
+            header_mapping[i] = 'Pisteet'
+        else:
+            header_mapping[i] = header
+    return header_mapping
+
+def parse_league_table(table):
+    """Turn an extracted table into league table rows"""
+    headers = table['headers']
+    header_mapping = map_league_headers(headers)
+    print(f"Header mapping: {header_mapping}")
+
+    league_table = []
+    for row in table['rows']:
+        cells = row['cells']
+        if len(cells) >= len(headers):
+            team_data = {}
+            for i, cell in enumerate(cells):
+                if i in header_mapping:
+                    # For team names, prefer the image alt text when there is one
+                    if header_mapping[i] == 'Joukkue' and cell['alt']:
+                        team_data[header_mapping[i]] = cell['alt'].strip()
+                    else:
+                        team_data[header_mapping[i]] = cell['text'].strip()
+            league_table.append(team_data)
+    return league_table
+
+def find_fixture_columns(headers):
+    """Identify fixture column positions from the table headers"""
+    date_col = -1
+    time_col = -1
+    teams_col = -1
+    result_col = -1
+    venue_col = -1
+
+    for i, header in enumerate(headers):
+        header_lower = header.lower()
+        if any(date_term in header_lower for date_term in ['date', 'päivä', 'pvm']):
+            date_col = i
+        elif any(time_term in header_lower for time_term in ['time', 'aika', 'klo']):
+            time_col = i
+        elif any(teams_term in header_lower for teams_term in ['teams', 'joukkueet']):
+            teams_col = i
+        elif any(result_term in header_lower for result_term in ['result', 'tulos']):
+            result_col = i
+        elif any(venue_term in header_lower for venue_term in ['venue', 'paikka', 'stadion']):
+            venue_col = i
+
+    # If headers don't help, guess based on common positions
+    if date_col == -1:
+        date_col = 0  # First column often contains date
+    if time_col == -1:
+        time_col = 1  # Second column often contains time
+    if teams_col == -1:
+        teams_col = 2  # Third column often contains teams
+    if result_col == -1:
+        result_col = 3  # Fourth column often contains results
+    if venue_col == -1:
+        venue_col = 4  # Fifth column often contains venue
+
+    return date_col, time_col, teams_col, result_col, venue_col
+
+def parse_fixtures(table):
+    """Turn an extracted table into fixture rows"""
+    date_col, time_col, teams_col, result_col, venue_col = find_fixture_columns(table['headers'])
+    print(f"Column positions - Date: {date_col}, Time: {time_col}, Teams: {teams_col}, Result: {result_col}, Venue: {venue_col}")
+
+    def cell_text(cells, col):
+        if col >= 0 and col < len(cells):
+            return cells[col]['text'].strip()
+        return ""
+
+    fixtures = []
+    for i, row in enumerate(table['rows']):
+        cells = row['cells']
+
+        if len(cells) >= 3:  # Need at least date, time, and teams
+            match_data = {'Row': i+1}  # Add row number for debugging
+            match_data['Pelipäivä'] = cell_text(cells, date_col)
+            match_data['Klo'] = cell_text(cells, time_col)
+
+            # Teams - might be in format "Home - Away"
+            teams_text = cell_text(cells, teams_col)
+            if " - " in teams_text:
+                home, away = teams_text.split(" - ", 1)
+                match_data['Koti'] = home.strip()
+                match_data['Vieras'] = away.strip()
+            else:
+                match_data['Koti'] = teams_text
+                match_data['Vieras'] = ""
+
+            # Result - might be in format "0-0"
+            result_text = cell_text(cells, result_col)
+            if "-" in result_text:
+                home_score, away_score = result_text.split("-", 1)
+                match_data['Kotitulos'] = home_score.strip()
+                match_data['Vierastulos'] = away_score.strip()
+            else:
+                match_data['Kotitulos'] = ""
+                match_data['Vierastulos'] = ""
+
+            match_data['Paikka'] = cell_text(cells, venue_col)
+
+            # Only add if we have meaningful data
+            if match_data['Pelipäivä'] and (match_data['Koti'] or match_data['Vieras']):
+                fixtures.append(match_data)
+    return fixtures
+
+def save_league_table(league_table, manifest=None, name="Ykkönen"):
+    """Save league table rows as CSV, JSON and Markdown; returns the rows"""
+    if manifest is not None:
+        if not manifest.records_changed('league_table', league_table):
+            print("League table unchanged since last run, skipping writes")
+            return league_table
+        manifest.update_records('league_table', league_table)
+
+    # Store the records once and derive the CSV, JSON and Markdown views from the store
+    with DataStore(manifest.output_dir if manifest is not None else "") as store:
+        with span('store_write', dataset='sarjataulukko') as s:
+            s.rows = len(league_table)
+            store.replace('sarjataulukko', league_table)
+        refresh_views(store, manifest, ['sarjataulukko'], name)
+    return league_table
+
+def save_fixtures(fixtures, manifest=None, name="Ykkönen"):
+    """Save fixture rows as CSV, JSON and Markdown; returns the rows"""
+    if manifest is not None:
+        if not manifest.records_changed('fixtures', fixtures):
+            print("Fixtures unchanged since last run, skipping writes")
+            return fixtures
+        manifest.update_records('fixtures', fixtures)
+
+    # Store the records once and derive the CSV, JSON and Markdown views from the store
+    with DataStore(manifest.output_dir if manifest is not None else "") as store:
+        with span('store_write', dataset='ottelut') as s:
+            s.rows = len(fixtures)
+            store.replace('ottelut', fixtures)
+        refresh_views(store, manifest, ['ottelut'], name)
+    return fixtures
+
+async def get_league_table(page, screenshot=True, manifest=None, competition=None):
     """Get the league table using Playwright"""
-    print("\n=== FETCHING LEAGUE TABLE ===")
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        # Set viewport size
-        await page.set_viewport_size({"width": 1280, "height": 800})
-        
-        # Navigate to the league table page
-        url = "https://tulospalvelu.palloliitto.fi/category/M1L!spljp25/group/1/"
-        print(f"Loading URL: {url}")
-        
-        try:
-            # Navigate with a timeout of 60 seconds
-            await page.goto(url, timeout=60000)
-            
-            # Wait for the page to load completely
-            await page.wait_for_load_state("networkidle")
-            
-            print("Page loaded successfully")
-            
-            # Save screenshot and HTML for debugging
-            await save_screenshot(page, "league_table_screenshot")
-            html = await save_html(page, "league_table.html")
-            
-            # Find all tables on the page
-            tables = await page.query_selector_all('table')
-            print(f"Found {len(tables)} tables on the page")
-            
-            if not tables:
-                print("No tables found on the page!")
-                await browser.close()
-                return None
-            
-            # Process the first table (usually the standings table)
-            league_table = []
-            
-            # Extract the table content
-            table_html = await tables[0].inner_html()
-            with open("league_table_content.html", "w", encoding="utf-8") as f:
-                f.write(table_html)
-            
-            # Get headers
-            headers = await page.eval_on_selector_all('table:first-of-type th', 
-                                                    'elements => elements.map(e => e.textContent.trim())')
-            print(f"Headers: {headers}")
-            
-            # Map headers to our standardized column names
-            header_mapping = {}
-            for i, header in enumerate(headers):
-                if header == '#' or header == 'Sija':
-                    header_mapping[i] = 'Sijoitus'
-                elif header == 'Team' or header == 'Joukkue':
-                    header_mapping[i] = 'Joukkue'
-                elif header in ['P', 'Ottelut']:
-                    header_mapping[i] = 'Ottelut'
-                elif header in ['W', 'Voitot']:
-                    header_mapping[i] = 'Voitot'
-                elif header in ['D', 'Tasapelit']:
-                    header_mapping[i] = 'Tasapelit'
-                elif header in ['L', 'Tappiot']:
-                    header_mapping[i] = 'Tappiot'
-                elif header in ['GF', 'Tehdyt']:
-                    header_mapping[i] = 'Tehdyt maalit'
-                elif header in ['GA', 'Päästetyt']:
-                    header_mapping[i] = 'Päästetyt maalit'
-                elif header in ['GD', 'Maaliero']:
-                    header_mapping[i] = 'Maaliero'
-                elif header in ['PTS', 'Pisteet']:
-                    header_mapping[i] = 'Pisteet'
-                else:
-                    header_mapping[i] = header
-            
-            print(f"Header mapping: {header_mapping}")
-            
-            # Get all rows (skip header row)
-            rows = await page.query_selector_all('table:first-of-type tr:not(:first-child)')
-            print(f"Found {len(rows)} data rows")
-            
-            for row in rows:
-                cells = await row.query_selector_all('td')
-                
-                if len(cells) >= len(headers):
-                    team_data = {}
-                    
-                    for i, cell in enumerate(cells):
-                        if i in header_mapping:
-                            # For team names, extract the text but also check for images with alt text
-                            if header_mapping[i] == 'Joukkue':
-                                team_name = await cell.text_content()
-                                team_img = await cell.query_selector('img')
-                                if team_img:
-                                    alt_text = await team_img.get_attribute('alt')
-                                    if alt_text:
-                                        team_name = alt_text
-                                team_data[header_mapping[i]] = team_name.strip()
-                            else:
-                                cell_text = await cell.text_content()
-                                team_data[header_mapping[i]] = cell_text.strip()
-                    
-                    league_table.append(team_data)
-            
-            print(f"Extracted {len(league_table)} teams")
-            
-            # Print first team for verification
-            if league_table:
-                print(f"Sample team data: {league_table[0]}")
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(league_table)
-            
-            # Save data
-            df.to_csv('Sarjataulukko.csv', index=False, encoding='utf-8')
-            with open('Sarjataulukko.json', 'w', encoding='utf-8') as f:
-                json.dump(league_table, f, ensure_ascii=False, indent=2)
-            
-            # Create Markdown
-            create_league_table_markdown(df)
-            
-            await browser.close()
-            return df
-            
-        except Exception as e:
-            print(f"Error fetching league table: {e}")
-            traceback.print_exc()
-            
-            # Save error screenshot
-            await save_screenshot(page, "league_table_error")
-            
-            await browser.close()
+    competition = competition or get_competition()
+    print(f"\n=== FETCHING LEAGUE TABLE ({competition['name']}) ===")
+
+    # Navigate to the league table page
+    url = group_url(competition)
+    page_name = "league_table"
+    print(f"Loading URL: {url}")
+
+    try:
+        # Navigate and wait until the table has data
+        signal = await load_until_ready(page, url, page_name, competition=competition['key'])
+
+        print(f"Page ready ({signal})")
+
+        # Extract all tables on the page in one round trip
+        with span('extraction', page=page_name, competition=competition['key']) as s:
+            tables = await extract_tables(page)
+            s.rows = sum(len(table['rows']) for table in tables)
+        print(f"Found {len(tables)} tables on the page")
+
+        if not tables:
+            print("No tables found on the page!")
+            await save_debug_files(page, "league_table", screenshot, manifest)
             return None
 
-async def get_fixtures():
+        # Process the first table (usually the standings table)
+        print(f"Headers: {tables[0]['headers']}")
+        print(f"Found {len(tables[0]['rows'])} data rows")
+        league_table = parse_league_table(tables[0])
+
+        print(f"Extracted {len(league_table)} teams")
+
+        # Print first team for verification
+        if league_table:
+            print(f"Sample team data: {league_table[0]}")
+
+        # Only save the debug files when the data has changed
+        if manifest is None or manifest.records_changed('league_table', league_table):
+            await save_debug_files(page, "league_table", screenshot, manifest)
+            write_output("league_table_content.html", tables[0]['html'], manifest)
+
+        return save_league_table(league_table, manifest, competition['name'])
+
+    except Exception as e:
+        print(f"Error fetching league table: {e}")
+        traceback.print_exc()
+
+        # Save error screenshot
+        await save_screenshot(page, "league_table_error", manifest)
+        return None
+
+async def get_fixtures(page, screenshot=True, manifest=None, competition=None):
     """Get fixtures using Playwright"""
-    print("\n=== FETCHING FIXTURES ===")
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        # Set viewport size
-        await page.set_viewport_size({"width": 1280, "height": 800})
-        
-        # Navigate to the fixtures page
-        url = "https://tulospalvelu.palloliitto.fi/category/M1L!spljp25/group/1/fixtures"
-        print(f"Loading URL: {url}")
-        
-        try:
-            # Navigate with a timeout of 60 seconds
-            await page.goto(url, timeout=60000)
-            
-            # Wait for the page to load completely
-            await page.wait_for_load_state("networkidle")
-            
-            print("Page loaded successfully")
-            
-            # Save screenshot and HTML for debugging
-            await save_screenshot(page, "fixtures_screenshot")
-            html = await save_html(page, "fixtures.html")
-            
-            # Find all tables on the page
-            tables = await page.query_selector_all('table')
-            print(f"Found {len(tables)} tables on the page")
-            
-            if not tables:
-                print("No tables found on the page!")
-                await browser.close()
-                return None
-            
-            # Process the first table (usually the fixtures table)
-            fixtures = []
-            
-            # Extract the table content
-            table_html = await tables[0].inner_html()
-            with open("fixtures_table_content.html", "w", encoding="utf-8") as f:
-                f.write(table_html)
-            
-            # Get headers
-            headers = await page.eval_on_selector_all('table:first-of-type th', 
-                                                   'elements => elements.map(e => e.textContent.trim())')
-            print(f"Headers: {headers}")
-            
-            # Try to identify column positions based on headers
-            date_col = -1
-            time_col = -1
-            teams_col = -1
-            result_col = -1
-            venue_col = -1
-            
-            for i, header in enumerate(headers):
-                header_lower = header.lower()
-                if any(date_term in header_lower for date_term in ['date', 'päivä', 'pvm']):
-                    date_col = i
-                elif any(time_term in header_lower for time_term in ['time', 'aika', 'klo']):
-                    time_col = i
-                elif any(teams_term in header_lower for teams_term in ['teams', 'joukkueet']):
-                    teams_col = i
-                elif any(result_term in header_lower for result_term in ['result', 'tulos']):
-                    result_col = i
-                elif any(venue_term in header_lower for venue_term in ['venue', 'paikka', 'stadion']):
-                    venue_col = i
-            
-            # If headers don't help, guess based on common positions
-            if date_col == -1:
-                date_col = 0  # First column often contains date
-            if time_col == -1:
-                time_col = 1  # Second column often contains time
-            if teams_col == -1:
-                teams_col = 2  # Third column often contains teams
-            if result_col == -1:
-                result_col = 3  # Fourth column often contains results
-            if venue_col == -1:
-                venue_col = 4  # Fifth column often contains venue
-            
-            print(f"Column positions - Date: {date_col}, Time: {time_col}, Teams: {teams_col}, Result: {result_col}, Venue: {venue_col}")
-            
-            # Get all rows (skip header row)
-            rows = await page.query_selector_all('table:first-of-type tr:not(:first-child)')
-            print(f"Found {len(rows)} data rows")
-            
-            for i, row in enumerate(rows):
-                cells = await row.query_selector_all('td')
-                
-                if len(cells) >= 3:  # Need at least date, time, and teams
-                    match_data = {'Row': i+1}  # Add row number for debugging
-                    
-                    # Extract data based on identified columns
-                    if date_col >= 0 and date_col < len(cells):
-                        date_text = await cells[date_col].text_content()
-                        match_data['Pelipäivä'] = date_text.strip()
-                    else:
-                        match_data['Pelipäivä'] = ""
-                    
-                    if time_col >= 0 and time_col < len(cells):
-                        time_text = await cells[time_col].text_content()
-                        match_data['Klo'] = time_text.strip()
-                    else:
-                        match_data['Klo'] = ""
-                    
-                    # Teams - might be in format "Home - Away"
-                    if teams_col >= 0 and teams_col < len(cells):
-                        teams_text = await cells[teams_col].text_content()
-                        teams_text = teams_text.strip()
-                        
-                        if " - " in teams_text:
-                            home, away = teams_text.split(" - ", 1)
-                            match_data['Koti'] = home.strip()
-                            match_data['Vieras'] = away.strip()
-                        else:
-                            match_data['Koti'] = teams_text
-                            match_data['Vieras'] = ""
-                    else:
-                        match_data['Koti'] = ""
-                        match_data['Vieras'] = ""
-                    
-                    # Result - might be in format "0-0"
-                    if result_col >= 0 and result_col < len(cells):
-                        result_text = await cells[result_col].text_content()
-                        result_text = result_text.strip()
-                        
-                        if "-" in result_text:
-                            try:
-                                home_score, away_score = result_text.split("-", 1)
-                                match_data['Kotitulos'] = home_score.strip()
-                                match_data['Vierastulos'] = away_score.strip()
-                            except ValueError:
-                                match_data['Kotitulos'] = ""
-                                match_data['Vierastulos'] = ""
-                        else:
-                            match_data['Kotitulos'] = ""
-                            match_data['Vierastulos'] = ""
-                    else:
-                        match_data['Kotitulos'] = ""
-                        match_data['Vierastulos'] = ""
-                    
-                    # Venue
-                    if venue_col >= 0 and venue_col < len(cells):
-                        venue_text = await cells[venue_col].text_content()
-                        match_data['Paikka'] = venue_text.strip()
-                    else:
-                        match_data['Paikka'] = ""
-                    
-                    # Only add if we have meaningful data
-                    if match_data['Pelipäivä'] and (match_data['Koti'] or match_data['Vieras']):
-                        fixtures.append(match_data)
-            
-            print(f"Extracted {len(fixtures)} fixtures")
-            
-            # Print first fixture for verification
-            if fixtures:
-                print(f"Sample fixture data: {fixtures[0]}")
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(fixtures)
-            
-            # Save data
-            df.to_csv('Ottelut.csv', index=False, encoding='utf-8')
-            df.to_csv('tulokset.csv', index=False, encoding='utf-8')
-            df.to_csv('PelatutOttelut.csv', index=False, encoding='utf-8')
-            
-            with open('Ottelut.json', 'w', encoding='utf-8') as f:
-                json.dump(fixtures, f, ensure_ascii=False, indent=2)
-            
-            # Create Markdown
-            create_fixtures_markdown(df)
-            
-            await browser.close()
-            return df
-            
-        except Exception as e:
-            print(f"Error fetching fixtures: {e}")
-            traceback.print_exc()
-            
-            # Save error screenshot
-            await save_screenshot(page, "fixtures_error")
-            
-            await browser.close()
-            return None
+    competition = competition or get_competition()
+    print(f"\n=== FETCHING FIXTURES ({competition['name']}) ===")
+
+    # Navigate to the fixtures page
+    url = group_url(competition, "fixtures")
+    page_name = "fixtures"
+    print(f"Loading URL: {url}")
 
-def create_league_table_markdown(df):
-    """Create a markdown file for the league table"""
     try:
-        with open('Sarjataulukko.md', 'w', encoding='utf-8') as f:
-            f.write('# Sarjataulukko - Ykkönen\n\n')
-            
-            # Determine which columns we have
-            columns = []
-            headers = []
-            
-            if 'Sijoitus' in df.columns:
-                columns.append('Sijoitus')
-                headers.append('Sij.')
-            if 'Joukkue' in df.columns:
-                columns.append('Joukkue')
-                headers.append('Joukkue')
-            if 'Ottelut' in df.columns:
-                columns.append('Ottelut')
-                headers.append('O')
-            if 'Voitot' in df.columns:
-                columns.append('Voitot')
-                headers.append('V')
-            if 'Tasapelit' in df.columns:
-                columns.append('Tasapelit')
-                headers.append('T')
-            if 'Tappiot' in df.columns:
-                columns.append('Tappiot')
-                headers.append('H')
-            if 'Tehdyt maalit' in df.columns:
-                columns.append('Tehdyt maalit')
-                headers.append('TM')
-            if 'Päästetyt maalit' in df.columns:
-                columns.append('Päästetyt maalit')
-                headers.append('PM')
-            if 'Maaliero' in df.columns:
-                columns.append('Maaliero')
-                headers.append('ME')
-            if 'Pisteet' in df.columns:
-                columns.append('Pisteet')
-                headers.append('P')
-            
-            # If we don't have the expected columns, use all available columns
-            if len(columns) < 5:
-                columns = df.columns.tolist()
-                headers = columns.copy()
-            
-            # Create header row
-            f.write('| ' + ' | '.join(headers) + ' |\n')
-            f.write('| ' + ' | '.join(['---' for _ in headers]) + ' |\n')
-            
-            # Write data rows
-            for _, row in df.iterrows():
-                values = []
-                for col in columns:
-                    values.append(str(row.get(col, '')))
-                f.write('| ' + ' | '.join(values) + ' |\n')
-        
-        print("Created Sarjataulukko.md successfully")
+        # Navigate and wait until the table has data
+        signal = await load_until_ready(page, url, page_name, competition=competition['key'])
+
+        print(f"Page ready ({signal})")
+
+        # Extract all tables on the page in one round trip
+        with span('extraction', page=page_name, competition=competition['key']) as s:
+            tables = await extract_tables(page)
+            s.rows = sum(len(table['rows']) for table in tables)
+        print(f"Found {len(tables)} tables on the page")
+
+        if not tables:
+            print("No tables found on the page!")
+            await save_debug_files(page, "fixtures", screenshot, manifest)
+            return None
+
+        # Process the first table (usually the fixtures table)
+        print(f"Headers: {tables[0]['headers']}")
+        print(f"Found {len(tables[0]['rows'])} data rows")
+        fixtures = parse_fixtures(tables[0])
+
+        print(f"Extracted {len(fixtures)} fixtures")
+
+        # Print first fixture for verification
+        if fixtures:
+            print(f"Sample fixture data: {fixtures[0]}")
+
+        # Only save the debug files when the data has changed
+        if manifest is None or manifest.records_changed('fixtures', fixtures):
+            await save_debug_files(page, "fixtures", screenshot, manifest)
+            write_output("fixtures_table_content.html", tables[0]['html'], manifest)
+
+        return save_fixtures(fixtures, manifest, competition['name'])
+
     except Exception as e:
-        print(f"Error creating league table markdown: {e}")
+        print(f"Error fetching fixtures: {e}")
         traceback.print_exc()
 
-def create_fixtures_markdown(df):
-    """Create a markdown file for fixtures"""
+        # Save error screenshot
+        await save_screenshot(page, "fixtures_error", manifest)
+        return None
+
+async def compare_extraction(url=None, repeats=3):
+    """Time the bulk extraction against the per-cell path on the same loaded page"""
+    print("\n=== COMPARING TABLE EXTRACTION ===")
+    url = url or group_url(get_competition(), "fixtures")
+
+    async with shared_browser() as browser, open_page(browser) as page:
+        print(f"Loading URL: {url}")
+        await page.goto(url, timeout=60000)
+        await page.wait_for_load_state("networkidle")
+
+        timings = {}
+        results = {}
+        for name, extractor in [('per-cell', extract_tables_per_cell), ('bulk', extract_tables)]:
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                results[name] = await extractor(page)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        cell_count = sum(len(row['cells']) for table in results['bulk'] for row in table['rows'])
+        print(f"Tables: {len(results['bulk'])}, cells: {cell_count}")
+        print(f"Per-cell extraction: {timings['per-cell'] * 1000:.1f} ms (best of {repeats})")
+        print(f"Bulk extraction:     {timings['bulk'] * 1000:.1f} ms (best of {repeats})")
+        if timings['bulk'] > 0:
+            print(f"Speedup: {timings['per-cell'] / timings['bulk']:.1f}x")
+        print(f"Identical output: {results['per-cell'] == results['bulk']}")
+        return timings
+
+async def compare_waits(url=None, repeats=5, idle_timeout=30000):
+    """Time networkidle waits against readiness waits on fresh pages"""
+    print("\n=== COMPARING PAGE WAITS ===")
+    url = url or group_url(get_competition())
+
+    timings = {'networkidle': [], 'ready': []}
+    async with shared_browser() as browser:
+        for _ in range(repeats):
+            async with open_page(browser) as page:
+                start = time.perf_counter()
+                try:
+                    await page.goto(url, timeout=60000)
+                    await page.wait_for_load_state("networkidle", timeout=idle_timeout)
+                except Exception as e:
+                    print(f"networkidle wait failed: {e}")
+                timings['networkidle'].append(time.perf_counter() - start)
+
+            async with open_page(browser) as page:
+                start = time.perf_counter()
+                # A fresh timeout each round keeps earlier runs out of the comparison
+                await load_until_ready(page, url, "league_table", timeout=AdaptiveTimeout())
+                timings['ready'].append(time.perf_counter() - start)
+
+    for name, samples in timings.items():
+        print(f"{name:12} median {statistics.median(samples) * 1000:8.1f} ms, "
+              f"max {max(samples) * 1000:8.1f} ms ({repeats} loads)")
+    return timings
+
+async def scrape_league_table(browser, profile="lean", stats=None, manifest=None, competition=None):
+    """Load and extract the league table in its own context of the shared browser"""
+    async with open_page(browser, profile, stats) as page:
+        return await get_league_table(page, LOAD_PROFILES[profile]["screenshot"], manifest, competition)
+
+async def scrape_fixtures(browser, profile="lean", stats=None, manifest=None, competition=None):
+    """Load and extract the fixtures in their own context of the shared browser"""
+    async with open_page(browser, profile, stats) as page:
+        return await get_fixtures(page, LOAD_PROFILES[profile]["screenshot"], manifest, competition)
+
+def fetch_with_http(manifest=None, competition=None, client=None):
+    """Fetch the league table and fixtures straight from the data API"""
+    competition = competition or get_competition()
+    print(f"\n=== FETCHING VIA HTTP API ({competition['name']}) ===")
+    own_client = client is None
+    client = client or TulospalveluClient()
     try:
-        with open('PelatutOttelut.md', 'w', encoding='utf-8') as f:
-            f.write('# Ottelut - Ykkönen\n\n')
-            f.write('| Päivä | Aika | Koti | Vieras | Tulos | Paikka |\n')
-            f.write('| ----- | ---- | ---- | ------ | ----- | ------ |\n')
-            
-            for _, row in df.iterrows():
-                # Format the score if available
-                tulos = ""
-                if 'Kotitulos' in df.columns and 'Vierastulos' in df.columns:
-                    if pd.notna(row['Kotitulos']) and pd.notna(row['Vierastulos']):
-                        if row['Kotitulos'] and row['Vierastulos']:
-                            tulos = f"{row['Kotitulos']}-{row['Vierastulos']}"
-                
-                f.write(f"| {row.get('Pelipäivä', '')} | {row.get('Klo', '')} | " +
-                        f"{row.get('Koti', '')} | {row.get('Vieras', '')} | " +
-                        f"{tulos} | {row.get('Paikka', '')} |\n")
-        
-        print("Created PelatutOttelut.md successfully")
+        league_table, fixtures, changed = fetch_group(client, competition['competition_id'],
+                                                      competition['category_id'], competition['group_id'])
+        print(f"Fetched {len(league_table)} teams and {len(fixtures)} matches for {competition['name']} "
+              f"(changed: {changed})")
+        # A group always lists its teams; before the season starts it has
+        # no matches yet, which is valid data
+        if not league_table:
+            print("HTTP API returned no data")
+            return None, None
+        return (save_league_table(league_table, manifest, competition['name']),
+                save_fixtures(fixtures, manifest, competition['name']))
     except Exception as e:
-        print(f"Error creating fixtures markdown: {e}")
+        print(f"Error fetching from HTTP API: {e}")
         traceback.print_exc()
+        return None, None
+    finally:
+        if own_client:
+            client.close()
+
+def is_missing(result):
+    """Whether the league table or the fixtures of a (league_data, fixtures_data) result failed"""
+    return any(data is None for data in result)
+
+async def scrape_competitions(competitions, manifests, backend="auto", profile="lean",
+                              stats=None, budget=None, deadline=None, attempts=2):
+    """Fetch every competition concurrently within one request budget.
+
+    The HTTP backend shares one pooled client and the browser backend one
+    Chromium, so the run time grows with the number of concurrency slots
+    rather than with the number of competitions. Failed page loads are
+    retried up to attempts times with jittered backoff while the deadline
+    leaves time for it. Returns {key: (league_data, fixtures_data)}.
+    """
+    budget = budget or RequestBudget()
+    deadline = deadline or Deadline()
+    results = {competition['key']: (None, None) for competition in competitions}
+
+    if backend in ("auto", "http"):
+        client = TulospalveluClient()
+        try:
+            async def via_http(competition):
+                async with budget.slot(client.base_url):
+                    return await asyncio.to_thread(fetch_with_http, manifests[competition['key']],
+                                                   competition, client)
+
+            fetched = await asyncio.gather(*[via_http(competition) for competition in competitions])
+            results.update(zip([competition['key'] for competition in competitions], fetched))
+        finally:
+            client.close()
+
+    # Playwright is the fallback when the data API is unavailable
+    if backend == "browser":
+        pending = competitions
+    elif backend == "auto":
+        pending = [competition for competition in competitions if is_missing(results[competition['key']])]
+    else:
+        pending = []
+
+    if pending and deadline.expired:
+        print("Run deadline reached, skipping the browser fallback")
+    elif pending:
+        # Two page loads per competition share out the remaining time
+        deadline.plan(2 * len(pending))
+        # Launch Chromium once; each page load gets its own context
+        async with shared_browser() as browser:
+            async def via_browser(competition):
+                manifest = manifests[competition['key']]
+
+                async def load(scrape, page_name):
+                    for attempt in range(attempts):
+                        async with budget.slot(group_url(competition, page_name)):
+                            try:
+                                data = await scrape(browser, profile, stats, manifest, competition)
+                            finally:
+                                deadline.page_done()
+                        delay = backoff(attempt)
+                        if data is not None or attempt == attempts - 1 or delay + 1 >= deadline.remaining():
+                            return data
+                        print(f"Retrying {competition['key']} {page_name or 'league table'} in {delay:.2f} s")
+                        deadline.plan()
+                        await asyncio.sleep(delay)
+
+                return await asyncio.gather(load(scrape_league_table, ""), load(scrape_fixtures, "fixtures"))
+
+            fetched = await asyncio.gather(*[via_browser(competition) for competition in pending])
+            results.update(zip([competition['key'] for competition in pending], map(tuple, fetched)))
+        if stats is not None:
+            print(f"Network: {stats.summary()}")
+
+    return results
 
 def update_timestamp():
     """Update the timestamp file"""
@@ -440,48 +530,77 @@ def update_timestamp():
         print(f"Error updating timestamp: {e}")
         return None
 
-async def main():
+async def run_scraper(profile="lean", backend="auto", competition_keys=None, concurrency=8, per_host=4,
+                      history_file=HISTORY_FILE, deadline=RUN_DEADLINE):
     print("\n" + "=" * 80)
     print("STARTING FOOTBALL DATA SCRAPER - YKKÖNEN (PLAYWRIGHT VERSION)")
     print("=" * 80)
     
-    timestamp = update_timestamp()
-    print(f"Starting at: {timestamp}")
-    success = False
+    print(f"Starting at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Backend: {backend}, load profile: {profile}, deadline: {f'{deadline:.0f} s' if deadline else 'none'}")
+    network_stats = NetworkStats()
     
     try:
-        # Get league table
-        league_data = await get_league_table()
+        registry = load_registry()
+        competitions = [get_competition(key, registry) for key in (competition_keys or [DEFAULT_COMPETITION])]
+        # Without an explicit competition list the default competition keeps
+        # writing to the repository root; listed competitions get their own directories
+        manifests = {
+            competition['key']: Manifest(output_dir(competition) if competition_keys else "")
+            for competition in competitions
+        }
         
-        # Get fixtures
-        fixtures_data = await get_fixtures()
+        start = time.perf_counter()
+        with running(Deadline(deadline, concurrency)) as run_deadline:
+            results = await scrape_competitions(competitions, manifests, backend, profile, network_stats,
+                                                RequestBudget(concurrency, per_host), run_deadline)
+        print(f"Fetched {len(competitions)} competitions in {time.perf_counter() - start:.1f} s")
+        
+        # What could not be fetched in time keeps its files from the last good run
+        stale = serve_last_good(competitions, manifests, results)
+        
+        success = any(data is not None for result in results.values() for data in result)
+        if success and not any(manifest.dirty for manifest in manifests.values()):
+            # Nothing to write, so the workflow has nothing to commit either
+            print("\n=== NO CHANGES SINCE LAST RUN ===")
+            return True
+        
+        if history_file:
+            record_history(competitions, manifests, results, history_file)
+        
+        timestamp = update_timestamp()
         
         # Create a log summary
         with open('scraper_log.txt', 'w') as f:
             f.write(f"Scraper run at: {timestamp}\n\n")
             
-            f.write("=== LEAGUE TABLE ===\n")
-            if league_data is not None:
-                f.write(f"Successfully scraped league table with {len(league_data)} teams\n")
-                success = True
-            else:
-                f.write("Failed to scrape league table\n")
+            for competition in competitions:
+                league_data, fixtures_data = results[competition['key']]
+                if len(competitions) > 1:
+                    f.write(f"##### {competition['name']} ({competition['key']}) #####\n\n")
+                
+                f.write("=== LEAGUE TABLE ===\n")
+                if league_data is not None:
+                    f.write(f"Successfully scraped league table with {len(league_data)} teams\n")
+                else:
+                    f.write("Failed to scrape league table\n")
+                
+                f.write("\n=== FIXTURES ===\n")
+                if fixtures_data is not None:
+                    f.write(f"Successfully scraped fixtures with {len(fixtures_data)} matches\n\n")
+                else:
+                    f.write("Failed to scrape fixtures\n\n")
+                
+                if competition['key'] in stale:
+                    f.write("Serving the last good snapshot for the missing data\n\n")
             
-            f.write("\n=== FIXTURES ===\n")
-            if fixtures_data is not None:
-                f.write(f"Successfully scraped fixtures with {len(fixtures_data)} matches\n")
-                success = True
-            else:
-                f.write("Failed to scrape fixtures\n")
+            f.write(f"=== NETWORK ({profile} profile) ===\n")
+            f.write(f"Requests: {network_stats.requests}\n")
+            f.write(f"Blocked requests: {network_stats.blocked}\n")
+            f.write(f"Bytes transferred: {network_stats.bytes_transferred}\n")
         
-        # Update files' modification time
-        if success:
-            for filename in ['tulokset.csv', 'Ottelut.csv', 'Sarjataulukko.csv', 
-                            'PelatutOttelut.csv', 'PelatutOttelut.md', 
-                            'Sarjataulukko.md', 'timestamp.txt']:
-                if os.path.exists(filename):
-                    os.utime(filename, None)
-                    print(f"Updated modification time for {filename}")
+        for manifest in manifests.values():
+            manifest.save()
         
         print("\n=== SCRAPER COMPLETED ===")
         return success
@@ -497,5 +616,96 @@ async def main():
         
         return False
 
+def serve_last_good(competitions, manifests, results):
+    """Keys of the competitions that keep the files of their last good run.
+
+    Data that failed or ran out of time is simply not written, so the
+    store and the files derived from it still hold the previous snapshot.
+    """
+    stale = set()
+    for competition in competitions:
+        if not is_missing(results[competition['key']]):
+            continue
+        if has_store(manifests[competition['key']].output_dir):
+            print(f"Serving the last good snapshot of {competition['name']}")
+            stale.add(competition['key'])
+        else:
+            print(f"No earlier snapshot of {competition['name']} to serve")
+    return stale
+
+def record_history(competitions, manifests, results, history_file=HISTORY_FILE):
+    """Append a snapshot of every competition whose data changed to the history database"""
+    for competition in competitions:
+        league_data, fixtures_data = results[competition['key']]
+        if not manifests[competition['key']].dirty or (league_data is None and fixtures_data is None):
+            continue
+        try:
+            with span('history_write', competition=competition['key']) as s:
+                s.rows = sum(len(data) for data in (league_data, fixtures_data) if data is not None)
+                record_snapshot(competition['key'], league_data, fixtures_data, history_file)
+        except Exception as e:
+            print(f"Error recording history of {competition['key']}: {e}")
+
+def save_metrics(recorder, metrics_file=METRICS_FILE, prometheus_file=None):
+    """Append the run's phase spans to the metrics file and export the totals"""
+    try:
+        if metrics_file:
+            recorder.write_jsonl(metrics_file)
+        if prometheus_file:
+            recorder.write_prometheus(prometheus_file)
+        print(f"Recorded {len(recorder.spans)} timing spans for run {recorder.run_id}")
+    except Exception as e:
+        print(f"Error saving metrics: {e}")
+
+async def main(profile="lean", backend="auto", competition_keys=None, concurrency=8, per_host=4,
+               metrics_file=METRICS_FILE, prometheus_file=None, history_file=HISTORY_FILE,
+               deadline=RUN_DEADLINE):
+    """Run the scraper with every phase timed into the metrics file"""
+    recorder = MetricsRecorder()
+    with recording(recorder):
+        try:
+            with span('run', backend=backend, profile=profile) as s:
+                success = await run_scraper(profile, backend, competition_keys, concurrency, per_host,
+                                            history_file, deadline)
+                s.ok = bool(success)
+                return success
+        finally:
+            save_metrics(recorder, metrics_file, prometheus_file)
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Scrape the Ykkönen league table and fixtures")
+    parser.add_argument("--profile", choices=sorted(LOAD_PROFILES),
+                        default=os.environ.get("SCRAPER_PROFILE", "lean"),
+                        help="page-load profile (default: $SCRAPER_PROFILE or lean)")
+    parser.add_argument("--backend", choices=["auto", "http", "browser"], default="auto",
+                        help="data source; auto tries the HTTP API and falls back to Playwright")
+    parser.add_argument("--competition", action="append", dest="competitions", metavar="KEY",
+                        help="competition to scrape into output/KEY/ (repeatable)")
+    parser.add_argument("--all-competitions", action="store_true",
+                        help="scrape every competition in the registry")
+    parser.add_argument("--concurrency", type=int, default=8, help="global cap on concurrent loads")
+    parser.add_argument("--per-host", type=int, default=4, help="concurrent loads per host")
+    parser.add_argument("--metrics", default=os.environ.get("SCRAPER_METRICS_FILE", METRICS_FILE),
+                        help="JSONL file the phase timings are appended to ('' to disable)")
+    parser.add_argument("--history", default=os.environ.get("SCRAPER_HISTORY_FILE", HISTORY_FILE),
+                        help="SQLite database every changed snapshot is appended to ('' to disable)")
+    parser.add_argument("--deadline", type=float, default=RUN_DEADLINE,
+                        help="seconds the whole run may take (default: $SCRAPER_DEADLINE or 240, 0 for no limit)")
+    parser.add_argument("--prometheus", metavar="FILE",
+                        help="also write per-phase totals in Prometheus text format")
+    parser.add_argument("--compare-extraction", action="store_true",
+                        help="time bulk vs per-cell table extraction and exit")
+    parser.add_argument("--compare-waits", action="store_true",
+                        help="time networkidle vs readiness waits and exit")
+    args = parser.parse_args()
+    
+    if args.compare_extraction:
+        asyncio.run(compare_extraction())
+    elif args.compare_waits:
+        asyncio.run(compare_waits())
+    else:
+        competition_keys = sorted(load_registry()) if args.all_competitions else args.competitions
+        success = asyncio.run(main(args.profile, args.backend, competition_keys, args.concurrency,
+                                   args.per_host, args.metrics, args.prometheus, args.history, args.deadline))
+        # A failed run lets the workflow fall back to fallback_data.py
+        exit(0 if success else 1)
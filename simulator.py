@@ -0,0 +1,194 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import render
+from manifest import write_output
+from standings import coerce_scores
+from schema import load_matches, load_table
+
+# Goals per team and match when nothing has been played yet, and the home
+# advantage applied as a multiplier to the home side and divisor to the away side
+DEFAULT_GOALS = 1.35
+HOME_ADVANTAGE = 1.15
+# Matches of evidence that weigh as much as the league average when a team's
+# attack and defence ratings are estimated
+PRIOR_MATCHES = 5
+CHUNK_SIZE = 50_000
+# Goals beyond this are counted as this many
+MAX_GOALS = 15
+
+def _number(value):
+    number = pd.to_numeric(value, errors='coerce')
+    return 0 if pd.isna(number) else int(number)
+
+def load_season(table_file='Sarjataulukko.json', fixtures_file='Ottelut.csv'):
+    """Current table records and all fixture rows, preferring the data store"""
+    return load_table(table_file), load_matches(fixtures_file)
+
+def prepare(table, fixtures):
+    """Arrays for the simulation: current totals, remaining fixtures and goal rates.
+
+    Teams are sorted by name so a tie on points, goal difference and goals
+    scored is broken by name, like compute_standings does.
+    """
+    home_scores = coerce_scores(fixtures, 'Kotitulos')
+    away_scores = coerce_scores(fixtures, 'Vierastulos')
+    remaining = fixtures[fixtures['Koti'].notna() & fixtures['Vieras'].notna()
+                         & (home_scores.isna() | away_scores.isna())]
+
+    teams = sorted(set(table['Joukkue'].dropna()) | set(remaining['Koti']) | set(remaining['Vieras']))
+    index = {team: i for i, team in enumerate(teams)}
+    current = {column: np.zeros(len(teams), dtype=np.int64)
+               for column in ['Ottelut', 'Pisteet', 'Tehdyt maalit', 'Päästetyt maalit']}
+    for record in table.to_dict('records'):
+        if record.get('Joukkue') in index:
+            for column, values in current.items():
+                values[index[record['Joukkue']]] = _number(record.get(column))
+
+    played = current['Ottelut']
+    total_matches = played.sum()
+    average = current['Tehdyt maalit'].sum() / total_matches if total_matches else DEFAULT_GOALS
+    average = average or DEFAULT_GOALS
+    # Per-match scoring and conceding relative to the league, shrunk towards
+    # the average while a team has played only a few matches
+    weight = played / (played + PRIOR_MATCHES)
+    per_match = np.maximum(played, 1)
+    attack = weight * (current['Tehdyt maalit'] / per_match / average) + (1 - weight)
+    defence = weight * (current['Päästetyt maalit'] / per_match / average) + (1 - weight)
+
+    home = remaining['Koti'].map(index).to_numpy()
+    away = remaining['Vieras'].map(index).to_numpy()
+    return {
+        'teams': teams,
+        'points': current['Pisteet'],
+        'goals_for': current['Tehdyt maalit'],
+        'goals_against': current['Päästetyt maalit'],
+        'home': home,
+        'away': away,
+        'home_rate': average * HOME_ADVANTAGE * attack[home] * defence[away],
+        'away_rate': average / HOME_ADVANTAGE * attack[away] * defence[home],
+    }
+
+def _goal_cdf(rates, max_goals=MAX_GOALS):
+    """Poisson CDF of 0..max_goals goals for every rate; the last bin takes the tail"""
+    goals = np.arange(max_goals + 1)
+    factorials = np.cumprod(np.maximum(goals, 1)).astype(np.float64)
+    cdf = np.cumsum(np.exp(-rates[:, None]) * rates[:, None] ** goals / factorials, axis=1)
+    cdf = cdf.astype(np.float32)
+    cdf[:, -1] = 1.0
+    return cdf
+
+def _sample_goals(rng, cdf, simulations):
+    """One array of sampled goals per fixture across all simulations, by inverse CDF"""
+    uniform = rng.random((len(cdf), simulations), dtype=np.float32)
+    goals = np.empty(uniform.shape, dtype=np.int8)
+    for fixture in range(len(cdf)):
+        goals[fixture] = np.searchsorted(cdf[fixture], uniform[fixture], side='right')
+    return goals
+
+def simulate_chunk(season, simulations, seed):
+    """Play the remaining fixtures simulations times; returns (position counts, points sum)"""
+    rng = np.random.default_rng(seed)
+    team_count = len(season['teams'])
+
+    home_goals = _sample_goals(rng, _goal_cdf(season['home_rate']), simulations)
+    away_goals = _sample_goals(rng, _goal_cdf(season['away_rate']), simulations)
+    home_points = np.where(home_goals > away_goals, 3, (home_goals == away_goals).astype(np.int8))
+    away_points = np.where(home_goals < away_goals, 3, (home_goals == away_goals).astype(np.int8))
+
+    # Team totals as (team, simulation) arrays, one vector add per fixture and side
+    points = np.repeat(season['points'][:, None], simulations, axis=1).astype(np.int32)
+    goals_for = np.repeat(season['goals_for'][:, None], simulations, axis=1).astype(np.int32)
+    goal_difference = np.repeat((season['goals_for'] - season['goals_against'])[:, None],
+                                simulations, axis=1).astype(np.int32)
+    for fixture, (home, away) in enumerate(zip(season['home'], season['away'])):
+        points[home] += home_points[fixture]
+        points[away] += away_points[fixture]
+        goals_for[home] += home_goals[fixture]
+        goals_for[away] += away_goals[fixture]
+        margin = home_goals[fixture].astype(np.int32) - away_goals[fixture]
+        goal_difference[home] += margin
+        goal_difference[away] -= margin
+
+    # Points, then goal difference, then goals scored in one sortable key; the
+    # stable sort keeps name order for complete ties
+    key = ((points.astype(np.int64) << 40) + ((goal_difference + (1 << 19)).astype(np.int64) << 20)
+           + goals_for).T
+    order = np.argsort(-key, axis=1, kind='stable')
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(team_count), axis=1)
+
+    counts = np.bincount((np.arange(team_count) * team_count + positions).ravel(),
+                         minlength=team_count * team_count).reshape(team_count, team_count)
+    return counts, points.sum(axis=1)
+
+def _chunk_sizes(simulations, chunk_size=CHUNK_SIZE):
+    sizes = [chunk_size] * (simulations // chunk_size)
+    if simulations % chunk_size:
+        sizes.append(simulations % chunk_size)
+    return sizes
+
+def simulate(season, simulations=1_000_000, workers=None, seed=None):
+    """Position probabilities of every team over simulated seasons.
+
+    Returns a DataFrame indexed by team with one probability column per final
+    position plus the expected final points.
+    """
+    sizes = _chunk_sizes(simulations)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            results = list(pool.map(simulate_chunk, [season] * len(sizes), sizes, seeds))
+    else:
+        results = [simulate_chunk(season, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    counts = sum(result[0] for result in results)
+    points = sum(result[1] for result in results)
+    team_count = len(season['teams'])
+    probabilities = pd.DataFrame(counts / simulations, index=season['teams'],
+                                 columns=[str(position) for position in range(1, team_count + 1)])
+    probabilities.insert(0, 'Odotetut pisteet', points / simulations)
+    return probabilities.sort_values('Odotetut pisteet', ascending=False, kind='mergesort')
+
+def save_probabilities(probabilities, relegated=1, filename='Simulaatio'):
+    """Save the full position table as CSV and a title/relegation summary as Markdown"""
+    write_output(f'{filename}.csv', probabilities.rename_axis('Joukkue').to_csv(float_format='%.6f'))
+
+    positions = [column for column in probabilities.columns if column != 'Odotetut pisteet']
+    relegation = probabilities[positions[-relegated:]].sum(axis=1) if relegated else \
+        pd.Series(0.0, index=probabilities.index)
+    columns = [
+        list(probabilities.index),
+        [f"{value:.1f}" for value in probabilities['Odotetut pisteet']],
+        [f"{value:.1%}" for value in probabilities[positions[0]]],
+        [f"{value:.1%}" for value in relegation],
+    ]
+    write_output(f'{filename}.md', render.markdown(
+        ['Joukkue', 'Odotetut pisteet', 'Mestaruus', 'Putoaminen'], columns,
+        title='Kauden simulaatio'))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the rest of the season and report position odds")
+    parser.add_argument("--simulations", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--relegated", type=int, default=1, help="number of relegation places")
+    parser.add_argument("--table", default='Sarjataulukko.json')
+    parser.add_argument("--fixtures", default='Ottelut.csv')
+    parser.add_argument("--output", default='Simulaatio', help="output file name without extension")
+    args = parser.parse_args()
+
+    table, fixtures = load_season(args.table, args.fixtures)
+    season = prepare(table, fixtures)
+    print(f"Simulating {len(season['home'])} remaining matches of {len(season['teams'])} teams "
+          f"{args.simulations} times")
+    start = time.perf_counter()
+    probabilities = simulate(season, args.simulations, args.workers, args.seed)
+    print(f"Simulated in {time.perf_counter() - start:.1f} s")
+    save_probabilities(probabilities, args.relegated, args.output)
+    print(probabilities.to_string(float_format=lambda value: f"{value:.3f}"))
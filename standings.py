@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+STANDINGS_COLUMNS = ['Ottelut', 'Voitot', 'Tasapelit', 'Tappiot',
+                     'Tehdyt maalit', 'Päästetyt maalit', 'Maaliero', 'Pisteet']
+
+def coerce_scores(matches, column):
+    """Coerce a score column to numbers once; missing or invalid scores become NaN"""
+    if column not in matches.columns:
+        return pd.Series(np.nan, index=matches.index)
+    return np.trunc(pd.to_numeric(matches[column], errors='coerce').astype('float64'))
+
+def team_results(matches, by=None):
+    """Melt played matches into one row per team and match.
+
+    Matches with a missing team or a missing/invalid score are left out, the
+    same way the per-row loop used to skip them.
+    """
+    by = list(by or [])
+    home_goals = coerce_scores(matches, 'Kotitulos')
+    away_goals = coerce_scores(matches, 'Vierastulos')
+    played = (matches['Koti'].notna() & matches['Vieras'].notna()
+              & home_goals.notna() & away_goals.notna())
+
+    home_goals = home_goals[played].astype('int64').to_numpy()
+    away_goals = away_goals[played].astype('int64').to_numpy()
+    keys = {key: np.concatenate([matches.loc[played, key].to_numpy()] * 2) for key in by}
+
+    goals_for = np.concatenate([home_goals, away_goals])
+    goals_against = np.concatenate([away_goals, home_goals])
+    return pd.DataFrame({
+        **keys,
+        'Joukkue': np.concatenate([matches.loc[played, 'Koti'].to_numpy(),
+                                   matches.loc[played, 'Vieras'].to_numpy()]),
+        'Voitot': (goals_for > goals_against).astype('int64'),
+        'Tasapelit': (goals_for == goals_against).astype('int64'),
+        'Tappiot': (goals_for < goals_against).astype('int64'),
+        'Tehdyt maalit': goals_for,
+        'Päästetyt maalit': goals_against,
+    })
+
+def _all_teams(matches, by):
+    """Every (key..., team) pair that appears in the matches, played or not"""
+    frames = []
+    for side in ('Koti', 'Vieras'):
+        frame = matches[by + [side]].rename(columns={side: 'Joukkue'})
+        frames.append(frame[frame['Joukkue'].notna()])
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+def aggregate_results(matches, by=None):
+    """Per-team counters of the played matches, before points and ordering.
+
+    Every team that appears in the matches gets a row, zeros if it has not
+    played. Counters of separate batches of matches can be added together
+    (see streaming.stream_standings) before rank_standings is applied.
+    """
+    by = list(by or [])
+    index = by + ['Joukkue']
+
+    results = team_results(matches, by)
+    table = results.groupby(index, sort=False).agg(
+        Ottelut=('Voitot', 'size'),
+        Voitot=('Voitot', 'sum'),
+        Tasapelit=('Tasapelit', 'sum'),
+        Tappiot=('Tappiot', 'sum'),
+        **{'Tehdyt maalit': ('Tehdyt maalit', 'sum'),
+           'Päästetyt maalit': ('Päästetyt maalit', 'sum')},
+    )
+
+    # Teams without a played match still get a row of zeros
+    teams = pd.MultiIndex.from_frame(_all_teams(matches, by)) if by else \
+        pd.Index(_all_teams(matches, by)['Joukkue'], name='Joukkue')
+    return table.reindex(teams, fill_value=0).astype('int64')
+
+def rank_standings(table, by=None):
+    """Points, goal difference and positions for aggregated counters"""
+    by = list(by or [])
+    index = by + ['Joukkue']
+
+    table = table.copy()
+    table['Maaliero'] = table['Tehdyt maalit'] - table['Päästetyt maalit']
+    table['Pisteet'] = 3 * table['Voitot'] + table['Tasapelit']
+    table = table[STANDINGS_COLUMNS].reset_index()
+
+    table = table.sort_values(
+        by=by + ['Pisteet', 'Maaliero', 'Tehdyt maalit', 'Joukkue'],
+        ascending=[True] * len(by) + [False, False, False, True],
+        kind='mergesort',
+    )
+    if by:
+        table.insert(len(by), 'Sijoitus', table.groupby(by, sort=False).cumcount() + 1)
+    else:
+        table.insert(0, 'Sijoitus', np.arange(1, len(table) + 1))
+    table = table.set_index(index)
+
+    if not by:
+        table.index.name = None
+    return table
+
+def compute_standings(matches, by=None):
+    """Compute league tables from match rows with one groupby aggregation.
+
+    matches needs Koti, Vieras, Kotitulos and Vierastulos columns. Without by
+    the result is a single table indexed by team name, in the same layout
+    create_league_table_from_matches has always written. With by (a list of
+    key columns such as league and season) every key gets its own table and
+    the result is indexed by (*by, 'Joukkue').
+
+    Teams are ordered by points, goal difference and goals scored; remaining
+    ties are broken by team name so the order is deterministic.
+    """
+    return rank_standings(aggregate_results(matches, by), by)
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from standings import STANDINGS_COLUMNS, coerce_scores
+from schema import KICKOFF, kickoff_column, load_matches
+
+# Cumulative per-team counters; Maaliero is derived when a table is built
+STAT_COLUMNS = ['Ottelut', 'Voitot', 'Tasapelit', 'Tappiot',
+                'Tehdyt maalit', 'Päästetyt maalit', 'Pisteet']
+OTTELUT, VOITOT, TASAPELIT, TAPPIOT, TEHDYT, PAASTETYT, PISTEET = range(len(STAT_COLUMNS))
+
+def kickoff_times(matches):
+    """Combine Pelipäivä and Klo into one kickoff timestamp (already there in typed matches)"""
+    if KICKOFF in matches.columns:
+        return matches[KICKOFF]
+    return kickoff_column(matches['Pelipäivä'], matches['Klo'] if 'Klo' in matches.columns else None)
+
+def _increments(goals_for, goals_against):
+    """Counter increments for one side of each match"""
+    won = goals_for > goals_against
+    drawn = goals_for == goals_against
+    return np.stack([
+        np.ones_like(goals_for),
+        won,
+        drawn,
+        goals_for < goals_against,
+        goals_for,
+        goals_against,
+        3 * won + drawn,
+    ], axis=-1).astype('int64')
+
+def _positions(stats, name_rank):
+    """League positions for every snapshot at once.
+
+    stats has shape (snapshots, teams, counters). Ties are broken the same
+    way as standings.compute_standings: points, goal difference, goals
+    scored and finally team name.
+    """
+    points = stats[..., PISTEET]
+    goals_for = stats[..., TEHDYT]
+    difference = goals_for - stats[..., PAASTETYT]
+    names = np.broadcast_to(name_rank, points.shape)
+    order = np.lexsort((names, -goals_for, -difference, -points), axis=-1)
+    positions = np.empty_like(order)
+    ranks = np.broadcast_to(np.arange(1, points.shape[-1] + 1), points.shape)
+    np.put_along_axis(positions, order, ranks, axis=-1)
+    return positions
+
+def _parse_date(date):
+    """Timestamp of a dd.mm.yyyy string (the scraped format), an ISO string or a date object"""
+    if isinstance(date, str):
+        parsed = pd.to_datetime(date, format='%d.%m.%Y', errors='coerce')
+        if not pd.isna(parsed):
+            return parsed
+    return pd.Timestamp(date)
+
+class StandingsHistory:
+    """Precomputed cumulative standings of a season.
+
+    One pass over the played matches, ordered by kickoff, builds per-team
+    cumulative counters for every matchday and for every round (a team's
+    k-th match). After that, "table after round k", "table on date d" and
+    "position history of team X" are array lookups that do not depend on
+    how many matches the season has.
+    """
+
+    def __init__(self, matches):
+        teams = pd.concat([matches['Koti'], matches['Vieras']]).dropna().unique()
+        self.teams = np.array(sorted(teams), dtype=object)
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        n_teams = len(self.teams)
+
+        home_goals = coerce_scores(matches, 'Kotitulos')
+        away_goals = coerce_scores(matches, 'Vierastulos')
+        kickoff = kickoff_times(matches)
+        played = (matches['Koti'].notna() & matches['Vieras'].notna()
+                  & home_goals.notna() & away_goals.notna() & kickoff.notna())
+
+        order = np.argsort(kickoff[played].to_numpy(), kind='stable')
+        kickoff = kickoff[played].to_numpy()[order]
+        home = matches.loc[played, 'Koti'].map(self.team_index).to_numpy()[order]
+        away = matches.loc[played, 'Vieras'].map(self.team_index).to_numpy()[order]
+        home_goals = home_goals[played].to_numpy()[order].astype('int64')
+        away_goals = away_goals[played].to_numpy()[order].astype('int64')
+
+        home_increments = _increments(home_goals, away_goals)
+        away_increments = _increments(away_goals, home_goals)
+
+        # Matchday snapshots: row 0 is the table before the first match
+        days = kickoff.astype('datetime64[D]')
+        self.days, day_of_match = np.unique(days, return_inverse=True)
+        by_day = np.zeros((len(self.days) + 1, n_teams, len(STAT_COLUMNS)), dtype='int64')
+        np.add.at(by_day, (day_of_match + 1, home), home_increments)
+        np.add.at(by_day, (day_of_match + 1, away), away_increments)
+        self.day_stats = by_day.cumsum(axis=0)
+
+        # Round snapshots: a team's k-th match counts towards round k
+        sides = np.concatenate([home, away])
+        side_order = np.argsort(np.concatenate([np.arange(len(home))] * 2), kind='stable')
+        round_of_side = np.empty(len(sides), dtype='int64')
+        round_of_side[side_order] = pd.Series(sides[side_order]).groupby(sides[side_order]).cumcount().to_numpy() + 1
+        self.rounds = int(round_of_side.max()) if len(sides) else 0
+        by_round = np.zeros((self.rounds + 1, n_teams, len(STAT_COLUMNS)), dtype='int64')
+        np.add.at(by_round, (round_of_side, sides), np.concatenate([home_increments, away_increments]))
+        self.round_stats = by_round.cumsum(axis=0)
+
+        name_rank = np.arange(n_teams)
+        self.day_positions = _positions(self.day_stats, name_rank)
+        self.round_positions = _positions(self.round_stats, name_rank)
+
+        # Snapshot index for every calendar day of the season
+        if len(self.days):
+            calendar = np.arange(self.days[0], self.days[-1] + 1, dtype='datetime64[D]')
+            self.day_lookup = np.searchsorted(self.days, calendar, side='right')
+        else:
+            self.day_lookup = np.zeros(0, dtype='int64')
+
+    def _snapshot_for(self, date):
+        if not len(self.days):
+            return 0
+        day = np.datetime64(_parse_date(date).date(), 'D')
+        if day < self.days[0]:
+            return 0
+        if day > self.days[-1]:
+            return len(self.days)
+        return int(self.day_lookup[(day - self.days[0]).astype(int)])
+
+    def _table(self, stats, positions):
+        table = pd.DataFrame(stats, index=self.teams, columns=STAT_COLUMNS)
+        table['Maaliero'] = table['Tehdyt maalit'] - table['Päästetyt maalit']
+        table = table[STANDINGS_COLUMNS]
+        table.insert(0, 'Sijoitus', positions)
+        table = table.iloc[np.argsort(positions, kind='stable')]
+        table.index.name = None
+        return table
+
+    def table_after_round(self, k):
+        """League table once every team has played (up to) k matches"""
+        k = min(max(k, 0), self.rounds)
+        return self._table(self.round_stats[k], self.round_positions[k])
+
+    def table_on(self, date):
+        """League table after all matches played on or before date"""
+        snapshot = self._snapshot_for(date)
+        return self._table(self.day_stats[snapshot], self.day_positions[snapshot])
+
+    def position_history(self, team):
+        """Position and points of a team after every matchday"""
+        i = self.team_index[team]
+        return pd.DataFrame({
+            'Pelipäivä': pd.to_datetime(self.days).strftime('%d.%m.%Y'),
+            'Sijoitus': self.day_positions[1:, i],
+            'Pisteet': self.day_stats[1:, i, PISTEET],
+        })
+
+    def positions_over_time(self):
+        """Wide table of positions: one row per matchday, one column per team"""
+        positions = pd.DataFrame(self.day_positions[1:], columns=self.teams)
+        positions.insert(0, 'Pelipäivä', pd.to_datetime(self.days).strftime('%d.%m.%Y'))
+        return positions
+
+def export_positions(source='tulokset.csv', filename='Sijoitushistoria.csv'):
+    """Write the positions-over-time CSV used by the position charts"""
+    history = StandingsHistory(load_matches(source))
+    history.positions_over_time().to_csv(filename, index=False)
+    print(f"Wrote {len(history.days)} matchdays for {len(history.teams)} teams to {filename}")
+    return history
+
+if __name__ == "__main__":
+    try:
+        export_positions()
+    except Exception as e:
+        print(f"Error creating position history: {e}")
+        import traceback
+        traceback.print_exc()
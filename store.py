@@ -0,0 +1,181 @@
+import json
+import os
+import re
+import sqlite3
+from manifest import hash_records
+
+STORE_FILE = "data.sqlite"
+
+# Canonical typed columns of each dataset. Record keys outside these go to
+# the JSON 'extra' column so nothing scraped is lost.
+DATASETS = {
+    'sarjataulukko': [
+        ('Sijoitus', 'INTEGER'),
+        ('Joukkue', 'TEXT'),
+        ('Ottelut', 'INTEGER'),
+        ('Voitot', 'INTEGER'),
+        ('Tasapelit', 'INTEGER'),
+        ('Tappiot', 'INTEGER'),
+        ('Tehdyt maalit', 'INTEGER'),
+        ('Päästetyt maalit', 'INTEGER'),
+        ('Maaliero', 'INTEGER'),
+        ('Pisteet', 'INTEGER'),
+    ],
+    'ottelut': [
+        ('Row', 'INTEGER'),
+        ('Pelipäivä', 'DATE'),
+        ('Klo', 'TEXT'),
+        ('Koti', 'TEXT'),
+        ('Vieras', 'TEXT'),
+        ('Kotitulos', 'INTEGER'),
+        ('Vierastulos', 'INTEGER'),
+        ('Paikka', 'TEXT'),
+    ],
+}
+
+# Integers whose text is exactly str(int(text)); SQLite integer affinity
+# would turn "+5", "05" or "3.0" into 5 and 3
+_INTEGER = re.compile(r'^(0|-?[1-9][0-9]*)$')
+_FINNISH_DATE = re.compile(r'^(\d{2})\.(\d{2})\.(\d{4})$')
+_ISO_DATE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+
+# Bumped when the stored form of the records changes; stores of an older
+# format are rewritten on their next replace()
+STORE_FORMAT = "2"
+
+def _to_db(value, column_type):
+    """Typed database value for a scraped value, or None when the column
+    cannot hold it unchanged"""
+    if value is None or value == "":
+        return None
+    text = str(value)
+    if column_type == 'INTEGER':
+        return int(text) if _INTEGER.match(text) else None
+    if column_type == 'DATE':
+        # DATE columns have numeric affinity as well
+        match = _FINNISH_DATE.match(text)
+        return f"{match.group(3)}-{match.group(2)}-{match.group(1)}" if match else None
+    return value
+
+def _from_db(value, column_type):
+    """Legacy record string for a database value"""
+    if value is None:
+        return ""
+    if column_type == 'DATE' and isinstance(value, str):
+        match = _ISO_DATE.match(value)
+        if match:
+            return f"{match.group(3)}.{match.group(2)}.{match.group(1)}"
+    return str(value)
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class DataStore:
+    """Canonical typed store of the scraped records, written once per run.
+
+    The CSV, JSON and Markdown files are views derived from it (see views.py).
+    """
+
+    def __init__(self, output_dir=""):
+        self.path = os.path.join(output_dir, STORE_FILE)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            if self._get_meta("format") != STORE_FORMAT:
+                self.connection.execute("DELETE FROM meta WHERE key LIKE 'version:%'")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('format', ?)",
+                                        (STORE_FORMAT,))
+            for dataset, columns in DATASETS.items():
+                column_sql = ", ".join(f"{_quote(name)} {column_type}" for name, column_type in columns)
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {dataset} (position INTEGER PRIMARY KEY, {column_sql}, extra TEXT)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _get_meta(self, key):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def version(self, dataset):
+        """Content hash of the records currently stored for a dataset"""
+        return self._get_meta(f"version:{dataset}")
+
+    def replace(self, dataset, records):
+        """Replace all records of a dataset in one transaction.
+
+        Returns False without touching the database when the stored records
+        are already the same.
+        """
+        version = hash_records(records)
+        if self.version(dataset) == version:
+            return False
+        columns = DATASETS[dataset]
+        known = {name for name, _ in columns}
+        # Keep the record key order and value kinds so the derived views come
+        # out exactly as the records were scraped
+        keys = {}
+        for record in records:
+            for key, value in record.items():
+                if keys.get(key) != 'int':
+                    keys[key] = 'int' if isinstance(value, int) else 'str'
+
+        rows = []
+        for position, record in enumerate(records):
+            extra = {key: value for key, value in record.items() if key not in known}
+            typed = []
+            for name, column_type in columns:
+                value = _to_db(record.get(name), column_type)
+                if value is None and record.get(name) not in (None, ""):
+                    # Not a clean value of the column type: kept verbatim in 'extra'
+                    extra[name] = record[name]
+                typed.append(value)
+            rows.append([position] + typed + [json.dumps(extra, ensure_ascii=False) if extra else None])
+
+        placeholders = ", ".join("?" * (len(columns) + 2))
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {dataset}")
+            self.connection.executemany(f"INSERT INTO {dataset} VALUES ({placeholders})", rows)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [(f"columns:{dataset}", json.dumps(keys, ensure_ascii=False)),
+                 (f"version:{dataset}", version)])
+        return True
+
+    def records(self, dataset):
+        """Records of a dataset in the legacy string shape, in their original order"""
+        columns = DATASETS[dataset]
+        keys = json.loads(self._get_meta(f"columns:{dataset}") or "{}")
+        column_sql = ", ".join(_quote(name) for name, _ in columns)
+        records = []
+        for row in self.connection.execute(f"SELECT {column_sql}, extra FROM {dataset} ORDER BY position"):
+            values = {name: _from_db(value, column_type) for (name, column_type), value in zip(columns, row)}
+            values.update(json.loads(row[-1]) if row[-1] else {})
+            record = {key: values.get(key, "") for key in keys}
+            for key, kind in keys.items():
+                if kind == 'int' and record[key] != "":
+                    record[key] = int(record[key])
+            records.append(record)
+        return records
+
+def has_store(output_dir=""):
+    return os.path.exists(os.path.join(output_dir, STORE_FILE))
+
+def read_dataset(dataset, output_dir=""):
+    """DataFrame of a stored dataset, or None when there is no store yet"""
+    if not has_store(output_dir):
+        return None
+    # Imported here so the stdlib fast paths can use the store without pandas
+    import pandas as pd
+    with DataStore(output_dir) as store:
+        if store.version(dataset) is None:
+            return None
+        return pd.DataFrame(store.records(dataset))
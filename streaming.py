@@ -0,0 +1,72 @@
+import heapq
+import os
+import pickle
+import tempfile
+from operator import itemgetter
+from schema import iter_matches_csv
+from standings import aggregate_results, rank_standings
+
+# Rows held in memory at a time, and how many sorted runs are merged at once
+CHUNK_ROWS = 100_000
+MERGE_FAN_IN = 32
+# Rows per pickled block of a run file; a merge holds one block of each run
+BLOCK_ROWS = 4096
+
+def stream_standings(source='tulokset.csv', chunksize=CHUNK_ROWS, by=None):
+    """compute_standings of a match CSV, folding one chunk at a time into running counters.
+
+    With by (key columns such as league and season) every key gets its own
+    table, as in compute_standings.
+    """
+    totals = None
+    for chunk in iter_matches_csv(source, chunksize):
+        counts = aggregate_results(chunk, by)
+        counts.index = counts.index.astype(object)
+        totals = counts if totals is None else totals.add(counts, fill_value=0)
+    return rank_standings(totals.astype('int64'), by)
+
+def _write_run(items, directory):
+    """Write (key, payload) pairs, already in key order, to a run file in pickled blocks"""
+    with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.run', delete=False) as f:
+        block = []
+        for item in items:
+            block.append(item)
+            if len(block) == BLOCK_ROWS:
+                pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+    return f.name
+
+def _read_run(filename):
+    with open(filename, 'rb') as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+def _merge(filenames):
+    return heapq.merge(*[_read_run(filename) for filename in filenames], key=itemgetter(0))
+
+def external_sort(chunks, fan_in=MERGE_FAN_IN, directory=None):
+    """Payloads of (keys, payloads) chunks in key order, holding one chunk in memory.
+
+    Every chunk is sorted into a run file, and the runs are merged fan_in at
+    a time until one pass can stream them all. Keys must be unique (add the
+    row number as the last element) so the order is the same as one stable
+    sort of the whole input.
+    """
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        runs = [_write_run(sorted(zip(keys, payloads), key=itemgetter(0)), workdir) for keys, payloads in chunks]
+        while len(runs) > fan_in:
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                merged.append(_write_run(_merge(group), workdir))
+                for filename in group:
+                    os.remove(filename)
+            runs = merged
+        for _, payload in _merge(runs):
+            yield payload
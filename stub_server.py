@@ -0,0 +1,102 @@
+import argparse
+import hashlib
+import http.server
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+# getGroup answer of a small group in the Torneopal shape: three teams, two
+# played matches and one fixture
+SAMPLE_GROUP = {
+    'teams': [
+        {'current_standing': 1, 'team_name': 'KTP', 'matches_played': 2, 'matches_won': 2, 'matches_tied': 0,
+         'matches_lost': 0, 'goals_for': 5, 'goals_against': 1, 'goal_difference': 4, 'points': 6},
+        {'current_standing': 2, 'team_name': 'TPS', 'matches_played': 1, 'matches_won': 0, 'matches_tied': 0,
+         'matches_lost': 1, 'goals_for': 1, 'goals_against': 2, 'goal_difference': -1, 'points': 0},
+        {'current_standing': 3, 'team_name': 'JIPPO', 'matches_played': 1, 'matches_won': 0, 'matches_tied': 0,
+         'matches_lost': 1, 'goals_for': 0, 'goals_against': 3, 'goal_difference': -3, 'points': 0},
+    ],
+    'matches': [
+        {'date': '2025-04-14', 'time': '18:30:00', 'team_A_name': 'KTP', 'team_B_name': 'JIPPO',
+         'fs_A': 3, 'fs_B': 0, 'venue_name': 'Arto Tolsa Areena', 'status': 'Played'},
+        {'date': '2025-04-21', 'time': '18:30:00', 'team_A_name': 'TPS', 'team_B_name': 'KTP',
+         'fs_A': 1, 'fs_B': 2, 'venue_name': 'Veritas Stadion', 'status': 'Played'},
+        {'date': '2025-04-28', 'time': '18:30:00', 'team_A_name': 'JIPPO', 'team_B_name': 'TPS',
+         'fs_A': None, 'fs_B': None, 'venue_name': 'Kuusamo', 'status': 'Fixture'},
+    ],
+}
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers getGroup with the group in state, revalidating with an ETag.
+
+    The first fail_first requests get a 503 and every request waits
+    delay_seconds, to exercise the client's retries and hedging.
+    """
+    protocol_version = 'HTTP/1.1'
+    state = {}
+
+    def do_GET(self):
+        with self.state['lock']:
+            self.state['requests'] += 1
+            count = self.state['requests']
+            group = self.state['group']
+        time.sleep(self.state['delay_seconds'])
+        if not urlsplit(self.path).path.rstrip('/').endswith('/getGroup'):
+            return self._send(404, b'{"error":"not found"}')
+        if count <= self.state['fail_first']:
+            return self._send(503, b'{"error":"unavailable"}')
+
+        body = json.dumps({'group': group}, ensure_ascii=False).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b'', etag)
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(group=None, port=0, delay_seconds=0.0, fail_first=0):
+    """Serve the data API in a background thread and return the server.
+
+    server.state holds the served group (replace it to change the data) and
+    the request count; the API URL is http://127.0.0.1:{server.server_port}.
+    """
+    state = {'group': SAMPLE_GROUP if group is None else group, 'requests': 0, 'lock': threading.Lock(),
+             'delay_seconds': delay_seconds, 'fail_first': fail_first}
+    handler = type('Handler', (StubHandler,), {'state': state})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a tulospalvelu data API stub for the HTTP backend")
+    parser.add_argument("--group", help="JSON file with a getGroup answer (default: a small sample group)")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.0, help="extra latency of every response")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with 503")
+    args = parser.parse_args()
+
+    group = None
+    if args.group:
+        with open(args.group, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        group = data.get('group', data)
+    server = start_stub_server(group, args.port, args.delay, args.fail_first)
+    print(f"Serving the data API on http://127.0.0.1:{server.server_port} "
+          f"(run the scraper with TULOSPALVELU_API_URL pointing here)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,38 @@
+import os
+import sys
+import pytest
+
+# The scripts are top-level modules of the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the test in an empty directory; the scripts read and write the working directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+MATCHES = [
+    # Sarja, Pelipäivä, Klo, Koti, Vieras, Kotitulos, Vierastulos
+    ('Ykkönen', '14.04.2025', '18:30', 'KTP', 'JIPPO', 3, 0),
+    ('Ykkönen', '14.04.2025', '9:30', 'TPS', 'MP', 1, 1),
+    ('Ykkönen', '21.04.2025', '', 'MP', 'KTP', 0, 2),
+    ('Ykkönen', '21.04.2025', '18:00', 'JIPPO', 'TPS', None, None),
+    ('Kakkonen', '14.04.2025', '18:30', 'PK-35', 'EIF', 2, 1),
+    ('Kakkonen', '', '18:30', 'EIF', 'PK-35', 0, 0),
+]
+
+@pytest.fixture
+def write_matches(workdir):
+    """Function writing the sample matches to a CSV in the working directory and returning its name"""
+    import pandas as pd
+
+    def write(filename='tulokset.csv', league=True):
+        rows = [dict(zip(['Sarja', 'Pelipäivä', 'Klo', 'Koti', 'Vieras', 'Kotitulos', 'Vierastulos'], match))
+                for match in MATCHES]
+        frame = pd.DataFrame(rows).astype({'Kotitulos': 'Int64', 'Vierastulos': 'Int64'})
+        if not league:
+            frame = frame.drop(columns=['Sarja'])
+        frame.to_csv(filename, index=False)
+        return filename
+
+    return write
@@ -0,0 +1,60 @@
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from deadline import Deadline, Latency, hedged_call, remaining, running
+from stub_server import start_stub_server
+from tulospalvelu_api import TulospalveluClient
+
+def test_page_budget_shares_the_remaining_time():
+    deadline = Deadline(60, slots=2)
+    deadline.plan(4)
+    assert 29 < deadline.page_budget() <= 30
+    deadline.page_done()
+    deadline.page_done()
+    assert 59 < deadline.page_budget() <= 60
+    with running(deadline):
+        assert 59 < remaining() <= 60
+    assert remaining() == float('inf')
+
+def test_p95_needs_enough_samples():
+    latency = Latency(min_samples=3)
+    latency.observe(0.1)
+    latency.observe(0.2)
+    assert latency.p95 is None
+    latency.observe(0.3)
+    assert latency.p95 == 0.3
+
+def test_unavailable_server_is_retried(workdir):
+    server = start_stub_server(fail_first=1)
+    try:
+        client = TulospalveluClient(f"http://127.0.0.1:{server.server_port}", cache_file=None)
+        data, _ = client.get_json('getGroup', group_id=1)
+        client.close()
+    finally:
+        server.shutdown()
+    assert server.state['requests'] == 2
+    assert len(data['group']['teams']) == 3
+
+def test_slow_call_is_hedged():
+    calls = itertools.count()
+
+    def call():
+        if next(calls) == 0:
+            time.sleep(1.0)
+            return 'slow'
+        return 'hedge'
+
+    with ThreadPoolExecutor(2) as executor:
+        start = time.perf_counter()
+        assert hedged_call(executor, call, hedge_after=0.1) == ('hedge', True)
+        assert time.perf_counter() - start < 0.5
+
+def test_client_hedges_before_a_p95_is_known(workdir):
+    server = start_stub_server(delay_seconds=0.5)
+    try:
+        client = TulospalveluClient(f"http://127.0.0.1:{server.server_port}", cache_file=None, hedge_after=0.1)
+        client.get_json('getGroup', group_id=1)
+        client.close()
+    finally:
+        server.shutdown()
+    assert server.state['requests'] == 2
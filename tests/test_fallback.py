@@ -0,0 +1,48 @@
+from datetime import datetime
+import fallback_data
+from history import History
+from store import DataStore
+
+TABLE = [{'Sijoitus': '1', 'Joukkue': 'KTP', 'Ottelut': '1', 'Voitot': '1', 'Tasapelit': '0', 'Tappiot': '0',
+          'Tehdyt maalit': '3', 'Päästetyt maalit': '0', 'Maaliero': '3', 'Pisteet': '3'}]
+FIXTURES = [{'Pelipäivä': '14.04.2026', 'Klo': '18:30', 'Koti': 'KTP', 'Vieras': 'JIPPO',
+             'Kotitulos': '3', 'Vierastulos': '0', 'Paikka': 'Arto Tolsa Areena'}]
+
+def record_partial_history(filename='history.sqlite'):
+    """A full snapshot followed by one of a run whose fixtures failed"""
+    with History(filename) as history:
+        history.append('ykkonen', TABLE, FIXTURES, datetime(2026, 4, 14, 9))
+        history.append('ykkonen', TABLE, None, datetime(2026, 4, 15, 9))
+    return filename
+
+def test_existing_store_is_kept(workdir):
+    # A partial snapshot used to replace good fixtures with the hard-coded ones
+    fixtures = [dict(fixture, Koti='MP') for fixture in FIXTURES]
+    with DataStore() as store:
+        store.replace('sarjataulukko', TABLE)
+        store.replace('ottelut', fixtures)
+    fallback_data.create_fallback_files(record_partial_history())
+    with DataStore() as store:
+        assert store.records('ottelut') == fixtures
+    assert not (workdir / 'Ottelut.csv').exists()
+
+def test_existing_output_files_are_kept(workdir):
+    (workdir / 'Ottelut.csv').write_text('kept\n', encoding='utf-8')
+    fallback_data.create_fallback_files(record_partial_history())
+    assert (workdir / 'Ottelut.csv').read_text(encoding='utf-8') == 'kept\n'
+    assert 'KTP' in (workdir / 'Sarjataulukko.csv').read_text(encoding='utf-8')
+
+def test_missing_data_comes_from_the_newest_snapshot_holding_it(workdir):
+    fallback_data.create_fallback_files(record_partial_history())
+    with DataStore() as store:
+        assert store.records('ottelut') == FIXTURES
+        assert store.records('sarjataulukko') == TABLE
+    assert '2026-04-14T09:00:00' in (workdir / 'timestamp.txt').read_text()
+
+def test_hard_coded_data_without_history(workdir):
+    fallback_data.create_fallback_files('')
+    with DataStore() as store:
+        assert store.records('ottelut')[0]['Koti'] == 'TPS'
+    markdown = (workdir / 'Sarjataulukko.md').read_text(encoding='utf-8').splitlines()
+    assert markdown[3] == '| ---- | ------- | - | - | - | - | -- | -- | -- | - |'
+    assert 'fallback' in (workdir / 'timestamp.txt').read_text()
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import fastpath
+from PelatutOttelut import sort_matches
+from schema import read_matches_csv
+from standings import compute_standings
+
+def test_fast_path_matches_pandas(write_matches):
+    _, matches = fastpath.small_matches(write_matches(league=False))
+    expected = compute_standings(read_matches_csv('tulokset.csv'))
+    assert [row[0] for row in fastpath.standings(matches)] == expected.index.tolist()
+    assert [row[-1] for row in fastpath.standings(matches)] == expected['Pisteet'].tolist()
+
+def test_played_matches_in_the_pandas_order(write_matches, workdir):
+    filename = write_matches(league=False)
+    expected = sort_matches(read_matches_csv(filename))
+    assert fastpath.write_played_matches(filename)
+    lines = (workdir / 'PelatutOttelut.csv').read_text(encoding='utf-8').splitlines()
+    assert [line.split(',')[2] for line in lines[1:]] == expected['Koti'].tolist()
+
+def test_unknown_columns_are_left_to_pandas(write_matches):
+    assert fastpath.small_matches(write_matches()) is None
+
+def test_entry_points_start_without_pandas(workdir):
+    # A fallback run over existing views writes nothing and needs no pandas
+    for filename in ('Sarjataulukko.csv', 'Ottelut.csv'):
+        (workdir / filename).write_text('kept\n', encoding='utf-8')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import sys; import fallback_data, scraper, live; fallback_data.create_fallback_files(''); "
+            "print('pandas' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PYTHONPATH=root))
+    assert result.stdout.splitlines()[-1] == 'False'
+    assert (workdir / 'Ottelut.csv').read_text(encoding='utf-8') == 'kept\n'
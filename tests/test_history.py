@@ -0,0 +1,56 @@
+from datetime import datetime
+from history import History
+
+def table(*teams):
+    """League table records with the given teams in order, 3 points apart"""
+    return [{'Sijoitus': str(i), 'Joukkue': team, 'Ottelut': '2', 'Voitot': '0', 'Tasapelit': '0', 'Tappiot': '0',
+             'Tehdyt maalit': '0', 'Päästetyt maalit': '0', 'Maaliero': '0', 'Pisteet': str(3 * (len(teams) - i))}
+            for i, team in enumerate(teams, 1)]
+
+def fixtures(home_goals):
+    return [{'Pelipäivä': '14.04.2025', 'Klo': '18:30', 'Koti': 'KTP', 'Vieras': 'JIPPO',
+             'Kotitulos': home_goals, 'Vierastulos': '0' if home_goals else '', 'Paikka': 'Arto Tolsa Areena'}]
+
+def record(filename='history.sqlite'):
+    with History(filename) as history:
+        history.append('ykkonen', table('TPS', 'KTP'), fixtures(''), datetime(2025, 4, 13, 9))
+        history.append('ykkonen', table('KTP', 'TPS'), fixtures('3'), datetime(2025, 4, 15, 9))
+        # A partial run: the league table failed, only fixtures were stored
+        history.append('ykkonen', None, fixtures('2'), datetime(2025, 4, 16, 9))
+        history.append('kakkonen', table('PK-35'), None, datetime(2025, 4, 16, 9))
+    return filename
+
+def test_table_on_skips_a_partial_snapshot(workdir):
+    with History(record()) as history:
+        assert history.table_on('16.04.2025')['Joukkue'].tolist() == ['KTP', 'TPS']
+        assert history.table_on('14.04.2025')['Joukkue'].tolist() == ['TPS', 'KTP']
+        assert history.table_on('12.04.2025').empty
+        assert history.table_on('16.04.2025', 'kakkonen')['Joukkue'].tolist() == ['PK-35']
+
+def test_team_trajectory_and_position(workdir):
+    with History(record()) as history:
+        trajectory = history.team_trajectory('KTP')
+        assert trajectory['Päivä'].tolist() == ['2025-04-13', '2025-04-15']
+        assert trajectory['Sijoitus'].tolist() == [2, 1]
+        assert history.team_trajectory('KTP', start='14.04.2025')['Sijoitus'].tolist() == [1]
+        assert history.position_on('KTP', '14.04.2025') == 2
+        assert history.position_on('KTP', '01.05.2025') == 1
+        assert history.position_on('KTP', '01.01.2025') is None
+
+def test_result_changes(workdir):
+    with History(record()) as history:
+        changes = history.result_changes()
+        assert changes['Päivä'].tolist() == ['2025-04-15', '2025-04-16']
+        assert changes['Edellinen kotitulos'].isna().tolist() == [True, False]
+        assert changes['Edellinen kotitulos'].iloc[1] == 3
+        assert changes['Kotitulos'].tolist() == [3, 2]
+        assert len(history.result_changes(since='16.04.2025')) == 1
+        assert history.result_changes(team='MP').empty
+
+def test_latest_records(workdir):
+    with History(record()) as history:
+        taken_at, records = history.latest_records('standings')
+        assert taken_at == '2025-04-15T09:00:00' and records == table('KTP', 'TPS')
+        taken_at, records = history.latest_records('fixtures')
+        assert taken_at == '2025-04-16T09:00:00' and records == fixtures('2')
+        assert history.latest_records('fixtures', 'kakkonen') is None
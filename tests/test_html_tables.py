@@ -0,0 +1,43 @@
+import os
+from html_tables import extract_tables_from_file, extract_tables_from_html
+from scraper import parse_league_table
+
+PAGE = """
+<html><body>
+<table>
+  <thead><tr><th> # </th><th>Joukkue</th><th>P</th></tr></thead>
+  <tbody>
+    <tr><td>skipped</td></tr>
+    <tr><td>1</td><td><img src="x.png" alt="KTP logo"><img alt="second"> KTP &amp; co</td><td>6<br/></td></tr>
+    <tr><td>2</td><td><a href="/match/123">TPS</a> <a href="/team/9">team</a></td><td>3</td></tr>
+  </tbody>
+</table>
+<table><tr><td>first</td></tr><tr><td>a<b>b</b>c</td></table>
+</body></html>
+"""
+
+def test_rows_cells_and_headers():
+    tables = extract_tables_from_html(PAGE)
+    assert len(tables) == 2
+    table = tables[0]
+    assert table['headers'] == ['#', 'Joukkue', 'P']
+    # The first row of every section is skipped, as 'tr:not(:first-child)' does
+    assert [[cell['text'].strip() for cell in row['cells']] for row in table['rows']] == \
+        [['1', 'KTP & co', '6'], ['2', 'TPS team', '3']]
+
+def test_first_image_alt_and_match_links():
+    first, second = extract_tables_from_html(PAGE)[0]['rows']
+    assert first['cells'][1]['alt'] == 'KTP logo' and first['cells'][0]['alt'] is None
+    assert second['links'] == ['/match/123']
+
+def test_unclosed_elements_are_closed():
+    table = extract_tables_from_html(PAGE)[1]
+    assert table['rows'] == [{'cells': [{'text': 'abc', 'alt': None}], 'links': []}]
+    assert extract_tables_from_html('<table><tr><td>x</td></tr><tr><td>open')[0]['rows'][0]['cells'][0]['text'] == \
+        'open'
+
+def test_saved_page_parses_like_the_browser():
+    page = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Sivu.html')
+    rows = parse_league_table(extract_tables_from_file(page)[0])
+    assert len(rows) == 9
+    assert (rows[0]['Sijoitus'], rows[0]['Joukkue']) == ('2', 'FC Lahti')
@@ -0,0 +1,62 @@
+import pytest
+from competitions import get_competition
+from manifest import Manifest
+from scraper import fetch_with_http, parse_fixtures
+from store import DataStore
+from stub_server import SAMPLE_GROUP, start_stub_server
+from tulospalvelu_api import TulospalveluClient
+from views import refresh_views
+
+@pytest.fixture
+def stub():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+
+def client_for(server, **kwargs):
+    return TulospalveluClient(f"http://127.0.0.1:{server.server_port}", cache_file=None, **kwargs)
+
+def test_fetch_with_http_writes_the_store_and_views(workdir, stub):
+    league_data, fixtures_data = fetch_with_http(Manifest(), get_competition(), client_for(stub))
+    assert len(league_data) == 3 and len(fixtures_data) == 3
+    with DataStore() as store:
+        assert [row['Joukkue'] for row in store.records('sarjataulukko')] == ['KTP', 'TPS', 'JIPPO']
+        fixtures = store.records('ottelut')
+    assert fixtures[0] == {'Row': 1, 'Pelipäivä': '14.04.2025', 'Klo': '18:30', 'Koti': 'KTP', 'Vieras': 'JIPPO',
+                           'Kotitulos': '3', 'Vierastulos': '0', 'Paikka': 'Arto Tolsa Areena'}
+    # An unplayed match has no result
+    assert (fixtures[2]['Kotitulos'], fixtures[2]['Vierastulos']) == ('', '')
+    assert (workdir / 'Ottelut.csv').read_text(encoding='utf-8').startswith('Row,Pelipäivä,')
+
+def test_both_backends_give_the_same_fixture_keys(workdir, stub):
+    _, fixtures_data = fetch_with_http(Manifest(), get_competition(), client_for(stub))
+    cells = ['14.04.2025', '18:30', 'KTP - JIPPO', '3-0', 'Arto Tolsa Areena']
+    browser = parse_fixtures({'headers': ['Päivä', 'Klo', 'Joukkueet', 'Tulos', 'Paikka'],
+                              'rows': [{'cells': [{'text': text} for text in cells]}]})
+    assert list(fixtures_data[0]) == list(browser[0])
+
+def test_group_without_matches_is_not_a_failure(workdir):
+    server = start_stub_server(dict(SAMPLE_GROUP, matches=[]))
+    try:
+        league_data, fixtures_data = fetch_with_http(Manifest(), get_competition(), client_for(server))
+    finally:
+        server.shutdown()
+    assert league_data is not None and fixtures_data is not None and len(fixtures_data) == 0
+
+def test_views_of_an_empty_dataset_keep_the_header(workdir):
+    with DataStore() as store:
+        store.replace('ottelut', [])
+        refresh_views(store, datasets=['ottelut'])
+    assert (workdir / 'Ottelut.csv').read_text(encoding='utf-8') == \
+        'Row,Pelipäivä,Klo,Koti,Vieras,Kotitulos,Vierastulos,Paikka\n'
+
+def test_unchanged_group_is_revalidated(stub):
+    client = client_for(stub)
+    try:
+        _, changed = client.get_json('getGroup', group_id=1)
+        data, changed_again = client.get_json('getGroup', group_id=1)
+    finally:
+        client.close()
+    assert changed and not changed_again
+    assert client.not_modified == 1
+    assert data['group']['teams'][0]['team_name'] == 'KTP'
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+import live
+from competitions import get_competition
+from live import LiveFeed, diff_matches, schedule, snapshot
+from manifest import Manifest
+from stub_server import SAMPLE_GROUP, start_stub_server
+from tulospalvelu_api import TulospalveluClient, map_fixtures, map_league_table
+
+KICKOFF = datetime(2025, 4, 28, 18, 30, tzinfo=live.TIMEZONE)
+
+@pytest.fixture
+def stub():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+
+def feed_for(server, workdir, **kwargs):
+    client = TulospalveluClient(f"http://127.0.0.1:{server.server_port}", cache_file=None, **kwargs)
+    return LiveFeed(get_competition(), str(workdir), str(workdir / 'events.jsonl'), '', client)
+
+def test_schedule_modes():
+    assert schedule(KICKOFF - timedelta(hours=5), [KICKOFF]) == ('idle', live.IDLE_MAX_SECONDS)
+    assert schedule(KICKOFF - timedelta(minutes=30), [KICKOFF]) == ('idle', 20 * 60)
+    assert schedule(KICKOFF - timedelta(minutes=5), [KICKOFF]) == ('fast', live.FAST_SECONDS)
+    assert schedule(KICKOFF + timedelta(minutes=45), [KICKOFF]) == ('live', live.LIVE_SECONDS)
+    assert schedule(KICKOFF + live.MATCH_LENGTH, [KICKOFF]) == ('fast', live.FAST_SECONDS)
+    assert schedule(KICKOFF + timedelta(hours=3), [KICKOFF]) == (None, None)
+    # A live match does not sleep past the window of the next kickoff
+    later = KICKOFF + timedelta(minutes=50)
+    assert schedule(KICKOFF + timedelta(minutes=39, seconds=30), [KICKOFF, later]) == ('live', 30)
+
+def test_score_and_status_events():
+    _, _, before = snapshot(SAMPLE_GROUP)
+    group = json.loads(json.dumps(SAMPLE_GROUP))
+    group['matches'][2].update(fs_A=1, fs_B=0, status='Live')
+    group['matches'].append(dict(group['matches'][0], date='2025-05-05'))
+    _, _, after = snapshot(group)
+    events = diff_matches(before, after, 'ykkonen', 'now')
+    assert [(event['type'], event['Koti'], event['previous'], event['current']) for event in events] == [
+        ('score', 'JIPPO', '', '1-0'), ('status', 'JIPPO', 'Fixture', 'Live'), ('status', 'KTP', None, 'Played')]
+    assert diff_matches(after, after, 'ykkonen', 'now') == []
+
+def test_poll_writes_events_only_for_changes(workdir, stub):
+    feed = feed_for(stub, workdir)
+    try:
+        assert feed.poll() == []
+        assert feed.poll() == []
+        group = json.loads(json.dumps(SAMPLE_GROUP))
+        group['matches'][2].update(fs_A=2, fs_B=2, status='Played')
+        stub.state['group'] = group
+        assert len(feed.poll()) == 2
+    finally:
+        feed.client.close()
+    lines = (workdir / 'events.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['current'] for line in lines] == ['2-2', 'Played']
+    assert 'JIPPO,TPS,2,2' in (workdir / 'Ottelut.csv').read_text(encoding='utf-8')
+
+def test_saved_records_are_unchanged_for_the_scraper(workdir, stub):
+    feed = feed_for(stub, workdir)
+    try:
+        feed.poll()
+    finally:
+        feed.client.close()
+    manifest = Manifest(str(workdir))
+    assert not manifest.records_changed('league_table', map_league_table(SAMPLE_GROUP))
+    assert not manifest.records_changed('fixtures', map_fixtures(SAMPLE_GROUP))
+
+def test_failed_first_poll_is_retried(workdir, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(live.time, 'sleep', sleeps.append)
+    server = start_stub_server(fail_first=1)
+    try:
+        feed = feed_for(server, workdir, retries=0)
+        # The sample matches are in the past: after one retry there is nothing left to follow
+        feed.run(live=5)
+    finally:
+        server.shutdown()
+    # The stub server sleeps 0 s in every request through the same time module
+    assert [seconds for seconds in sleeps if seconds] == [5]
+    assert server.state['requests'] == 2 and feed.matches is not None
+
+def test_failed_first_poll_once(workdir):
+    server = start_stub_server(fail_first=1)
+    try:
+        feed_for(server, workdir, retries=0).run(once=True)
+    finally:
+        server.shutdown()
+    assert server.state['requests'] == 1
@@ -0,0 +1,50 @@
+import os
+from manifest import Manifest, write_output
+from scraper import save_league_table
+
+TABLE = [{'Sijoitus': '1', 'Joukkue': 'KTP', 'Ottelut': '1', 'Voitot': '1', 'Tasapelit': '0', 'Tappiot': '0',
+          'Tehdyt maalit': '3', 'Päästetyt maalit': '0', 'Maaliero': '3', 'Pisteet': '3'}]
+
+def test_unchanged_file_is_not_rewritten(workdir):
+    manifest = Manifest()
+    assert write_output('a.txt', 'same', manifest)
+    os.utime('a.txt', (0, 0))
+    assert not write_output('a.txt', 'same', manifest)
+    assert os.path.getmtime('a.txt') == 0
+    assert write_output('a.txt', 'changed', manifest)
+    assert (workdir / 'a.txt').read_text() == 'changed'
+
+def test_deleted_file_is_written_again(workdir):
+    manifest = Manifest()
+    write_output('a.txt', 'same', manifest)
+    os.remove('a.txt')
+    assert write_output('a.txt', 'same', manifest)
+
+def test_manifest_is_saved_only_when_dirty(workdir):
+    manifest = Manifest('out')
+    manifest.save()
+    assert not os.path.exists(manifest.path)
+    manifest.update_records('league_table', TABLE)
+    assert manifest.dirty
+    manifest.save()
+    assert not manifest.dirty
+
+    reloaded = Manifest('out')
+    assert not reloaded.records_changed('league_table', TABLE)
+    assert reloaded.records_changed('league_table', TABLE[:0])
+    reloaded.update_records('league_table', TABLE)
+    assert not reloaded.dirty
+
+def test_unreadable_manifest_starts_empty(workdir):
+    (workdir / 'scrape_manifest.json').write_text('{', encoding='utf-8')
+    assert Manifest().records == {}
+
+def test_unchanged_records_skip_all_writes(workdir):
+    manifest = Manifest()
+    save_league_table(TABLE, manifest)
+    assert (workdir / 'Sarjataulukko.md').exists()
+    for filename in ('Sarjataulukko.md', 'Sarjataulukko.csv', 'Sarjataulukko.json'):
+        os.remove(filename)
+    save_league_table(TABLE, manifest)
+    # The records hash the same, so nothing is rendered or written
+    assert not (workdir / 'Sarjataulukko.md').exists()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import pytest
+from metrics import MetricsRecorder, recording, span
+
+def test_spans_are_recorded_with_labels():
+    with recording(MetricsRecorder('run1')) as recorder:
+        with span('parse', dataset='ottelut') as s:
+            s.rows = 3
+        with span('file_write', file='a.csv') as s:
+            s.bytes = 10
+    records = recorder.records()
+    assert [record['phase'] for record in records] == ['parse', 'file_write']
+    assert records[0]['rows'] == 3 and records[0]['dataset'] == 'ottelut' and records[0]['run'] == 'run1'
+    assert records[1]['bytes'] == 10 and 'rows' not in records[1]
+    assert all(record['ok'] and record['duration_s'] >= 0 for record in records)
+
+def test_failed_span_keeps_the_error():
+    with recording(MetricsRecorder()) as recorder:
+        with pytest.raises(ValueError):
+            with span('goto', page='league_table'):
+                raise ValueError('timeout')
+    record, = recorder.records()
+    assert not record['ok'] and record['error'] == 'ValueError: timeout'
+
+def test_spans_outside_a_recording_are_dropped():
+    recorder = MetricsRecorder()
+    with span('parse'):
+        pass
+    assert recorder.records() == []
+
+def test_spans_of_concurrent_tasks_and_threads_land_in_the_run():
+    async def load(name):
+        with span('goto', page=name):
+            await asyncio.sleep(0)
+
+    def parse():
+        with span('parse'):
+            pass
+
+    async def run():
+        await asyncio.gather(load('a'), load('b'), asyncio.to_thread(parse))
+
+    with recording(MetricsRecorder()) as recorder:
+        asyncio.run(run())
+    assert sorted(record['phase'] + record.get('page', '') for record in recorder.records()) == \
+        ['gotoa', 'gotob', 'parse']
+
+def test_jsonl_is_appended(workdir):
+    for run in ('run1', 'run2'):
+        with recording(MetricsRecorder(run)) as recorder:
+            with span('parse'):
+                pass
+        recorder.write_jsonl('metrics.jsonl')
+    lines = (workdir / 'metrics.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['run'] for line in lines] == ['run1', 'run2']
+
+def test_prometheus_totals(workdir):
+    with recording(MetricsRecorder()) as recorder:
+        for size in (10, 20):
+            with span('file_write') as s:
+                s.bytes = size
+        with pytest.raises(OSError):
+            with span('goto'):
+                raise OSError('refused')
+    recorder.write_prometheus('scraper.prom')
+    text = (workdir / 'scraper.prom').read_text(encoding='utf-8')
+    assert '# TYPE ykk_scraper_phase_duration_seconds summary' in text
+    assert 'ykk_scraper_phase_duration_seconds_count{phase="file_write"} 2' in text
+    assert 'ykk_scraper_phase_bytes_total{phase="file_write"} 30' in text
+    assert 'ykk_scraper_phase_errors_total{phase="goto"} 1' in text
+    assert not (workdir / 'scraper.prom.tmp').exists()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from ratings import EloRatings, update_ratings
+
+MATCHES = pd.DataFrame({
+    'Pelipäivä': ['14.04.2025', '14.04.2025', '21.04.2025', '21.04.2025', '28.04.2025'],
+    'Klo': ['18:30', '19:00', '18:00', '18:00', '18:30'],
+    'Koti': ['KTP', 'TPS', 'MP', 'JIPPO', 'KTP'],
+    'Vieras': ['JIPPO', 'MP', 'KTP', 'TPS', 'TPS'],
+    'Kotitulos': ['3', '1', '0', '2', ''],
+    'Vierastulos': ['0', '1', '2', '2', ''],
+})
+
+def replayed(matches):
+    ratings = EloRatings()
+    ratings.apply(matches)
+    return ratings
+
+def test_incremental_updates_match_a_full_replay():
+    ratings = EloRatings()
+    assert ratings.apply(MATCHES.iloc[:2]) == 2
+    ratings = EloRatings(**ratings.to_dict())
+    assert ratings.apply(MATCHES.iloc[:4]) == 2
+    assert ratings.apply(MATCHES.iloc[:4]) == 0
+    assert ratings.table().equals(replayed(MATCHES).table())
+    assert ratings.processed == 4
+
+def test_corrected_result_before_the_checkpoint_rebuilds():
+    ratings = replayed(MATCHES)
+    corrected = MATCHES.copy()
+    corrected.loc[0, 'Kotitulos'] = '1'
+    assert ratings.apply(corrected) == 4
+    assert ratings.table().equals(replayed(corrected).table())
+
+def test_home_win_moves_ratings_by_the_same_amount():
+    ratings = replayed(MATCHES.iloc[:1])
+    change = ratings.ratings[ratings.index['KTP']] - 1500
+    assert change > 0 and np.isclose(ratings.ratings[ratings.index['JIPPO']], 1500 - change)
+    assert ratings.matches.tolist() == [1, 1]
+
+def test_state_is_saved_and_resumed(workdir):
+    MATCHES.iloc[:2].to_csv('tulokset.csv', index=False)
+    update_ratings('tulokset.csv')
+    MATCHES.to_csv('tulokset.csv', index=False)
+    resumed = update_ratings('tulokset.csv')
+    assert resumed.table().equals(replayed(MATCHES).table())
+    assert (workdir / 'Elo.md').read_text(encoding='utf-8').startswith('# Elo-luvut')
+    assert update_ratings('tulokset.csv', replay_from='21.04.2025').processed == 2
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import re
+from read_api import ReadAPI, Response
+
+TABLE = [{'Sijoitus': '1', 'Joukkue': 'KTP', 'Pisteet': '3'}]
+FIXTURES = [{'Pelipäivä': '14.04.2025', 'Klo': '18:30', 'Koti': 'KTP', 'Vieras': 'JIPPO',
+             'Kotitulos': '3', 'Vierastulos': '0', 'Paikka': 'Arto Tolsa Areena'}]
+
+def exchange(workdir, data):
+    """Status lines of the answers the API sends on one connection for the bytes in data"""
+    (workdir / 'Sarjataulukko.json').write_text(json.dumps(TABLE), encoding='utf-8')
+    (workdir / 'Ottelut.json').write_text(json.dumps(FIXTURES), encoding='utf-8')
+
+    async def run():
+        api = ReadAPI(str(workdir))
+        api.reload()
+        server = await asyncio.start_server(api.handle, '127.0.0.1', 0)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+            writer.write(data)
+            await writer.drain()
+            answer = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+        finally:
+            server.close()
+        return re.findall(r'HTTP/1\.1 (\d+)', answer.decode('utf-8'))
+
+    return asyncio.run(run())
+
+NEXT = b'GET /teams HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n'
+SMUGGLED = b'GET /teams/nobody HTTP/1.1\r\nHost: x\r\n\r\n'
+
+def test_keep_alive(workdir):
+    assert exchange(workdir, b'GET /table HTTP/1.1\r\nHost: x\r\n\r\n' + NEXT) == ['200', '200']
+
+def test_request_body_is_not_parsed_as_a_request(workdir):
+    post = b'POST /table HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n' % len(SMUGGLED)
+    assert exchange(workdir, post + SMUGGLED + NEXT) == ['405', '200']
+
+def test_chunked_body_closes_the_connection(workdir):
+    post = b'POST /table HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n'
+    chunk = b'%x\r\n' % len(SMUGGLED) + SMUGGLED + b'\r\n0\r\n\r\n'
+    assert exchange(workdir, post + chunk + NEXT) == ['405']
+
+def answer(response, **headers):
+    """Status and ETag of the answer to a request with the given (lowercase) headers"""
+    text = ReadAPI.response_bytes(response, {name.replace('_', '-'): value for name, value in headers.items()})
+    head = text.split(b'\r\n\r\n')[0].decode('latin-1')
+    return head.split(' ')[1], re.search(r'ETag: (\S+)', head).group(1)
+
+def test_gzip_body_has_its_own_etag():
+    response = Response(FIXTURES * 10)
+    assert answer(response) == ('200', response.etag)
+    assert answer(response, accept_encoding='gzip, br') == ('200', response.gzip_etag)
+    assert response.gzip_etag != response.etag
+
+def test_if_none_match_lists_and_star():
+    response = Response(FIXTURES * 10)
+    assert answer(response, if_none_match=f'"other", {response.etag}') == ('304', response.etag)
+    assert answer(response, if_none_match=f'W/{response.etag}') == ('304', response.etag)
+    assert answer(response, if_none_match='*')[0] == '304'
+    assert answer(response, if_none_match=response.gzip_etag, accept_encoding='gzip') == \
+        ('304', response.gzip_etag)
+    # The identity ETag does not validate the gzip body, nor the other way round
+    assert answer(response, if_none_match=response.etag, accept_encoding='gzip')[0] == '200'
+    assert answer(response, if_none_match=response.gzip_etag)[0] == '200'
@@ -0,0 +1,26 @@
+from PelatutOttelut import sort_matches
+from schema import read_matches_csv
+from standings import compute_standings
+
+def test_standings_by_league_keeps_the_key_column(write_matches):
+    # Columns outside the match schema used to be dropped by the CSV reader
+    matches = read_matches_csv(write_matches())
+    assert 'Sarja' in matches.columns
+    table = compute_standings(matches, by=['Sarja'])
+    assert table.loc['Kakkonen'].index.tolist() == ['PK-35', 'EIF']
+    assert table.loc['Ykkönen', 'KTP']['Pisteet'] == 6
+
+def test_typed_columns(write_matches):
+    matches = read_matches_csv(write_matches())
+    assert str(matches['Kotitulos'].dtype) == 'Int8'
+    assert matches['Kotitulos'].isna().sum() == 1
+    assert matches['Pelipäivä'].isna().sum() == 1
+
+def test_matches_sort_by_date_then_time_text(write_matches):
+    # The order of sort_values(['Pelipäivä', 'Klo']): missing times and
+    # dates last, times compared as text
+    ordered = sort_matches(read_matches_csv(write_matches()))
+    assert list(zip(ordered['Pelipäivä'].astype(object).fillna(''), ordered['Klo'].astype(object).fillna(''))) == [
+        ('14.04.2025', '18:30'), ('14.04.2025', '18:30'), ('14.04.2025', '9:30'),
+        ('21.04.2025', '18:00'), ('21.04.2025', ''), ('', '18:30')]
+    assert ordered['Koti'].tolist()[:2] == ['KTP', 'PK-35']
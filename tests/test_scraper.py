@@ -0,0 +1,23 @@
+import asyncio
+import pytest
+import scraper
+from competitions import get_competition
+from manifest import Manifest
+
+class FailingPage:
+    """A page that can only take screenshots"""
+
+    async def screenshot(self, full_page=False):
+        return b'png'
+
+@pytest.mark.parametrize('fetch, name', [(scraper.get_league_table, 'league_table_error.png'),
+                                         (scraper.get_fixtures, 'fixtures_error.png')])
+def test_error_screenshot_goes_to_the_competition_directory(workdir, monkeypatch, fetch, name):
+    async def fail(*args, **kwargs):
+        raise TimeoutError('no table')
+
+    monkeypatch.setattr(scraper, 'load_until_ready', fail)
+    manifest = Manifest('output/ykkonen')
+    assert asyncio.run(fetch(FailingPage(), manifest=manifest, competition=get_competition())) is None
+    assert (workdir / 'output' / 'ykkonen' / name).read_bytes() == b'png'
+    assert not (workdir / name).exists()
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from simulator import prepare, simulate
+
+TABLE = pd.DataFrame({'Joukkue': ['KTP', 'TPS', 'MP'], 'Ottelut': [2, 2, 2], 'Pisteet': [6, 3, 0],
+                      'Tehdyt maalit': [5, 3, 1], 'Päästetyt maalit': [1, 3, 5]})
+FIXTURES = pd.DataFrame({'Koti': ['KTP', 'TPS', 'MP', 'KTP'], 'Vieras': ['TPS', 'MP', 'KTP', 'MP'],
+                         'Kotitulos': ['2', '', None, '3'], 'Vierastulos': ['0', '', None, '1']})
+
+def test_only_unplayed_fixtures_are_simulated():
+    season = prepare(TABLE, FIXTURES)
+    assert season['teams'] == ['KTP', 'MP', 'TPS']
+    assert [season['teams'][i] for i in season['home']] == ['TPS', 'MP']
+    assert season['points'].tolist() == [6, 0, 3]
+
+def test_seeded_runs_are_deterministic():
+    season = prepare(TABLE, FIXTURES)
+    first = simulate(season, 20_000, workers=1, seed=7)
+    assert first.equals(simulate(season, 20_000, workers=1, seed=7))
+    assert not first.equals(simulate(season, 20_000, workers=1, seed=8))
+
+def test_worker_count_does_not_change_a_seeded_result():
+    # Chunks get their own seeds, so the split over processes does not matter
+    season = prepare(TABLE, FIXTURES)
+    assert simulate(season, 120_000, workers=1, seed=3).equals(simulate(season, 120_000, workers=2, seed=3))
+
+def test_probabilities():
+    probabilities = simulate(prepare(TABLE, FIXTURES), 20_000, workers=1, seed=1)
+    positions = probabilities.drop(columns='Odotetut pisteet')
+    assert np.allclose(positions.sum(axis=1), 1) and np.allclose(positions.sum(axis=0), 1)
+    assert probabilities.index[0] == 'KTP' and probabilities.loc['KTP', '1'] > 0.5
+    assert 6 <= probabilities.loc['KTP', 'Odotetut pisteet'] <= 12
+
+def test_finished_season_is_certain():
+    played = FIXTURES.fillna('1').replace('', '1')
+    probabilities = simulate(prepare(TABLE, played), 1000, workers=1, seed=1)
+    assert probabilities['1'].tolist() == [1.0, 0.0, 0.0]
+    assert probabilities['Odotetut pisteet'].tolist() == [6.0, 3.0, 0.0]
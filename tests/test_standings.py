@@ -0,0 +1,26 @@
+import pandas as pd
+from schema import read_matches_csv
+from Sarjataulukko import create_league_table_from_matches
+from standings import compute_standings
+
+def test_compute_standings(write_matches):
+    table = compute_standings(read_matches_csv(write_matches(league=False)))
+    assert table.index.tolist() == ['KTP', 'PK-35', 'TPS', 'EIF', 'MP', 'JIPPO']
+    assert table.loc['KTP', ['Ottelut', 'Voitot', 'Tehdyt maalit', 'Päästetyt maalit', 'Pisteet']].tolist() == \
+        [2, 2, 5, 0, 6]
+    # The unplayed JIPPO - TPS match is not counted
+    assert table.loc['JIPPO', 'Ottelut'] == 1
+    assert table['Sijoitus'].tolist() == [1, 2, 3, 4, 5, 6]
+
+def test_invalid_scores_are_not_counted():
+    matches = pd.DataFrame({'Koti': ['KTP', 'TPS', None], 'Vieras': ['MP', 'KTP', 'MP'],
+                            'Kotitulos': ['2', 'x', '1'], 'Vierastulos': ['1.0', '0', '1']})
+    table = compute_standings(matches)
+    assert table.loc['KTP', 'Ottelut'] == 1 and table.loc['TPS', 'Ottelut'] == 0
+    assert table.loc['MP', ['Tappiot', 'Päästetyt maalit']].tolist() == [1, 2]
+
+def test_league_table_from_matches_writes_the_table(write_matches, workdir):
+    assert create_league_table_from_matches(read_matches_csv(write_matches(league=False)))
+    lines = (workdir / 'Sarjataulukko.md').read_text(encoding='utf-8').splitlines()
+    assert lines[4] == '| 1 | KTP | 2 | 2 | 0 | 0 | 5 | 0 | 5 | 6 |'
+    assert (workdir / 'Sarjataulukko.csv').read_text(encoding='utf-8').splitlines()[1] == 'KTP,1,2,2,0,0,5,0,5,6'
@@ -0,0 +1,40 @@
+from datetime import date
+import pandas as pd
+from standings_history import StandingsHistory
+
+MATCHES = pd.DataFrame({
+    'Pelipäivä': ['05.01.2025', '01.06.2025', '01.06.2025', '12.06.2025', '20.06.2025'],
+    'Klo': ['18:00', '18:30', '19:00', '', '18:00'],
+    'Koti': ['KTP', 'TPS', 'MP', 'KTP', 'JIPPO'],
+    'Vieras': ['JIPPO', 'KTP', 'JIPPO', 'MP', 'TPS'],
+    'Kotitulos': [1, 2, 1, 0, None],
+    'Vierastulos': [0, 2, 3, 1, None],
+})
+
+def test_table_on_a_day_first_date():
+    history = StandingsHistory(MATCHES)
+    # 01.06.2025 is the first of June, not the sixth of January
+    table = history.table_on('01.06.2025')
+    assert table['Ottelut'].sum() == 6
+    assert table.index[0] == 'KTP' and table.loc['KTP', 'Pisteet'] == 4
+    assert history.table_on('05.01.2025')['Ottelut'].sum() == 2
+    assert history.table_on('2025-06-01').equals(table)
+    assert history.table_on(date(2025, 6, 11)).equals(table)
+
+def test_table_before_and_after_the_season():
+    history = StandingsHistory(MATCHES)
+    assert history.table_on('01.01.2025')['Ottelut'].sum() == 0
+    assert history.table_on('31.12.2025')['Ottelut'].sum() == 8
+
+def test_table_after_round():
+    history = StandingsHistory(MATCHES)
+    assert history.rounds == 3
+    first = history.table_after_round(1)
+    assert first.loc['KTP', 'Ottelut'] == 1 and first.loc['MP', 'Ottelut'] == 1
+    assert history.table_after_round(99).equals(history.table_on('31.12.2025'))
+
+def test_position_history():
+    positions = StandingsHistory(MATCHES).position_history('KTP')
+    assert positions['Pelipäivä'].tolist() == ['05.01.2025', '01.06.2025', '12.06.2025']
+    assert positions['Sijoitus'].tolist() == [1, 1, 1]
+    assert positions['Pisteet'].tolist() == [3, 4, 4]
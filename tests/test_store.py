@@ -0,0 +1,54 @@
+import json
+from manifest import Manifest
+from store import DataStore, read_dataset
+from views import refresh_views
+
+FIXTURES = [
+    {'Row': 1, 'Pelipäivä': '14.04.2025', 'Klo': '18:30', 'Koti': 'KTP', 'Vieras': 'JIPPO',
+     'Kotitulos': '3', 'Vierastulos': '0', 'Paikka': 'Arto Tolsa Areena'},
+    {'Row': 2, 'Pelipäivä': '21.04.2025', 'Klo': '', 'Koti': 'TPS', 'Vieras': 'KTP',
+     'Kotitulos': '', 'Vierastulos': '', 'Paikka': 'Veritas Stadion'},
+]
+
+def test_records_round_trip(workdir):
+    with DataStore() as store:
+        assert store.replace('ottelut', FIXTURES)
+        assert store.records('ottelut') == FIXTURES
+
+def test_values_the_column_type_would_rewrite_round_trip(workdir):
+    # SQLite integer and date affinity turn '+5' into 5 and '3.0' into 3
+    odd = [dict(FIXTURES[0], Kotitulos='+5', Vierastulos='3.0', Pelipäivä='1.5.2025'),
+           dict(FIXTURES[1], Kotitulos='05', Vierastulos='-0', Pelipäivä='2025')]
+    with DataStore() as store:
+        store.replace('ottelut', odd)
+    with DataStore() as store:
+        assert store.records('ottelut') == odd
+
+def test_extra_keys_round_trip(workdir):
+    records = [dict(fixture, Sarja='Ykkönen') for fixture in FIXTURES]
+    with DataStore() as store:
+        store.replace('ottelut', records)
+        assert store.records('ottelut') == records
+
+def test_replace_skips_unchanged_records(workdir):
+    with DataStore() as store:
+        assert store.replace('ottelut', FIXTURES)
+        assert not store.replace('ottelut', [dict(fixture) for fixture in FIXTURES])
+        assert store.replace('ottelut', FIXTURES[:1])
+        assert store.records('ottelut') == FIXTURES[:1]
+
+def test_read_dataset(workdir):
+    assert read_dataset('ottelut') is None
+    with DataStore() as store:
+        store.replace('ottelut', FIXTURES)
+    assert read_dataset('ottelut')['Koti'].tolist() == ['KTP', 'TPS']
+
+def test_views_are_derived_from_the_store(workdir):
+    manifest = Manifest()
+    with DataStore() as store:
+        store.replace('ottelut', FIXTURES)
+        written = refresh_views(store, manifest)
+        # Nothing is stored for the league table, so it has no views
+        assert written == ['Ottelut.csv', 'tulokset.csv', 'PelatutOttelut.csv', 'Ottelut.json', 'PelatutOttelut.md']
+        assert refresh_views(store, manifest) == []
+    assert json.loads((workdir / 'Ottelut.json').read_text(encoding='utf-8')) == FIXTURES
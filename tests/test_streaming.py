@@ -0,0 +1,17 @@
+from schema import read_matches_csv
+from standings import compute_standings
+from streaming import stream_standings
+
+def rows(table):
+    """Rows of a standings table with its keys, whatever the index dtypes"""
+    return table.reset_index().astype(object).values.tolist()
+
+def test_streaming_matches_in_memory(write_matches):
+    filename = write_matches()
+    assert rows(stream_standings(filename, chunksize=2, by=['Sarja'])) == \
+        rows(compute_standings(read_matches_csv(filename), by=['Sarja']))
+    assert rows(stream_standings(filename, chunksize=2)) == rows(compute_standings(read_matches_csv(filename)))
+
+def test_chunk_size_does_not_change_the_table(write_matches):
+    filename = write_matches()
+    assert rows(stream_standings(filename, chunksize=1)) == rows(stream_standings(filename, chunksize=100))
@@ -0,0 +1,26 @@
+from store import DataStore
+from views import refresh_views, with_html
+
+TABLE = [{'Sijoitus': '1', 'Joukkue': 'KTP & <B>', 'Ottelut': '1', 'Voitot': '1', 'Tasapelit': '0', 'Tappiot': '0',
+          'Tehdyt maalit': '3', 'Päästetyt maalit': '0', 'Maaliero': '3', 'Pisteet': '3'}]
+FIXTURES = [{'Pelipäivä': '14.04.2025', 'Klo': '18:30', 'Koti': 'KTP', 'Vieras': 'JIPPO',
+             'Kotitulos': '3', 'Vierastulos': '0', 'Paikka': 'Arto Tolsa Areena'}]
+
+def store_tables():
+    store = DataStore()
+    store.replace('sarjataulukko', TABLE)
+    store.replace('ottelut', FIXTURES)
+    return store
+
+def test_html_pages_are_written_on_request(workdir):
+    with store_tables() as store:
+        assert 'Sarjataulukko.html' not in refresh_views(store)
+        written = refresh_views(store, views=with_html())
+    assert {'Sarjataulukko.html', 'PelatutOttelut.html'} <= set(written)
+    league = (workdir / 'Sarjataulukko.html').read_text(encoding='utf-8')
+    assert league.startswith('<h1>Sarjataulukko - Ykkönen</h1>\n<table>\n<thead>\n<tr><th>Sij.</th><th>Joukkue</th>')
+    # Cells are escaped
+    assert '<td>KTP &amp; &lt;B&gt;</td>' in league
+    fixtures = (workdir / 'PelatutOttelut.html').read_text(encoding='utf-8')
+    assert '<tr><td>14.04.2025</td><td>18:30</td><td>KTP</td><td>JIPPO</td><td>3-0</td><td>Arto Tolsa Areena</td></tr>' \
+        in fixtures
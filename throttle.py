@@ -0,0 +1,47 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+class HostLimiter:
+    """Per-host concurrency limit and rate limit for outgoing page loads.
+
+    At most max_concurrent requests run against one host at a time, and
+    request starts against the same host are spaced at least min_interval
+    seconds apart.
+    """
+
+    def __init__(self, max_concurrent=2, min_interval=0.5):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Hold one request slot for the host of url"""
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrent))
+        async with semaphore:
+            # Reserve the next start time before sleeping so waiters queue up in order
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+class RequestBudget:
+    """Global concurrency cap combined with a polite per-host request budget"""
+
+    def __init__(self, max_concurrent=8, per_host=4, min_interval=0.25):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.hosts = HostLimiter(per_host, min_interval)
+
+    @asynccontextmanager
+    async def slot(self, url):
+        # Wait for the host first so a task queued on a busy host does not
+        # hold one of the global slots
+        async with self.hosts.slot(url):
+            async with self.semaphore:
+                yield
@@ -0,0 +1,210 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from deadline import Latency, hedged_call, remaining, retry_call
+from metrics import span
+
+# The tulospalvelu SPA fills its tables from the Torneopal REST API. The base
+# URL can be pointed at a local stub server with TULOSPALVELU_API_URL.
+API_URL = os.environ.get("TULOSPALVELU_API_URL", "https://spl.torneopal.net/taso/rest")
+API_KEY = os.environ.get("TULOSPALVELU_API_KEY")
+# Validators and bodies of the last responses; gitignored, since a new ETag
+# on identical data must not make a commit of its own
+CACHE_FILE = "http_cache.json"
+# Responses worth retrying: the server is overloaded or restarting
+RETRY_STATUSES = {429, 502, 503, 504}
+# Seconds before a slow request gets a hedged duplicate, until the client
+# has timed enough requests to use their p95 instead. A daily run makes one
+# request per competition, so with a single competition this is the delay.
+HEDGE_AFTER = float(os.environ.get("TULOSPALVELU_HEDGE_AFTER", 2.0))
+
+COMPETITION_ID = "spljp25"
+CATEGORY_ID = "M1L"
+GROUP_ID = "1"
+
+# Torneopal team fields mapped to Sarjataulukko columns
+TEAM_FIELDS = {
+    'current_standing': 'Sijoitus',
+    'team_name': 'Joukkue',
+    'matches_played': 'Ottelut',
+    'matches_won': 'Voitot',
+    'matches_tied': 'Tasapelit',
+    'matches_lost': 'Tappiot',
+    'goals_for': 'Tehdyt maalit',
+    'goals_against': 'Päästetyt maalit',
+    'goal_difference': 'Maaliero',
+    'points': 'Pisteet',
+}
+
+# Match statuses that have no result yet
+UNPLAYED_STATUSES = {'Fixture', 'Cancelled', 'Postponed'}
+
+class TulospalveluClient:
+    """Pooled HTTP client for the tulospalvelu data endpoints.
+
+    Responses are cached on disk with their ETag / Last-Modified headers and
+    revalidated with conditional GETs, so an unchanged endpoint costs one
+    304 response. Failed requests are retried with jittered exponential
+    backoff, and a request still running after the p95 of the client's
+    recent request times (hedge_after seconds until enough are known) gets a
+    hedged duplicate; the first answer wins.
+    """
+
+    def __init__(self, base_url=API_URL, api_key=API_KEY, cache_file=CACHE_FILE, timeout=15, retries=2,
+                 hedge_after=HEDGE_AFTER):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.cache_file = cache_file
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge_after = hedge_after
+        self.requests = 0
+        self.not_modified = 0
+        self.hedged = 0
+        self.cache_dirty = False
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        # Runs the hedged duplicates next to the original requests
+        self.executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="http")
+        self.latency = Latency()
+
+        self.cache = {}
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable HTTP cache {cache_file}: {e}")
+
+    def _get(self, url, params, headers):
+        """One GET, bounded by the run deadline; retryable statuses raise"""
+        timeout = min(self.timeout, remaining())
+        if timeout <= 0:
+            raise requests.Timeout(f"Run deadline reached before requesting {url}")
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        self.requests += 1
+        if response.status_code in RETRY_STATUSES:
+            response.raise_for_status()
+        return response
+
+    def _send(self, endpoint, url, params, headers):
+        with span('http_request', endpoint=endpoint) as s:
+            response, hedged = hedged_call(self.executor, lambda: self._get(url, params, headers),
+                                           self.latency.p95 or self.hedge_after)
+            self.hedged += hedged
+            s.labels['hedged'] = hedged
+            s.bytes = len(response.content)
+            s.labels['status'] = response.status_code
+        self.latency.observe(s.duration)
+        return response
+
+    def get_json(self, endpoint, **params):
+        """GET an endpoint and return (data, changed)"""
+        if self.api_key:
+            params['api_key'] = self.api_key
+        url = f"{self.base_url}/{endpoint}"
+        key = f"{url}?{urlencode(sorted((k, v) for k, v in params.items() if k != 'api_key'))}"
+
+        headers = {}
+        cached = self.cache.get(key)
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = retry_call(lambda: self._send(endpoint, url, params, headers),
+                              (requests.ConnectionError, requests.Timeout, requests.HTTPError),
+                              attempts=self.retries + 1)
+        if response.status_code == 304 and cached:
+            self.not_modified += 1
+            return cached['data'], False
+        response.raise_for_status()
+        data = response.json()
+        self.cache[key] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'data': data,
+        }
+        self.cache_dirty = True
+        return data, True
+
+    def save_cache(self):
+        if self.cache_file and self.cache_dirty:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, ensure_ascii=False)
+            self.cache_dirty = False
+
+    def close(self):
+        self.save_cache()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+def _format_date(value):
+    """Turn an ISO date (2025-04-21) into the Pelipäivä format (21.04.2025)"""
+    value = _text(value)
+    parts = value.split('-')
+    if len(parts) == 3:
+        return f"{parts[2]}.{parts[1]}.{parts[0]}"
+    return value
+
+def map_league_table(group):
+    """Map a Torneopal group into Sarjataulukko rows"""
+    league_table = []
+    for team in group.get('teams', []):
+        league_table.append({column: _text(team.get(field)) for field, column in TEAM_FIELDS.items()})
+    league_table.sort(key=lambda row: int(row['Sijoitus']) if row['Sijoitus'].isdigit() else len(league_table))
+    return league_table
+
+def map_fixtures(group):
+    """Map the matches of a Torneopal group into Ottelut rows.
+
+    The rows have the same keys as those parsed from the browser's fixtures
+    table, Row being the 1-based position of the match in the list.
+    """
+    fixtures = []
+    for i, match in enumerate(group.get('matches', [])):
+        played = match.get('status') not in UNPLAYED_STATUSES
+        fixtures.append({
+            'Row': i + 1,
+            'Pelipäivä': _format_date(match.get('date')),
+            'Klo': _text(match.get('time'))[:5],
+            'Koti': _text(match.get('team_A_name')),
+            'Vieras': _text(match.get('team_B_name')),
+            'Kotitulos': _text(match.get('fs_A')) if played else "",
+            'Vierastulos': _text(match.get('fs_B')) if played else "",
+            'Paikka': _text(match.get('venue_name')),
+        })
+    return fixtures
+
+def fetch_group(client, competition_id=COMPETITION_ID, category_id=CATEGORY_ID, group_id=GROUP_ID):
+    """Fetch standings and matches of one group.
+
+    Returns (league_table, fixtures, changed) where changed is False when the
+    server answered 304 Not Modified.
+    """
+    data, changed = client.get_json('getGroup', competition_id=competition_id,
+                                    category_id=category_id, group_id=group_id, matches=1)
+    group = data.get('group', data)
+    with span('extraction', source='http') as s:
+        league_table, fixtures = map_league_table(group), map_fixtures(group)
+        s.rows = len(league_table) + len(fixtures)
+    return league_table, fixtures, changed
+
+if __name__ == "__main__":
+    client = TulospalveluClient()
+    try:
+        league_table, fixtures, changed = fetch_group(client)
+        print(f"Fetched {len(league_table)} teams and {len(fixtures)} matches (changed: {changed})")
+    finally:
+        client.close()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import traceback
+import render
+from manifest import Manifest, write_output
+from store import DATASETS, DataStore
+from competitions import get_competition, output_dir
+
+# Markdown headers of the league table columns, in display order
+LEAGUE_HEADERS = {
+    'Sijoitus': 'Sij.',
+    'Joukkue': 'Joukkue',
+    'Ottelut': 'O',
+    'Voitot': 'V',
+    'Tasapelit': 'T',
+    'Tappiot': 'H',
+    'Tehdyt maalit': 'TM',
+    'Päästetyt maalit': 'PM',
+    'Maaliero': 'ME',
+    'Pisteet': 'P',
+}
+# Separator of the full league table, as the committed Sarjataulukko.md and
+# Sarjataulukko.py write it
+LEAGUE_SEPARATOR = '| ---- | ------- | - | - | - | - | -- | -- | -- | - |\n'
+
+def league_table_columns(df):
+    """Headers and display columns of the league table"""
+    columns = [column for column in LEAGUE_HEADERS if column in df.columns]
+    headers = [LEAGUE_HEADERS[column] for column in columns]
+
+    # If we don't have the expected columns, use all available columns
+    if len(columns) < 5:
+        columns = df.columns.tolist()
+        headers = columns.copy()
+
+    return headers, [render.column_text(df, column) for column in columns]
+
+def league_table_markdown(df, name="Ykkönen"):
+    """Markdown view of the league table"""
+    headers, columns = league_table_columns(df)
+    return render.markdown(headers, columns, title=f'Sarjataulukko - {name}',
+                           separator=LEAGUE_SEPARATOR if headers == list(LEAGUE_HEADERS.values()) else None)
+
+def league_table_html(df, name="Ykkönen"):
+    """HTML view of the league table"""
+    headers, columns = league_table_columns(df)
+    return render.html_table(headers, columns, title=f'Sarjataulukko - {name}')
+
+FIXTURE_HEADERS = ['Päivä', 'Aika', 'Koti', 'Vieras', 'Tulos', 'Paikka']
+
+def fixture_columns(df):
+    """Display columns of the fixtures, in the order of FIXTURE_HEADERS"""
+    return [render.column_text(df, 'Pelipäivä'), render.column_text(df, 'Klo'),
+            render.column_text(df, 'Koti'), render.column_text(df, 'Vieras'),
+            render.score_text(df), render.column_text(df, 'Paikka')]
+
+def fixtures_markdown(df, name="Ykkönen"):
+    """Markdown view of the fixtures"""
+    return render.markdown(FIXTURE_HEADERS, fixture_columns(df), title=f'Ottelut - {name}',
+                           separator='| ----- | ---- | ---- | ------ | ----- | ------ |\n')
+
+def fixtures_html(df, name="Ykkönen"):
+    """HTML view of the fixtures"""
+    return render.html_table(FIXTURE_HEADERS, fixture_columns(df), title=f'Ottelut - {name}')
+
+def _csv(records, df, name):
+    return df.to_csv(index=False)
+
+def _json(records, df, name):
+    return json.dumps(records, ensure_ascii=False, indent=2)
+
+def _league_md(records, df, name):
+    return league_table_markdown(df, name)
+
+def _fixtures_md(records, df, name):
+    return fixtures_markdown(df, name)
+
+def _league_html(records, df, name):
+    return league_table_html(df, name)
+
+def _fixtures_html(records, df, name):
+    return fixtures_html(df, name)
+
+# Legacy output files derived from each stored dataset. Files sharing a
+# renderer (the three fixture CSVs) are rendered once.
+VIEWS = {
+    'sarjataulukko': [
+        ('Sarjataulukko.csv', _csv),
+        ('Sarjataulukko.json', _json),
+        ('Sarjataulukko.md', _league_md),
+    ],
+    'ottelut': [
+        ('Ottelut.csv', _csv),
+        ('tulokset.csv', _csv),
+        ('PelatutOttelut.csv', _csv),
+        ('Ottelut.json', _json),
+        ('PelatutOttelut.md', _fixtures_md),
+    ],
+}
+
+# HTML pages of the same tables, written on request (views.py --html)
+HTML_VIEWS = {
+    'sarjataulukko': [('Sarjataulukko.html', _league_html)],
+    'ottelut': [('PelatutOttelut.html', _fixtures_html)],
+}
+
+def with_html(views=VIEWS):
+    """The given views with the HTML pages of each dataset added"""
+    return {dataset: files + HTML_VIEWS.get(dataset, []) for dataset, files in views.items()}
+
+def refresh_views(store, manifest=None, datasets=None, name="Ykkönen", views=VIEWS):
+    """Regenerate the output files of the given datasets (default: all) from the store"""
+    # Imported here so an entry point that writes no views does not load pandas
+    import pandas as pd
+    written = []
+    for dataset in datasets or views:
+        if store.version(dataset) is None:
+            continue
+        try:
+            records = store.records(dataset)
+            # An empty dataset (a group before its first match) keeps its header
+            df = pd.DataFrame(records) if records else pd.DataFrame(columns=[name for name, _ in DATASETS[dataset]])
+            rendered = {}
+            for filename, renderer in views[dataset]:
+                if renderer not in rendered:
+                    rendered[renderer] = renderer(records, df, name)
+                if write_output(filename, rendered[renderer], manifest):
+                    print(f"Created {filename} successfully")
+                    written.append(filename)
+        except Exception as e:
+            print(f"Error creating {dataset} views: {e}")
+            traceback.print_exc()
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the output files from the data store")
+    parser.add_argument("--competition", metavar="KEY",
+                        help="regenerate output/KEY/ instead of the repository root")
+    parser.add_argument("--html", action="store_true",
+                        help="also write Sarjataulukko.html and PelatutOttelut.html")
+    args = parser.parse_args()
+
+    competition = get_competition(args.competition) if args.competition else get_competition()
+    manifest = Manifest(output_dir(competition) if args.competition else "")
+    with DataStore(manifest.output_dir) as store:
+        refresh_views(store, manifest, name=competition['name'], views=with_html() if args.html else VIEWS)
+    manifest.save()
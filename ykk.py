@@ -0,0 +1,91 @@
+import argparse
+import os
+import runpy
+import sys
+
+# Single entry point of the scripts: python ykk.py SUBCOMMAND [options].
+# Every subcommand imports only what it needs, so a short job does not pay
+# for pandas or Playwright. Options after the subcommand go to the script
+# it runs, e.g. python ykk.py scrape --backend http.
+# Subcommand: (script module, help)
+SUBCOMMANDS = {
+    'scrape': ('scraper', "fetch the league table and fixtures"),
+    'standings': ('Sarjataulukko', "compute the league table from the results"),
+    'played': ('PelatutOttelut', "write the played matches"),
+    'fallback': ('fallback_data', "write the last good snapshot, or the hard-coded data"),
+    'serve': ('read_api', "serve the data as a read-only JSON API"),
+    'live': ('live', "follow a matchday and write score and status changes as JSONL"),
+}
+# Stdlib-only writers tried before the script; they decline inputs that are not small
+FAST_PATHS = {
+    'standings': 'write_standings',
+    'played': 'write_played_matches',
+}
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def run_script(module, argv):
+    """Run a script's command line as if it had been started directly"""
+    sys.argv = [f"{module}.py"] + argv
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+def run(subcommand, argv):
+    module, _ = SUBCOMMANDS[subcommand]
+    # Script options (--stream, --chunksize) ask for the full script
+    if subcommand in FAST_PATHS and not argv:
+        import fastpath
+        if getattr(fastpath, FAST_PATHS[subcommand])():
+            return
+    run_script(module, argv)
+
+def import_time(modules):
+    """(import time, wall time) in ms of importing modules in a fresh interpreter.
+
+    The import time is the sum of the top-level entries of -X importtime,
+    interpreter startup (site, encodings) included.
+    """
+    # Only the measurement needs these; the subcommands start without them
+    import subprocess
+    import time
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+                            capture_output=True, text=True, check=True, cwd=DIRECTORY)
+    wall = time.perf_counter() - start
+    total = 0
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        # Nested imports are indented under the module that imported them
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2].startswith('  '):
+            total += int(parts[1])
+    return total / 1000, wall * 1000
+
+def cold_starts(repeat=5):
+    """Best and median import times of every subcommand; the fast paths are listed separately"""
+    import statistics
+    targets = {subcommand: ['ykk', module] for subcommand, (module, _) in SUBCOMMANDS.items()}
+    targets.update({f"{subcommand} (fast path)": ['ykk', 'fastpath'] for subcommand in FAST_PATHS})
+    results = {}
+    for name, modules in targets.items():
+        samples = [import_time(modules) for _ in range(repeat)]
+        imports = [sample[0] for sample in samples]
+        walls = [sample[1] for sample in samples]
+        results[name] = {'best_ms': min(imports), 'median_ms': statistics.median(imports),
+                         'wall_best_ms': min(walls)}
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Ykkönen scripts through one entry point")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (module, help_text) in SUBCOMMANDS.items():
+        # The script parses its own options, including --help
+        commands.add_parser(name, help=f"{help_text} ({module}.py)", add_help=False)
+    importtime = commands.add_parser("importtime", help="measure the cold start of every subcommand")
+    importtime.add_argument("--repeat", type=int, default=5, help="fresh interpreters per subcommand")
+    args, rest = parser.parse_known_args()
+
+    if args.command == "importtime":
+        print(f"{'subcommand':24} {'imports':>10} {'median':>10} {'wall':>10}")
+        for name, result in cold_starts(args.repeat).items():
+            print(f"{name:24} {result['best_ms']:8.1f} ms {result['median_ms']:7.1f} ms "
+                  f"{result['wall_best_ms']:7.1f} ms")
+    else:
+        run(args.command, rest)